@@ -0,0 +1,98 @@
+"""Benchmark: streaming JSON Lines conversion throughput and peak RSS from 10 MB to 5 GB."""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'twitter_scraper'))
+
+LIKES = ['39', '1.2K', '16K', '1,234', '2.5M', '0', '']
+
+
+def tweet_line(i):
+    tweet_id = str(1956000000000000000 + i)
+    return json.dumps({
+        'tweet_id': tweet_id,
+        'tweet_url': f"https://x.com/user{i % 97}/status/{tweet_id}",
+        'author': f"@user{i % 97}",
+        'text': f"Tweet number {i} about @zomato delivery, late again but the rider was polite " * (1 + i % 3),
+        'likes': LIKES[i % len(LIKES)],
+        'retweets': str(i % 50),
+        'hashtags': [f"#tag{i % 5}"] if i % 4 else None,
+    }) + '\n'
+
+
+def write_jsonl(path, size_mb):
+    """Writes synthetic tweets until the file reaches `size_mb`; returns the row count."""
+    target = size_mb * 2**20
+    written = rows = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            block = ''.join(tweet_line(rows + k) for k in range(10_000))
+            f.write(block)
+            written += len(block)
+            rows += 10_000
+    return rows
+
+
+def run_worker(mode, input_path, output_path, chunksize):
+    """Runs one conversion in this process and prints its timing and peak RSS as JSON."""
+    import pandas as pd
+    from convert_to_csv import clean_engagement_count, stream_convert
+
+    start = time.perf_counter()
+    if mode == 'stream':
+        rows = stream_convert(input_path, output_path, chunksize)
+    else:
+        # The original approach: whole file in memory, per-row .apply
+        df = pd.read_json(input_path, lines=True, dtype=False, convert_dates=False)
+        df['likes'] = df['likes'].apply(clean_engagement_count)
+        df['retweets'] = df['retweets'].apply(clean_engagement_count)
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        rows = len(df)
+    secs = time.perf_counter() - start
+    print(json.dumps({'rows': rows, 'seconds': secs,
+                      'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def measure(mode, input_path, output_path, chunksize):
+    # A fresh process per run so ru_maxrss is this conversion's peak alone
+    out = subprocess.run(
+        [sys.executable, __file__, '--worker', mode, str(input_path), str(output_path), '--chunksize', str(chunksize)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes-mb', default='10,100,1000,5000', help="comma-separated input sizes in MB")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--legacy-max-mb', type=int, default=1000,
+                        help="also time the whole-file conversion up to this input size")
+    parser.add_argument('--worker', nargs=3, metavar=('MODE', 'INPUT', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker, args.chunksize)
+        sys.exit(0)
+
+    print(f"{'input':>8} {'rows':>11} {'mode':>8} {'rows/s':>10} {'peak RSS':>10}")
+    for size_mb in [int(s) for s in args.sizes_mb.split(',')]:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / 'tweets.jsonl'
+            write_jsonl(input_path, size_mb)
+            modes = ['stream'] + (['legacy'] if size_mb <= args.legacy_max_mb else [])
+            for mode in modes:
+                output_path = Path(tmp) / f"out.{args.format if mode == 'stream' else 'csv'}"
+                result = measure(mode, input_path, output_path, args.chunksize)
+                print(f"{size_mb:>6}MB {result['rows']:>11,} {mode:>8} "
+                      f"{result['rows'] / result['seconds']:>10,.0f} {result['peak_rss_mb']:>8,.0f}MB")
+                output_path.unlink()
@@ -0,0 +1,72 @@
+"""Benchmark: reading one location's slice from the Parquet lake vs reparsing the whole CSV, and appending to it."""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import data_lake
+
+LOCATIONS = ['mumbai', 'delhi', 'bangalore', 'pune', 'india', 'IndianStreetBets', 'indiasocial']
+
+
+def synthetic_reddit(rows, start=0):
+    i = np.arange(start, start + rows)
+    return pd.DataFrame({
+        'source_platform': np.where(i % 6 == 0, 'Reddit_Post', 'Reddit_Comment'),
+        'text': 'Zomato delivery was late again but the rider called twice and apologised',
+        'location': np.array(LOCATIONS)[i % len(LOCATIONS)],
+        'urls': [f"https://www.reddit.com/r/mumbai/comments/{a // 50:x}/_/{a:x}/" for a in i],
+        'post_author': [f"user{a}" for a in i % 5000],
+        'comment_author': np.where(i % 6 == 0, None, [f"user{a}" for a in (i * 7) % 5000]),
+        'post_score': i % 900,
+        'cleaned_text_tokens': [['zomato', 'delivery', 'late', 'rider', 'called']] * rows,
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--append-rows', type=int, default=1_000, help="rows per incremental append")
+    parser.add_argument('--appends', type=int, default=5)
+    args = parser.parse_args()
+
+    df = synthetic_reddit(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'reddit_data_cleaned.csv'
+        df.to_csv(csv_path, index=False)
+        _, secs = timed(lambda: data_lake.append(df, 'reddit_clean', root=tmp))
+        print(f"{args.rows:,} rows: lake append {secs:.2f}s")
+
+        csv_df, csv_secs = timed(lambda: pd.read_csv(csv_path).query("location == 'mumbai'"))
+        lake_df, lake_secs = timed(lambda: data_lake.read('reddit_clean', filters={'location': 'mumbai'}, root=tmp))
+        cols_df, cols_secs = timed(lambda: data_lake.read(
+            'reddit_clean', columns=['post_author', 'post_score'], filters={'location': 'mumbai'}, root=tmp))
+
+        print(f"CSV read + filter:            {csv_secs:7.2f}s ({len(csv_df):,} rows)")
+        print(f"lake, location=mumbai:        {lake_secs:7.2f}s ({len(lake_df):,} rows)")
+        print(f"lake, 2 columns, mumbai:      {cols_secs:7.2f}s ({len(cols_df):,} rows)")
+
+        # Incremental appends as a collector's flushes make them: half the rows are already in the lake
+        timings, written = [], 0
+        for k in range(args.appends):
+            batch = synthetic_reddit(args.append_rows, args.rows - args.append_rows // 2 + k * args.append_rows)
+            rows, secs = timed(lambda: data_lake.append(batch, 'reddit_clean', root=tmp))
+            timings.append(secs)
+            written += rows
+        expected = args.appends * args.append_rows - args.append_rows // 2
+        print(f"{args.appends} appends of {args.append_rows:,} rows: {np.median(timings):.3f}s median, "
+              f"{written:,} rows written ({expected:,} new)")
@@ -0,0 +1,55 @@
+"""Benchmark: startup, lookup and insert cost of the spider's SQLite tweet dedup index."""
+
+import argparse
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'twitter_scraper'))
+
+from twitter_scraper.dedup import TweetIdIndex
+
+BASE_ID = 1_900_000_000_000_000_000
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ids', type=int, default=10_000_000)
+    parser.add_argument('--lookups', type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'seen.db')
+        index = TweetIdIndex(db_path)
+        start = time.perf_counter()
+        index.update(BASE_ID + i * 7 for i in range(args.ids))
+        index.close()
+        print(f"Seeded {args.ids:,} ids in {time.perf_counter() - start:.1f}s "
+              f"({Path(db_path).stat().st_size / 2**20:,.0f} MB on disk)")
+
+        start = time.perf_counter()
+        index = TweetIdIndex(db_path)
+        print(f"Startup: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        rng = random.Random(0)
+        probes = [str(BASE_ID + rng.randrange(args.ids * 7)) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        hits = sum(tweet_id in index for tweet_id in probes)
+        secs = time.perf_counter() - start
+        print(f"Lookups: {args.lookups / secs:,.0f}/s ({hits:,} hits)")
+
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            index.add(str(BASE_ID + args.ids * 7 + i))
+        index.flush()
+        print(f"Appends: {args.lookups / (time.perf_counter() - start):,.0f}/s")
+        index.close()
+        print(f"Peak RSS: {max_rss_mb():,.0f} MB")
@@ -0,0 +1,58 @@
+"""Benchmark: full re-clean vs incremental clean when a crawl adds a few new tweets."""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import synthetic
+from clean_store import CleanStore, clean_incremental
+from twt_data_cleaner import clean_twitter_data_fast, cleaner_config
+
+
+def add_text_str(df):
+    df['cleaned_text_str'] = df['cleaned_tokens'].apply(' '.join)
+    return df
+
+
+def clean(df):
+    return clean_twitter_data_fast(df, 'text')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows already cleaned")
+    parser.add_argument('--new', type=int, default=1_000, help="rows added by the latest crawl")
+    args = parser.parse_args()
+
+    raw = synthetic.tweets(args.rows + args.new)
+    history = raw.head(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path = Path(tmp) / 'full.csv'
+        incremental_path = Path(tmp) / 'incremental.csv'
+        store = CleanStore(str(Path(tmp) / 'clean_store.db'))
+        key = cleaner_config()
+
+        start = time.perf_counter()
+        clean_incremental(history, clean, 'text', 'cleaned_tokens', key, incremental_path, add_text_str, store)
+        print(f"First incremental run over {args.rows:,} rows: {time.perf_counter() - start:.1f}s\n")
+
+        start = time.perf_counter()
+        add_text_str(clean(raw)).to_csv(full_path, index=False)
+        full_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clean_incremental(raw, clean, 'text', 'cleaned_tokens', key, incremental_path, add_text_str, store)
+        incremental_secs = time.perf_counter() - start
+
+        same = pd.read_csv(full_path).equals(pd.read_csv(incremental_path))
+        print(f"\nFull re-clean of {len(raw):,} rows:        {full_secs:8.2f}s")
+        print(f"Incremental with {args.new:,} new rows:  {incremental_secs:8.2f}s "
+              f"({full_secs / incremental_secs:.0f}x faster, identical output: {same})")
+        store.close()
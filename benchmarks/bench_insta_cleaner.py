@@ -0,0 +1,72 @@
+"""Benchmark: clean_insta_slim vs clean_insta_slim_fast on a synthetic Instagram export."""
+
+import argparse
+import importlib.util
+import tempfile
+import time
+from importlib.machinery import SourceFileLoader
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# insta_cleaning_function has no .py extension, so load it by path
+_loader = SourceFileLoader('insta_cleaning_function', str(ROOT / 'insta_cleaning_function'))
+_spec = importlib.util.spec_from_loader(_loader.name, _loader)
+insta = importlib.util.module_from_spec(_spec)
+_loader.exec_module(insta)
+
+CAPTIONS = [
+    "Craving biryani at 2am? 🍗 @zomato delivered in 20 mins!! #latenight #foodie https://zoma.to/x1",
+    "खाना बहुत अच्छा था 😋 #दिल्ली #zomato @swiggy",
+    "Ｆｕｌｌ​width caption — café visit… #CaféLife #weekend",
+    "Order #123 was cold. Refund please @zomatocare http://bit.ly/abc",
+    "",
+    None,
+]
+NAMES = ["Zomato", " Foodie‍ Mumbai ", "ｆｕｌｌ　width", None, "दिल्ली Eats"]
+
+
+def write_export(path, rows):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(['ownerUsername', 'ownerFullName', 'url', 'caption', 'firstComment',
+               'likesCount', 'commentsCount', 'timestamp'])
+    for i in range(rows):
+        ws.append([
+            f"@User{i % 5000}", NAMES[i % len(NAMES)], f"https://www.instagram.com/p/{i:09d}/",
+            CAPTIONS[i % len(CAPTIONS)], CAPTIONS[(i + 3) % len(CAPTIONS)],
+            i % 9000, None if i % 11 == 0 else i % 300,
+            f"2025-08-{1 + i % 28:02d}T{i % 24:02d}:15:00.000Z",
+        ])
+    wb.save(path)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'dataset.xlsx')
+        _, secs = timed(write_export, path, args.rows)
+        print(f"Wrote a {args.rows:,}-row export ({Path(path).stat().st_size / 2**20:,.0f} MB) in {secs:.0f}s")
+
+        slow, slow_secs = timed(insta.clean_insta_slim, path)
+        cold, cold_secs = timed(insta.clean_insta_slim_fast, path)
+        warm, warm_secs = timed(insta.clean_insta_slim_fast, path)
+        _, parse_secs = timed(insta.read_workbook, path)
+
+        identical = all(cold.equals(other) for other in (slow, warm))
+        print(f"read_workbook alone:                   {parse_secs:8.1f}s")
+        print(f"clean_insta_slim:                      {slow_secs:8.1f}s ({args.rows / slow_secs:,.0f} rows/s)")
+        print(f"clean_insta_slim_fast, first run:      {cold_secs:8.1f}s ({args.rows / cold_secs:,.0f} rows/s)")
+        print(f"clean_insta_slim_fast, cached sidecar: {warm_secs:8.1f}s ({args.rows / warm_secs:,.0f} rows/s)")
+        print(f"Identical output: {identical}")
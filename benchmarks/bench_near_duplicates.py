@@ -0,0 +1,93 @@
+"""Benchmark: MinHash/LSH near-duplicate indexing throughput, memory and recall of planted duplicates."""
+
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from near_duplicates import NearDuplicateIndex
+from token_corpus import TokenCorpus
+
+
+def bigram_jaccard(a, b):
+    a = set(zip(a[:-1].tolist(), a[1:].tolist()))
+    b = set(zip(b[:-1].tolist(), b[1:].tolist()))
+    return len(a & b) / len(a | b)
+
+
+def synthetic_batch(start, docs, rng, vocab_size=100_000, duplicate_rate=0.2):
+    """
+    Zipf-distributed token ids; `duplicate_rate` of the documents copy an
+    earlier document of the batch with one token changed (Jaccard ~0.8-0.9).
+    Returns the corpus and, per document, the position of the one it copies (-1 if none).
+    """
+    lengths = rng.integers(8, 30, size=docs)
+    ranks = np.minimum(rng.zipf(1.1, size=int(lengths.sum())), vocab_size) - 1
+    offsets = np.zeros(docs + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    token_ids = ranks.astype(np.int32)
+
+    source = np.full(docs, -1, dtype=np.int64)
+    copies = np.flatnonzero(rng.random(docs) < duplicate_rate)
+    copies = copies[copies > 0]
+    source[copies] = (rng.random(len(copies)) * copies).astype(np.int64)
+    # Rebuild with each copy's tokens taken from its source (sources are always earlier)
+    parts = []
+    for i in range(docs):
+        if source[i] >= 0:
+            doc = parts[source[i]].copy()
+            doc[rng.integers(len(doc))] = rng.integers(vocab_size)
+        else:
+            doc = token_ids[offsets[i]:offsets[i + 1]]
+        parts.append(doc)
+    lengths = np.fromiter((len(p) for p in parts), dtype=np.int64, count=docs)
+    offsets = np.zeros(docs + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    vocab = [f"t{i}" for i in range(vocab_size)]
+    corpus = TokenCorpus(vocab, offsets, np.concatenate(parts).astype(np.int32))
+    return corpus, np.where(source >= 0, source + start, -1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=10_000_000)
+    parser.add_argument('--batch', type=int, default=1_000_000)
+    parser.add_argument('--threshold', type=float, default=0.8)
+    parser.add_argument('--num-perm', type=int, default=64)
+    parser.add_argument('--bands', type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    index = NearDuplicateIndex(args.num_perm, args.bands, args.threshold)
+    planted = []
+    jaccard = []
+    total_secs = 0.0
+    print(f"{'indexed':>11} {'batch s':>8} {'docs/s':>10} {'peak RSS':>9}")
+    for start in range(0, args.docs, args.batch):
+        corpus, source = synthetic_batch(start, min(args.batch, args.docs - start), rng)
+        begin = time.perf_counter()
+        index.add(corpus)
+        secs = time.perf_counter() - begin
+        total_secs += secs
+        copies = np.flatnonzero(source >= 0) + start
+        planted.append(np.stack([copies, source[source >= 0]], axis=1))
+        jaccard.append([bigram_jaccard(corpus[c - start], corpus[s - start]) for c, s in planted[-1]])
+        print(f"{len(index):>11,} {secs:>8.1f} {len(corpus) / secs:>10,.0f} "
+              f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:>7,.0f}MB")
+
+    planted = np.concatenate(planted)
+    jaccard = np.concatenate(jaccard)
+    found = index.cluster[planted[:, 0]] == index.cluster[planted[:, 1]]
+    duplicates = int((~index.is_canonical()).sum())
+    print(f"\nIndexed {len(index):,} documents in {total_secs:.0f}s ({len(index) / total_secs:,.0f} docs/s)")
+    print(f"{duplicates:,} marked as near-duplicates")
+    for low, high in [(0.9, 1.01), (args.threshold, 0.9), (0.0, args.threshold)]:
+        band = (jaccard >= low) & (jaccard < high)
+        print(f"Planted one-token edits with Jaccard in [{low:.2f}, {min(high, 1):.2f}): "
+              f"{found[band].mean():6.1%} clustered with their source ({int(band.sum()):,} pairs)")
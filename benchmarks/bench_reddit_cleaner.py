@@ -0,0 +1,44 @@
+"""Benchmark: serial vs process-pool Reddit cleaning on reddit_data_cleaned.csv replicated N times."""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from reddit_data_cleaner import clean_social_media_data, clean_social_media_data_parallel
+
+
+def load_replicated(replicas):
+    base = pd.read_csv(ROOT / 'data/reddit_data_cleaned.csv').drop(columns=['cleaned_text_tokens'])
+    # The replica column keeps drop_duplicates from collapsing the copies
+    return pd.concat([base.assign(replica=i) for i in range(replicas)], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replicas', type=int, default=1000)
+    parser.add_argument('--verify-replicas', type=int, default=5,
+                        help="size of the slice compared row for row against the serial cleaner")
+    args = parser.parse_args()
+
+    sample = load_replicated(args.verify_replicas)
+    serial = clean_social_media_data(sample)
+    parallel = clean_social_media_data_parallel(sample)
+    print(f"Parallel output matches serial: {serial.equals(parallel)}")
+
+    df = load_replicated(args.replicas)
+    print(f"Benchmarking on {len(df)} rows")
+    worker_counts = sorted({1, 2, 4, os.cpu_count()} & set(range(1, os.cpu_count() + 1)))
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        clean_social_media_data_parallel(df, workers=workers)
+        secs = time.perf_counter() - start
+        baseline = baseline or secs
+        print(f"workers={workers:2d}: {secs:8.2f}s  {len(df) / secs:10,.0f} rows/s  speedup {baseline / secs:.2f}x")
@@ -0,0 +1,123 @@
+"""Benchmark: relational.py's indexed upsert loader vs to_sql(replace), load time and query latency."""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from relational import connect_db, create_schema, load_table
+
+BASE_ID = 1_900_000_000_000_000_000
+AUTHORS = 50_000
+START = pd.Timestamp('2024-01-01', tz='UTC')
+
+# Representative dashboard queries
+QUERIES = {
+    'by id': "SELECT * FROM raw_data WHERE tweet_id = ?",
+    'author timeline': "SELECT * FROM raw_data WHERE author = ? ORDER BY created_at DESC LIMIT 50",
+    'one day count': "SELECT COUNT(*) FROM raw_data WHERE created_at >= ? AND created_at < date(?, '+1 day')",
+}
+
+
+def synthetic_chunk(start, rows, changed_every=0):
+    i = np.arange(start, start + rows)
+    tweet_id = BASE_ID + i * 7
+    likes = i % 5000
+    if changed_every:
+        likes = np.where(i % changed_every == 0, likes + 1, likes)
+    created = START + pd.to_timedelta(i % (365 * 24 * 60), unit='min')
+    return pd.DataFrame({
+        'tweet_id': tweet_id.astype(str),
+        'tweet_url': [f"https://x.com/u/status/{t}" for t in tweet_id],
+        'author': [f"@user{a}" for a in i % AUTHORS],
+        'text': 'Ordered biryani on zomato, arrived cold but the rider was polite',
+        'likes': likes,
+        'retweets': i % 300,
+        'hashtags': np.where(i % 4 == 0, '#zomato', None),
+        'created_at': created.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+    })
+
+
+def write_csv(path, rows, changed_every=0, extra=0, chunk=1_000_000):
+    """Writes rows [0, rows + extra); `changed_every` bumps likes on every n-th tweet."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i, start in enumerate(range(0, rows + extra, chunk)):
+            df = synthetic_chunk(start, min(chunk, rows + extra - start), changed_every)
+            df.to_csv(f, index=False, header=(i == 0))
+
+
+def query_latency(conn, sql_table, rows, reps=200):
+    rng = np.random.default_rng(0)
+    results = {}
+    for name, sql in QUERIES.items():
+        sql = sql.replace('raw_data', sql_table)
+        timings = []
+        for _ in range(reps):
+            i = int(rng.integers(rows))
+            if name == 'by id':
+                params = (BASE_ID + i * 7,)
+            elif name == 'author timeline':
+                params = (f"@user{i % AUTHORS}",)
+            else:
+                day = (START + pd.Timedelta(days=i % 365)).strftime('%Y-%m-%d')
+                params = (day, day)
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append(time.perf_counter() - start)
+            if name != 'by id' and len(timings) >= 20 and sum(timings) > 5:
+                break  # unindexed scans on big tables: enough samples
+        results[name] = statistics.median(timings) * 1000
+    return results
+
+
+def print_latency(label, latency):
+    print(f"    {label:<8} " + "  ".join(f"{name} {ms:,.2f} ms" for name, ms in latency.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default='100000,1000000,10000000', help="comma-separated table sizes")
+    parser.add_argument('--legacy-max-rows', type=int, default=1_000_000,
+                        help="also time to_sql(if_exists='replace') up to this size")
+    args = parser.parse_args()
+
+    for rows in [int(r) for r in args.rows.split(',')]:
+        print(f"\n{rows:,} rows")
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / 'tweets.csv'
+            delta_path = Path(tmp) / 'tweets_next.csv'
+            write_csv(csv_path, rows)
+            # Next crawl: 1% of tweets have new counts and 1% are new
+            write_csv(delta_path, rows, changed_every=100, extra=rows // 100)
+
+            if rows <= args.legacy_max_rows:
+                legacy = sqlite3.connect(Path(tmp) / 'legacy.db')
+                start = time.perf_counter()
+                pd.read_csv(csv_path).to_sql('raw_data', legacy, if_exists='replace', index=False)
+                secs = time.perf_counter() - start
+                print(f"  to_sql replace: {secs:8.2f}s ({rows / secs:,.0f} rows/s, rewritten on every run)")
+                print_latency('legacy', query_latency(legacy, 'raw_data', rows))
+                legacy.close()
+
+            conn = connect_db(str(Path(tmp) / 'indexed.db'))
+            create_schema(conn)
+            start = time.perf_counter()
+            load_table(conn, 'raw_data', csv_path)
+            secs = time.perf_counter() - start
+            print(f"  first load:     {secs:8.2f}s ({rows / secs:,.0f} rows/s)")
+
+            start = time.perf_counter()
+            changed = load_table(conn, 'raw_data', delta_path)
+            secs = time.perf_counter() - start
+            print(f"  incremental:    {secs:8.2f}s ({changed:,} rows written out of {rows + rows // 100:,})")
+            print_latency('indexed', query_latency(conn, 'raw_data', rows))
+            conn.close()
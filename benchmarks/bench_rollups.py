@@ -0,0 +1,103 @@
+"""Benchmark: engagement cube ingest, query latency vs a groupby over the raw rows, and quantile accuracy."""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import synthetic
+from rollups import Rollup, time_dimensions
+
+
+def instagram_slim(rows, seed):
+    """Synthetic posts in the columns the rollups read from insta_cleaned_slim.csv."""
+    raw = synthetic.instagram(rows, seed)
+    return pd.DataFrame({
+        'url': raw['url'],
+        'likesCount': raw['likesCount'],
+        'commentsCount': raw['commentsCount'],
+        'posted_at': raw['timestamp'],
+    })
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, 1000 * statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Instagram posts")
+    parser.add_argument('--reddit-rows', type=int, default=300_000, help="Reddit rows (one in six is a post)")
+    parser.add_argument('--batch', type=int, default=100_000)
+    parser.add_argument('--new', type=int, default=1_000, help="posts in the incremental batch")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    insta = instagram_slim(args.rows + args.new, seed=0)
+    history, new = insta.head(args.rows), insta.tail(args.new)
+    reddit = synthetic.reddit(args.reddit_rows, seed=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rollup = Rollup(str(Path(tmp) / 'rollups.db'))
+        start = time.perf_counter()
+        for source, df in [('instagram', history), ('reddit', reddit)]:
+            for i in range(0, len(df), args.batch):
+                rollup.add(df.iloc[i:i + args.batch], source)
+        ingest = time.perf_counter() - start
+        rows = len(history) + len(reddit)
+        print(f"Rolled up {rows:,} rows in {ingest:.1f}s ({rows / ingest:,.0f} rows/s), "
+              f"{len(rollup.cells()):,} non-empty cells")
+
+        start = time.perf_counter()
+        changed = rollup.add(new, 'instagram')
+        print(f"Incremental batch of {args.new:,} new posts: {1000 * (time.perf_counter() - start):.0f} ms "
+              f"({changed:,} posts)")
+        start = time.perf_counter()
+        changed = rollup.add(new, 'instagram')
+        print(f"Same batch again: {1000 * (time.perf_counter() - start):.0f} ms ({changed} posts changed)")
+        rollup.cells()   # the first query after an update reloads the cells
+
+        # The same questions answered by a groupby over the raw posts
+        date, hour, weekday = time_dimensions(insta['posted_at'])
+        raw = pd.DataFrame({'date': date, 'hour': hour, 'weekday': weekday,
+                            'engagement': insta['likesCount'] + insta['commentsCount'].fillna(0)})
+        august = (raw['date'] >= '2025-08-01') & (raw['date'] <= '2025-08-31')
+        queries = [
+            ("best posting hour", lambda: rollup.query('engagement', by='hour', platform='instagram'),
+             lambda: raw.groupby('hour')['engagement'].describe(percentiles=[0.5, 0.9, 0.99])),
+            ("engagement per weekday", lambda: rollup.query('engagement', by='weekday', platform='instagram'),
+             lambda: raw.groupby('weekday')['engagement'].describe(percentiles=[0.5, 0.9, 0.99])),
+            ("August, by hour", lambda: rollup.query('engagement', by='hour', platform='instagram',
+                                                     date=('2025-08-01', '2025-08-31')),
+             lambda: raw[august].groupby('hour')['engagement'].describe(percentiles=[0.5, 0.9, 0.99])),
+        ]
+        # 'first' includes rolling the cells up to the query's cuboid, which later queries reuse
+        print(f"\n{'query':<24} {'first ms':>8} {'cube ms':>8} {'raw ms':>8} {'p50 err':>8} {'p90 err':>8} {'p99 err':>8}")
+        for name, cube_query, raw_query in queries:
+            _, first_ms = timed(cube_query, 1)
+            cube, cube_ms = timed(cube_query, args.repeat)
+            exact, raw_ms = timed(raw_query, max(1, args.repeat // 4))
+            exact = exact.reindex(cube.index)
+            assert (cube['count'] == exact['count']).all()
+            # Nearest-rank quantiles from the sketch vs pandas' interpolated ones
+            errors = [np.nanmax(np.abs(cube[f"p{q}"] / exact[f"{q}%"] - 1)) for q in (50, 90, 99)]
+            print(f"{name:<24} {first_ms:>8.1f} {cube_ms:>8.1f} {raw_ms:>8.1f} " + ' '.join(f"{e:>8.1%}" for e in errors))
+
+        reddit_query = lambda: rollup.query('score', by='location', platform='reddit')
+        _, first_ms = timed(reddit_query, 1)
+        _, ms = timed(reddit_query, args.repeat)
+        print(f"{'reddit score by location':<24} {first_ms:>8.1f} {ms:>8.1f}")
+        rollup.close()
@@ -0,0 +1,93 @@
+"""Benchmark: FTS5 search index build rate and query latency vs pandas str.contains."""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from search_index import SearchIndex
+
+PLATFORMS = ['twitter', 'reddit', 'youtube', 'instagram']
+LOCATIONS = ['mumbai', 'delhi', 'bangalore', 'pune', '']
+COMMON = ['zomato', 'swiggy', 'order', 'delivery', 'food', 'late', 'cold', 'rider', 'refund', 'biryani',
+          'blinkit', 'app', 'customer', 'support', 'great', 'bad', 'hai', 'nahi', 'accha', 'khana']
+
+QUERIES = {
+    'term': ('refund', {}),
+    'boolean': ('(late OR cold) AND biryani NOT refund', {}),
+    'phrase': ('"customer support"', {}),
+    'prefix': ('swig*', {}),
+    'filtered': ('late AND rider', {'platform': 'reddit', 'location': 'mumbai'}),
+    'rare': ('w4711', {}),
+}
+
+
+def synthetic_docs(start, count, rng):
+    vocab = np.array(COMMON + [f"w{i}" for i in range(50_000)])
+    # Zipf-like: low ranks (the common words) dominate, the long tail is rare
+    ranks = np.minimum(rng.zipf(1.3, size=(count, 12)) - 1, len(vocab) - 1)
+    words = vocab[ranks]
+    bodies = [' '.join(row) for row in words]
+    platforms = np.array(PLATFORMS)[np.arange(start, start + count) % len(PLATFORMS)]
+    locations = np.array(LOCATIONS)[rng.integers(len(LOCATIONS), size=count)]
+    return [(f"{p}:{start + i}", body, p, loc, '2025-08-20')
+            for i, (body, p, loc) in enumerate(zip(bodies, platforms, locations))]
+
+
+def latency_ms(fn, reps=20):
+    timings = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=1_000_000)
+    parser.add_argument('--batch', type=int, default=100_000)
+    parser.add_argument('--pandas-max-docs', type=int, default=1_000_000,
+                        help="also time str.contains over a DataFrame up to this size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(str(Path(tmp) / 'search.db'))
+        bodies = []
+        start = time.perf_counter()
+        for offset in range(0, args.docs, args.batch):
+            docs = synthetic_docs(offset, min(args.batch, args.docs - offset), rng)
+            index.add_documents(docs)
+            if args.docs <= args.pandas_max_docs:
+                bodies.extend(doc[1] for doc in docs)
+        build_secs = time.perf_counter() - start
+        index.optimize()
+        print(f"Indexed {args.docs:,} documents in {build_secs:.1f}s ({args.docs / build_secs:,.0f} docs/s), "
+              f"optimized in {time.perf_counter() - start - build_secs:.1f}s")
+
+        start = time.perf_counter()
+        added, updated = index.add_documents(synthetic_docs(0, args.batch, np.random.default_rng(0)))
+        print(f"Re-indexing an unchanged batch of {args.batch:,}: {time.perf_counter() - start:.2f}s "
+              f"({added} added, {updated} updated)")
+
+        print(f"\n{'query':>9} {'matches':>10} {'top 50':>10} {'top 50 BM25':>12}")
+        for name, (query, filters) in QUERIES.items():
+            matches = index.count(query, **filters)
+            first = latency_ms(lambda: index.search(query, limit=50, **filters))
+            ranked = latency_ms(lambda: index.search(query, limit=50, ranked=True, **filters), reps=3)
+            print(f"{name:>9} {matches:>10,} {first:>8.2f}ms {ranked:>10.1f}ms")
+
+        if bodies:
+            series = pd.Series(bodies)
+            secs = latency_ms(lambda: series.str.contains('refund', regex=False), reps=3)
+            print(f"\npandas str.contains('refund') over the same corpus: {secs:,.0f}ms")
+        index.close()
@@ -0,0 +1,64 @@
+"""Benchmark: vectorized lexicon sentiment vs TextBlob per row, on the same token lists."""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import synthetic
+from sentiment import DEFAULT_LEXICONS, SentimentLexicon, default_lexicon, score_corpus
+from token_corpus import TokenCorpus
+
+# Stand-in for the cleaners' output: lowercase words, Devanagari kept, no URLs or mentions
+WORD = re.compile(r'(?<![@/\w.])[a-zऀ-ॿ]+(?![\w./])')
+
+
+def synthetic_tokens(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return [WORD.findall(text.lower()) for text in synthetic.synthetic_text(rows, rng)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=1_000_000)
+    parser.add_argument('--textblob-docs', type=int, default=20_000,
+                        help="TextBlob is timed on this many of the documents and its rate extrapolated")
+    args = parser.parse_args()
+
+    from textblob import TextBlob
+
+    docs = synthetic_tokens(args.docs)
+    corpus = TokenCorpus.from_token_lists(docs)
+    print(f"{len(corpus):,} documents, {len(corpus.token_ids):,} tokens")
+
+    default_lexicon()  # loading the lexicon files is a one-off cost, not per corpus
+    start = time.perf_counter()
+    scores = score_corpus(corpus)
+    vector_secs = time.perf_counter() - start
+
+    sample = docs[:args.textblob_docs]
+    start = time.perf_counter()
+    textblob = np.array([TextBlob(' '.join(tokens)).sentiment.polarity for tokens in sample])
+    textblob_secs = time.perf_counter() - start
+
+    vector_rate = len(corpus) / vector_secs
+    textblob_rate = len(sample) / textblob_secs
+    print(f"score_corpus: {vector_secs:8.2f}s  {vector_rate:>12,.0f} docs/s")
+    print(f"TextBlob:     {textblob_secs:8.2f}s  {textblob_rate:>12,.0f} docs/s  (on {len(sample):,} documents)")
+    print(f"Speedup: {vector_rate / textblob_rate:,.0f}x")
+
+    # Agreement where TextBlob can score at all: documents without Hinglish or Devanagari words
+    ours = scores['polarity'].to_numpy()[:len(sample)]
+    english = np.array([all(t.isascii() for t in tokens) for tokens in sample])
+    hinglish = set(SentimentLexicon.load(DEFAULT_LEXICONS[1:]).words)
+    english &= np.array([not hinglish.intersection(tokens) for tokens in sample])
+    same_sign = np.sign(np.round(ours[english], 6)) == np.sign(np.round(textblob[english], 6))
+    print(f"English documents with the same polarity sign as TextBlob: {same_sign.mean():.1%} "
+          f"(mean absolute difference {np.abs(ours[english] - textblob[english]).mean():.3f}, "
+          f"{int(english.sum()):,} documents)")
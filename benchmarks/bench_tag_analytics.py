@@ -0,0 +1,115 @@
+"""Benchmark: tag counts and co-occurrence, exact and sketch modes vs pandas explode + groupby."""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tag_analytics import TagAnalytics
+
+
+def synthetic_tags(docs, rng, num_tags=200_000):
+    """Zipf-distributed tag lists, 0-8 tags per post, with one timestamp per post over two days."""
+    lengths = np.minimum(rng.poisson(2.0, size=docs), 8)
+    ids = np.minimum(rng.zipf(1.3, size=int(lengths.sum())), num_tags) - 1
+    words = np.char.add('#t', ids.astype(str)).astype(object).tolist()
+    ends = np.cumsum(lengths).tolist()
+    starts = [0] + ends[:-1]
+    tag_lists = pd.Series([words[s:e] for s, e in zip(starts, ends)], dtype=object)
+    times = pd.Timestamp('2025-08-15', tz='UTC') + pd.to_timedelta(np.sort(rng.random(docs)) * 48, unit='h')
+    return tag_lists, pd.Series(times)
+
+
+def pandas_pairs(tag_lists):
+    """The explode + self-merge + groupby way to count tags and tag pairs."""
+    posts = tag_lists.explode().dropna().rename('tag').reset_index().drop_duplicates()
+    counts = posts.groupby('tag').size()
+    pairs = posts.merge(posts, on='index')
+    pairs = pairs[pairs['tag_x'] < pairs['tag_y']]
+    return counts, pairs.groupby(['tag_x', 'tag_y']).size()
+
+
+def run_worker(approach, args):
+    """Runs one approach in this process and prints its measurements (and answers) as JSON."""
+    rng = np.random.default_rng(0)
+    batches = [synthetic_tags(min(args.batch, args.docs - start), rng) for start in range(0, args.docs, args.batch)]
+    setup_rss = rss_mb()
+    start = time.perf_counter()
+    result = {'approach': approach, 'posts': args.docs}
+    if approach == 'pandas':
+        pandas_pairs(pd.concat([tag_lists for tag_lists, _ in batches], ignore_index=True))
+    else:
+        analytics = TagAnalytics(approach, window='1D')
+        for tag_lists, times in batches:
+            analytics.add(tag_lists, times)
+        top = analytics.top(args.top)
+        result['top'] = top.to_dict()
+        result['related'] = analytics.related(top.index[0], 10).index.tolist()
+        result['trending'] = analytics.trending(k=10)['tag'].tolist()
+    result.update(seconds=time.perf_counter() - start, setup_rss_mb=setup_rss, peak_rss_mb=rss_mb())
+    print(json.dumps(result))
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(approach, args):
+    # A fresh process per approach so ru_maxrss is its peak alone
+    proc = subprocess.run(
+        [sys.executable, __file__, '--worker', approach, '--docs', str(args.docs), '--batch', str(args.batch),
+         '--top', str(args.top)],
+        stdout=subprocess.PIPE, text=True
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {'approach': approach, 'error': f"worker exited with status {proc.returncode}"}
+    return json.loads(lines[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=2_000_000)
+    parser.add_argument('--batch', type=int, default=200_000)
+    parser.add_argument('--top', type=int, default=50)
+    parser.add_argument('--approach', action='append', choices=['pandas', 'exact', 'sketch'],
+                        help="run only these (default: all three)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args)
+        sys.exit(0)
+
+    print(f"{'approach':<28} {'posts':>10} {'seconds':>8} {'posts/s':>10} {'data MB':>8} {'peak MB':>8}")
+    results = {}
+    for approach in args.approach or ['pandas', 'exact', 'sketch']:
+        r = results[approach] = measure(approach, args)
+        name = 'pandas explode + groupby' if approach == 'pandas' else f"TagAnalytics {approach}"
+        if 'error' in r:
+            print(f"{name:<28} {r['error']}")
+            continue
+        print(f"{name:<28} {r['posts']:>10,} {r['seconds']:>8.1f} {r['posts'] / r['seconds']:>10,.0f} "
+              f"{r['setup_rss_mb']:>8,.0f} {r['peak_rss_mb']:>8,.0f}")
+
+    exact, sketch = results.get('exact', {}), results.get('sketch', {})
+    if 'top' in exact and 'top' in sketch:
+        truth = pd.Series(exact['top'])
+        found = set(sketch['top'])
+        print(f"\nSketch top {args.top}: {len(set(truth.index) & found) / len(truth):.0%} of the exact top {args.top}")
+        overestimate = np.array([sketch['top'].get(tag, np.nan) for tag in truth.index]) / truth.to_numpy() - 1
+        print(f"Sketch counts of the exact top {args.top}: {np.nanmean(overestimate):.2%} over on average "
+              f"(max {np.nanmax(overestimate):.2%})")
+        print(f"Top 10 co-occurring with {truth.index[0]}: "
+              f"{len(set(exact['related']) & set(sketch['related']))} of 10 match")
+        print(f"Top 10 trending: {len(set(exact['trending']) & set(sketch['trending']))} of "
+              f"{len(exact['trending'])} match")
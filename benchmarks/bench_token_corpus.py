@@ -0,0 +1,90 @@
+"""Benchmark: TokenCorpus vs list[str] columns for memory, save/load and term counting."""
+
+import argparse
+import ast
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from token_corpus import TokenCorpus
+
+
+def synthetic_token_lists(docs, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"tok{i}" for i in range(100_000)], dtype=object)
+    lengths = rng.integers(3, 30, size=docs)
+    ranks = np.minimum(rng.zipf(1.2, size=int(lengths.sum())) - 1, len(vocab) - 1)
+    # A fresh string object per token, as the cleaners' re/split output would be
+    words = [''.join(w) for w in vocab[ranks].tolist()]
+    bounds = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+    return [words[bounds[i]:bounds[i + 1]] for i in range(docs)]
+
+
+def measured(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    secs = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, secs, current / 2**20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    lists, _, list_mb = measured(lambda: synthetic_token_lists(args.docs))
+    tokens = sum(map(len, lists))
+    print(f"{args.docs:,} documents, {tokens:,} tokens")
+    print(f"list[str] column:        {list_mb:8,.0f} MB")
+
+    corpus, secs, _ = measured(lambda: TokenCorpus.from_token_lists(lists))
+    print(f"TokenCorpus:             {corpus.nbytes() / 2**20:8,.0f} MB  (built in {secs:.1f}s, "
+          f"{len(corpus.vocab):,} distinct tokens)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'tokens.csv'
+        start = time.perf_counter()
+        pd.DataFrame({'cleaned_tokens': lists}).to_csv(csv_path, index=False)
+        csv_save = time.perf_counter() - start
+        start = time.perf_counter()
+        restored = pd.read_csv(csv_path)['cleaned_tokens'].map(ast.literal_eval)
+        csv_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        corpus.save(Path(tmp) / 'corpus')
+        npy_save = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = TokenCorpus.load(Path(tmp) / 'corpus')
+        npy_load = time.perf_counter() - start
+        same = loaded.to_series().tolist() == restored.tolist()
+
+        print(f"\nCSV repr save / load + literal_eval: {csv_save:6.2f}s / {csv_load:6.2f}s")
+        print(f"TokenCorpus save / mmap load:        {npy_save:6.2f}s / {npy_load:6.2f}s  (round trip identical: {same})")
+
+        start = time.perf_counter()
+        counts = Counter(token for doc in lists for token in doc)
+        counter_secs = time.perf_counter() - start
+        start = time.perf_counter()
+        frequencies = loaded.term_frequencies()
+        bincount_secs = time.perf_counter() - start
+        top = loaded.vocab[int(frequencies.argmax())]
+        print(f"\nTerm counts, Counter over lists:     {counter_secs:6.2f}s")
+        print(f"Term counts, bincount over ids:      {bincount_secs:6.2f}s  (top token {top!r}: "
+              f"{counts[top]:,} == {int(frequencies.max()):,})")
+
+        start = time.perf_counter()
+        series = loaded.to_series()
+        print(f"\nBack to a list[str] column:          {time.perf_counter() - start:6.2f}s ({len(series):,} rows)")
+        del loaded
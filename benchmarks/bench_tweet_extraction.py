@@ -0,0 +1,44 @@
+"""Benchmark: per-field element handles vs one page.evaluate for tweet extraction (needs playwright + chromium)."""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'twitter_scraper'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from twitter_scraper.spiders.zomato_spider import EXTRACT_TWEETS_JS, extract_with_handles
+from x_fixtures import search_page
+
+
+async def main(count, rounds):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(search_page(count))
+
+        results = {}
+        for label, extract in [('handles', lambda: extract_with_handles(page, set())),
+                               ('batch', lambda: page.evaluate(EXTRACT_TWEETS_JS))]:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                raw_tweets = await extract()
+            secs = time.perf_counter() - start
+            results[label] = raw_tweets
+            print(f"{label:>8}: {count * rounds / secs:10,.0f} tweets/s")
+        await browser.close()
+
+    print(f"Same extraction: {results['handles'] == results['batch']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tweets', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.tweets, args.rounds))
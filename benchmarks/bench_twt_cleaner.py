@@ -0,0 +1,42 @@
+"""Benchmark: clean_twitter_data vs clean_twitter_data_fast on a scaled-up tweet corpus."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from twt_data_cleaner import clean_twitter_data, clean_twitter_data_fast
+
+
+def load_scaled(rows):
+    base = pd.read_csv(ROOT / 'data/zomato_tweets.csv')
+    repeats = -(-rows // len(base))
+    return pd.concat([base] * repeats, ignore_index=True).head(rows)
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    out = fn(df, 'text')
+    return out, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = load_scaled(args.rows)
+    print(f"Benchmarking on {len(df)} rows")
+
+    fast_df, fast_secs = timed(clean_twitter_data_fast, df)
+    slow_df, slow_secs = timed(clean_twitter_data, df)
+
+    identical = fast_df['cleaned_tokens'].tolist() == slow_df['cleaned_tokens'].tolist()
+    print(f"clean_twitter_data:      {slow_secs:8.2f}s  ({len(df) / slow_secs:,.0f} rows/s)")
+    print(f"clean_twitter_data_fast: {fast_secs:8.2f}s  ({len(df) / fast_secs:,.0f} rows/s)")
+    print(f"Speedup: {slow_secs / fast_secs:.1f}x, identical output: {identical}")
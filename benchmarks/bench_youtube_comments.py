@@ -0,0 +1,40 @@
+"""Benchmark: serial vs concurrent comment fetching against the local YouTube stub."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from youtube_api import YouTubeClient, fetch_comments
+from youtube_stub_server import StubYouTubeServer
+
+
+def run(stub, video_ids, workers, max_comments):
+    client = YouTubeClient('stub-key', base_url=stub.base_url, units_per_second=1000, burst=100,
+                           backoff_seconds=0.05)
+    start = time.perf_counter()
+    rows, _ = fetch_comments(client, video_ids, max_comments, workers)
+    return rows, time.perf_counter() - start, client.limiter.spent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--max-comments', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    video_ids = [f"vid{i:04d}" for i in range(args.videos)]
+    with StubYouTubeServer(latency=args.latency, error_rate=args.error_rate) as stub:
+        serial_rows, serial_secs, serial_units = run(stub, video_ids, 1, args.max_comments)
+        fast_rows, fast_secs, fast_units = run(stub, video_ids, args.workers, args.max_comments)
+
+    print(f"serial:     {serial_secs:6.2f}s  {len(serial_rows)} comments  {serial_units} quota units")
+    print(f"workers={args.workers}: {fast_secs:6.2f}s  {len(fast_rows)} comments  {fast_units} quota units")
+    print(f"Speedup: {serial_secs / fast_secs:.1f}x, same rows: {serial_rows == fast_rows}")
@@ -0,0 +1,93 @@
+"""Benchmark: prioritized parallel reply expansion vs a serial loop in file order, on the same quota budget."""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from youtube_api import QuotaBudgetExceeded, YouTubeClient, comment_reply_row, fetch_comments
+from youtube_replies import CommentSink, comments_frame, expand_replies, thread_priority
+from youtube_stub_server import StubYouTubeServer
+
+
+def client_for(stub, quota_budget=None):
+    return YouTubeClient('stub-key', base_url=stub.base_url, units_per_second=1000, burst=100,
+                         quota_budget=quota_budget, backoff_seconds=0.05)
+
+
+def serial_in_order(client, threads):
+    """The straightforward loop: every thread in file order, every page, until the quota runs out."""
+    rows = []
+    try:
+        for video_id, comment_id, reply_count in zip(threads['video_id'], threads['comment_id'], threads['reply_count']):
+            if reply_count > 0:
+                items = client.iter_items('comments', page_size=100, part='snippet', parentId=comment_id,
+                                          textFormat='plainText')
+                rows.extend(comment_reply_row(video_id, comment_id, item) for item in items)
+    except QuotaBudgetExceeded:
+        pass
+    return pd.DataFrame(rows)
+
+
+def coverage(replies, threads, value):
+    """Share of all replies fetched, and of the replies to the 1% most valuable threads."""
+    fetched = replies.groupby('parent_id').size().reindex(threads['comment_id']).fillna(0).to_numpy()
+    counts = threads['reply_count'].to_numpy()
+    top = np.argsort(-value)[:max(1, len(threads) // 100)]
+    return fetched.sum() / counts.sum(), fetched[top].sum() / counts[top].sum()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--comments-per-video', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--reply-latency', type=float, default=0.1, help="latency of comments().list calls")
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--quota-budget', type=int, default=300, help="quota units for reply pages")
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    video_ids = [f"vid{i:04d}" for i in range(args.videos)]
+    with StubYouTubeServer(latency=args.latency, error_rate=args.error_rate,
+                           comments_per_video=args.comments_per_video, replies='pareto',
+                           resource_latency={'comments': args.reply_latency}) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        rows, _ = fetch_comments(client_for(stub), video_ids, args.comments_per_video, args.workers)
+        threads = comments_frame(rows)
+        value = thread_priority(threads)
+        print(f"{len(threads):,} threads, {int((threads['reply_count'] > 0).sum()):,} with replies, "
+              f"{int(threads['reply_count'].sum()):,} replies in all (busiest thread: {threads['reply_count'].max():,})")
+
+        client = client_for(stub, args.quota_budget)
+        start = time.perf_counter()
+        serial = serial_in_order(client, threads)
+        serial_secs = time.perf_counter() - start
+        serial_units = client.limiter.spent
+        serial_all, serial_top = coverage(serial, threads, value)
+
+        csv_path = Path(tmp) / 'youtube_comments.csv'
+        threads.to_csv(csv_path, index=False)
+        client = client_for(stub, args.quota_budget)
+        summary = expand_replies(client, threads, CommentSink(csv_path, dataset=None, flush_rows=500),
+                                 args.workers, args.quota_budget)
+        saved = pd.read_csv(csv_path)
+        replies = saved[saved['parent_id'].notna()]
+        assert replies['parent_id'].isin(threads['comment_id']).all()
+        prioritized_all, prioritized_top = coverage(replies, threads, value)
+
+    print(f"\n{'approach':<24} {'seconds':>8} {'units':>6} {'replies':>8} {'of all':>7} {'top 1% threads':>15}")
+    print(f"{'serial, file order':<24} {serial_secs:>8.2f} {serial_units:>6} {len(serial):>8,} "
+          f"{serial_all:>7.1%} {serial_top:>15.1%}")
+    print(f"{f'prioritized, {args.workers} workers':<24} {summary['seconds']:>8.2f} {summary['units']:>6} "
+          f"{summary['replies']:>8,} {prioritized_all:>7.1%} {prioritized_top:>15.1%}")
+    print(f"Speedup: {serial_secs / summary['seconds']:.1f}x, {summary['started']} threads started, "
+          f"{summary['complete']} complete, stopped on: {summary['stopped']}")
@@ -0,0 +1,42 @@
+"""Benchmark: full vs incremental channel sync against the local YouTube stub."""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from youtube_api import YouTubeClient
+from youtube_stub_server import StubYouTubeServer
+from youtube_zomato import VideoStateStore, sync_channel
+
+
+def run(stub, store, full):
+    client = YouTubeClient('stub-key', base_url=stub.base_url, units_per_second=1000, burst=100)
+    start = time.perf_counter()
+    summary = sync_channel(client, 'UCstub', store, full=full)
+    return summary, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--uploads', type=int, default=2000)
+    parser.add_argument('--new-uploads', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            StubYouTubeServer(latency=args.latency, uploads=args.uploads) as stub:
+        store = VideoStateStore(str(Path(tmp) / 'state.db'))
+        for label, full in [('initial full sync', True), ('full resync', True)]:
+            summary, secs = run(stub, store, full)
+            print(f"{label:>18}: {secs:6.2f}s  {summary}")
+        stub.add_uploads(args.new_uploads)
+        summary, secs = run(stub, store, False)
+        print(f"{'incremental sync':>18}: {secs:6.2f}s  {summary}")
+        print(f"Videos in store: {len(store.to_dataframe())}")
+        store.close()
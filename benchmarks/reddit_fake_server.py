@@ -0,0 +1,120 @@
+"""Local stand-in for the parts of Reddit's OAuth JSON API that reddit_data.py uses."""
+
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeRedditServer:
+    """
+    Serves the token endpoint, /r/{sub}/search and /comments/{id} from generated data.
+
+    latency           seconds added to every response
+    posts_per_sub     search results available in each subreddit
+    comments_per_post top-level comments on every submission
+    fail_submissions  submission ids whose comment fetch returns HTTP 500
+    """
+
+    def __init__(self, latency=0.05, posts_per_sub=30, comments_per_post=8, fail_submissions=()):
+        self.latency = latency
+        self.posts_per_sub = posts_per_sub
+        self.comments_per_post = comments_per_post
+        self.fail_submissions = set(fail_submissions)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # --- data ---
+    @staticmethod
+    def submission_id(sub, i):
+        return f"{zlib.crc32(sub.encode()) & 0xffff:04x}{i:03d}"
+
+    def submission(self, sub, i):
+        sid = self.submission_id(sub, i)
+        return {'kind': 't3', 'data': {
+            'id': sid, 'name': f"t3_{sid}", 'subreddit': sub, 'title': f"Zomato post {i} in {sub}",
+            'selftext': f"Body of post {i}", 'url': f"https://www.reddit.com/r/{sub}/comments/{sid}/",
+            'permalink': f"/r/{sub}/comments/{sid}/", 'author': f"poster{i}", 'score': 100 - i,
+            'num_comments': self.comments_per_post, 'upvote_ratio': 0.9,
+        }}
+
+    def comment(self, sub, sid, j):
+        cid = f"{sid}c{j}"
+        return {'kind': 't1', 'data': {
+            'id': cid, 'name': f"t1_{cid}", 'subreddit': sub, 'link_id': f"t3_{sid}",
+            'parent_id': f"t3_{sid}", 'body': f"comment {j} on {sid}", 'author': f"commenter{j}",
+            'score': j, 'permalink': f"/r/{sub}/comments/{sid}/_/{cid}/", 'replies': '',
+        }}
+
+    def search(self, sub, params):
+        limit = min(int(params.get('limit', 25)), self.posts_per_sub)
+        children = [self.submission(sub, i) for i in range(limit)]
+        return {'kind': 'Listing', 'data': {'after': None, 'before': None, 'children': children}}
+
+    def comments(self, sid):
+        sub = next(s for s in self.subreddits if self.submission_id(s, 0)[:4] == sid[:4])
+        i = int(sid[4:])
+        listing = lambda children: {'kind': 'Listing', 'data': {'after': None, 'before': None, 'children': children}}
+        return [listing([self.submission(sub, i)]),
+                listing([self.comment(sub, sid, j) for j in range(self.comments_per_post)])]
+
+    def _handler(self):
+        fake = self
+        fake.subreddits = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self._send(200, {'access_token': 'fake-token', 'token_type': 'bearer',
+                                 'expires_in': 3600, 'scope': '*'})
+
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                params = dict(urllib.parse.parse_qsl(parsed.query))
+                parts = [p for p in parsed.path.split('/') if p]
+                with fake.lock:
+                    fake.request_count += 1
+                time.sleep(fake.latency)
+                if len(parts) >= 3 and parts[0] == 'r' and parts[2] == 'search':
+                    with fake.lock:
+                        if parts[1] not in fake.subreddits:
+                            fake.subreddits.append(parts[1])
+                    self._send(200, fake.search(parts[1], params))
+                elif len(parts) >= 2 and parts[0] == 'comments':
+                    if parts[1] in fake.fail_submissions:
+                        self._send(500, {'message': 'Internal Server Error', 'error': 500})
+                    else:
+                        self._send(200, fake.comments(parts[1]))
+                else:
+                    self._send(404, {'message': 'Not Found', 'error': 404})
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,264 @@
+"""
+Benchmark suite: every cleaning and loading stage over synthetic data at
+fixed sizes, with throughput and peak RSS written to a JSON results file.
+
+    python benchmarks/run_suite.py --sizes 10000,100000,1000000
+    python benchmarks/run_suite.py --baseline benchmarks/results/suite-20251001-120000.json
+
+With --baseline, each (stage, rows) result is compared to the baseline run and
+the exit status is 1 if any stage got slower than --tolerance allows.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'twitter_scraper'))
+
+import synthetic
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# Excel sheets stop at 1,048,576 rows including the header
+XLSX_MAX_ROWS = 1_048_575
+
+
+def _insta():
+    import importlib.util
+    from importlib.machinery import SourceFileLoader
+
+    loader = SourceFileLoader('insta_cleaning_function', str(ROOT / 'insta_cleaning_function'))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(loader.name, loader))
+    loader.exec_module(module)
+    return module
+
+
+# --- stages: setup(rows, seed, tmp) builds the input untimed, run(input, tmp) is timed ---
+def setup_tweets(rows, seed, tmp):
+    return synthetic.tweets(rows, seed)
+
+
+def setup_reddit(rows, seed, tmp):
+    return synthetic.reddit(rows, seed)
+
+
+def setup_counts(rows, seed, tmp):
+    return synthetic.engagement_counts(rows, seed)
+
+
+def setup_instagram(rows, seed, tmp):
+    path = Path(tmp) / 'instagram.xlsx'
+    synthetic.write_xlsx(synthetic.instagram(rows, seed), path)
+    return str(path)
+
+
+def setup_tweets_csv(rows, seed, tmp):
+    from convert_to_csv import clean_engagement_counts
+
+    df = synthetic.tweets(rows, seed)
+    df['likes'] = clean_engagement_counts(df['likes'])
+    df['retweets'] = clean_engagement_counts(df['retweets'])
+    path = Path(tmp) / 'tweets.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+def run_clean_twitter_data(df, tmp):
+    from twt_data_cleaner import clean_twitter_data
+    return clean_twitter_data(df, 'text')
+
+
+def run_clean_twitter_data_fast(df, tmp):
+    from twt_data_cleaner import clean_twitter_data_fast
+    return clean_twitter_data_fast(df, 'text')
+
+
+def run_clean_social_media_data(df, tmp):
+    from reddit_data_cleaner import clean_social_media_data, make_token_caches
+    # A fresh cache database, so every run starts cold
+    return clean_social_media_data(df, caches=make_token_caches(db_path=str(Path(tmp) / 'token_cache.db')))
+
+
+def run_clean_social_media_data_parallel(df, tmp):
+    from reddit_data_cleaner import clean_social_media_data_parallel
+    return clean_social_media_data_parallel(df, cache_db=str(Path(tmp) / 'token_cache.db'))
+
+
+def run_clean_insta_slim(path, tmp):
+    return _insta().clean_insta_slim(path)
+
+
+def run_clean_insta_slim_fast(path, tmp):
+    return _insta().clean_insta_slim_fast(path, use_cache=False)
+
+
+def run_clean_engagement_count(values, tmp):
+    from convert_to_csv import clean_engagement_count
+    return values.apply(clean_engagement_count)
+
+
+def run_clean_engagement_counts(values, tmp):
+    from convert_to_csv import clean_engagement_counts
+    return clean_engagement_counts(values)
+
+
+def run_relational_load(csv_path, tmp):
+    import relational
+
+    conn = relational.connect_db(str(Path(tmp) / 'tweets.db'))
+    relational.create_schema(conn)
+    changed = relational.load_table(conn, 'raw_data', csv_path)
+    conn.close()
+    return changed
+
+
+# name: (setup, run, largest supported input)
+STAGES = {
+    'clean_twitter_data': (setup_tweets, run_clean_twitter_data, None),
+    'clean_twitter_data_fast': (setup_tweets, run_clean_twitter_data_fast, None),
+    'clean_social_media_data': (setup_reddit, run_clean_social_media_data, None),
+    'clean_social_media_data_parallel': (setup_reddit, run_clean_social_media_data_parallel, None),
+    'clean_insta_slim': (setup_instagram, run_clean_insta_slim, XLSX_MAX_ROWS),
+    'clean_insta_slim_fast': (setup_instagram, run_clean_insta_slim_fast, XLSX_MAX_ROWS),
+    'clean_engagement_count': (setup_counts, run_clean_engagement_count, None),
+    'clean_engagement_counts': (setup_counts, run_clean_engagement_counts, None),
+    'relational_load': (setup_tweets_csv, run_relational_load, None),
+}
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(stage, rows, seed):
+    """Runs one stage in this process and prints its measurements as JSON."""
+    setup, run, _ = STAGES[stage]
+    with tempfile.TemporaryDirectory() as tmp:
+        # The stages print progress; keep stdout for the result line
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                data = setup(rows, seed, tmp)
+                setup_rss = rss_mb()
+                start = time.perf_counter()
+                run(data, tmp)
+                secs = time.perf_counter() - start
+            except Exception as e:
+                # e.g. missing NLTK data; report it and let the suite move on
+                message = next((line.strip() for line in str(e).splitlines() if line.strip(' *')), '')
+                print(json.dumps({'stage': stage, 'rows': rows, 'error': f"{type(e).__name__}: {message}"}),
+                      file=sys.__stdout__)
+                return
+    print(json.dumps({'stage': stage, 'rows': rows, 'seconds': secs, 'rows_per_sec': rows / secs,
+                      'setup_rss_mb': setup_rss, 'peak_rss_mb': rss_mb()}))
+
+
+def measure(stage, rows, seed, verbose=False):
+    # A fresh process per stage so ru_maxrss is that stage's peak alone
+    proc = subprocess.run(
+        [sys.executable, __file__, '--worker', stage, str(rows), '--seed', str(seed)],
+        stdout=subprocess.PIPE, stderr=None if verbose else subprocess.DEVNULL, text=True
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {'stage': stage, 'rows': rows, 'error': f"worker exited with status {proc.returncode}"}
+    return json.loads(lines[-1])
+
+
+def environment():
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints each result against the baseline; returns the (stage, rows) pairs that regressed."""
+    previous = {(r['stage'], r['rows']): r for r in baseline['results'] if 'error' not in r}
+    regressions = []
+    print(f"\n{'stage':>33} {'rows':>11} {'rows/s':>12} {'baseline':>12} {'change':>8} {'peak RSS':>10}")
+    for result in results:
+        before = previous.get((result['stage'], result['rows']))
+        if before is None or 'error' in result:
+            continue
+        change = result['rows_per_sec'] / before['rows_per_sec'] - 1
+        flag = ''
+        if change < -tolerance:
+            regressions.append((result['stage'], result['rows']))
+            flag = '  REGRESSION'
+        print(f"{result['stage']:>33} {result['rows']:>11,} {result['rows_per_sec']:>12,.0f} "
+              f"{before['rows_per_sec']:>12,.0f} {change:>+7.0%} "
+              f"{result['peak_rss_mb']:>6,.0f}MB ({result['peak_rss_mb'] - before['peak_rss_mb']:+,.0f}){flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        help="comma-separated row counts (10000000 for the full 10M run)")
+    parser.add_argument('--stages', default=','.join(STAGES), help="comma-separated subset of: " + ', '.join(STAGES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="results file (default benchmarks/results/suite-<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="allowed throughput drop vs the baseline before a stage counts as a regression")
+    parser.add_argument('--verbose', action='store_true', help="show the stages' own progress output")
+    parser.add_argument('--worker', nargs=2, metavar=('STAGE', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]), args.seed)
+        sys.exit(0)
+
+    stages = args.stages.split(',')
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = []
+    print(f"{'stage':>33} {'rows':>11} {'seconds':>9} {'rows/s':>12} {'peak RSS':>10}")
+    for rows in [int(s) for s in args.sizes.split(',')]:
+        for stage in stages:
+            max_rows = STAGES[stage][2]
+            if max_rows is not None and rows > max_rows:
+                print(f"{stage:>33} {rows:>11,}   skipped (input format holds at most {max_rows:,} rows)")
+                continue
+            result = measure(stage, rows, args.seed, args.verbose)
+            results.append(result)
+            if 'error' in result:
+                print(f"{stage:>33} {rows:>11,}   failed: {result['error']}")
+            else:
+                print(f"{stage:>33} {rows:>11,} {result['seconds']:>9.2f} {result['rows_per_sec']:>12,.0f} "
+                      f"{result['peak_rss_mb']:>8,.0f}MB")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({'environment': environment(), 'seed': args.seed, 'results': results}, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
@@ -0,0 +1,152 @@
+"""
+Deterministic synthetic data in the same schemas the collectors write.
+
+Every generator takes (rows, seed) and returns the same DataFrame for the same
+arguments. Text mixes English, Hinglish and Devanagari with the noise the
+cleaners exist to remove: HTML, URLs, mentions, hashtags, emoji and
+elongated words.
+"""
+
+import numpy as np
+import pandas as pd
+
+FRAGMENTS = [
+    "ordered biryani from zomato and it arrived cold",
+    "the delivery partner was super polite even in the heavy rain",
+    "refund still not processed after three days",
+    "customer support closed my ticket without any reply",
+    "great discount on the gold membership this week",
+    "swiggy was faster than zomato today",
+    "khana bahut accha tha yaar",
+    "delivery boy ne call hi nahi kiya",
+    "paisa vasool order tha bhai",
+    "खाना बहुत अच्छा था",
+    "डिलीवरी बहुत देर से आई",
+    "ज़ोमैटो का ऐप फिर से क्रैश हो गया",
+    "soooo gooood", "yummmmm", "worst experience everrrr", "loveeee this app",
+    "<b>Update:</b> order cancelled", "fries &amp; burger combo", "<br>please fix this<br>",
+    "🔥🔥", "😋", "🙏",
+]
+MENTIONS = ["@zomato", "@zomatocare", "@swiggy_in", "@deepigoyal", "@blinkit"]
+HASHTAGS = ["#zomato", "#foodie", "#MumbaiRains", "#deliveryfail", "#दिल्ली", "#biryani"]
+URLS = ["https://zoma.to/r/abc123", "http://bit.ly/3xYz", "www.zomato.com/offers", "https://t.co/Qx81"]
+NAMES = ["Rahul Sharma", "Priya", "Foodie​ Mumbai", "ｆｕｌｌ　width", "दिल्ली Eats", "Ankit K."]
+LOCATIONS = ['mumbai', 'delhi', 'bangalore', 'pune', 'india', 'IndianStreetBets', 'indiasocial']
+COUNTS = ['0', '7', '39', '137', '1,234', '1.2K', '16K', '2.5M', '']
+
+BASE_TWEET_ID = 1_950_000_000_000_000_000
+
+
+def synthetic_text(rows, rng, min_fragments=1, max_fragments=5):
+    fragments = np.array(FRAGMENTS, dtype=object)
+    picks = rng.integers(len(FRAGMENTS), size=(rows, max_fragments))
+    counts = rng.integers(min_fragments, max_fragments + 1, size=rows)
+    mentions = np.array(MENTIONS, dtype=object)[rng.integers(len(MENTIONS), size=rows)]
+    hashtags = np.array(HASHTAGS, dtype=object)[rng.integers(len(HASHTAGS), size=rows)]
+    urls = np.array(URLS, dtype=object)[rng.integers(len(URLS), size=rows)]
+    noise = rng.random((rows, 3)) < (0.4, 0.3, 0.2)
+    texts = []
+    for i in range(rows):
+        parts = list(fragments[picks[i, :counts[i]]])
+        if noise[i, 0]:
+            parts.insert(0, mentions[i])
+        if noise[i, 1]:
+            parts.append(hashtags[i])
+        if noise[i, 2]:
+            parts.append(urls[i])
+        texts.append(' '.join(parts))
+    return texts
+
+
+def tweets(rows, seed=0):
+    """Rows shaped like data/zomato_tweets.csv."""
+    rng = np.random.default_rng(seed)
+    ids = BASE_TWEET_ID + np.arange(rows, dtype=np.int64) * 7919
+    authors = [f"@user{a}" for a in rng.integers(50_000, size=rows)]
+    has_tags = rng.random(rows) < 0.3
+    tags = np.array(HASHTAGS, dtype=object)[rng.integers(len(HASHTAGS), size=rows)]
+    counts = np.array(COUNTS, dtype=object)
+    return pd.DataFrame({
+        'tweet_id': ids.astype(str),
+        'tweet_url': [f"https://x.com/{a[1:]}/status/{t}" for a, t in zip(authors, ids.tolist())],
+        'author': authors,
+        'text': synthetic_text(rows, rng),
+        'likes': counts[rng.integers(len(counts), size=rows)],
+        'retweets': counts[rng.integers(len(counts), size=rows)],
+        'hashtags': [f"['{t}']" if h else None for t, h in zip(tags, has_tags)],
+    })
+
+
+def reddit(rows, seed=0):
+    """Rows shaped like reddit_rawdata.csv: one post per five comments, some deleted."""
+    rng = np.random.default_rng(seed)
+    is_post = np.arange(rows) % 6 == 0
+    text = synthetic_text(rows, rng)
+    text = [f"Title: {t[:40]}. Body: {t}" if post else t for t, post in zip(text, is_post)]
+    deleted = rng.random(rows) < 0.02
+    text = ['[deleted]' if d else t for t, d in zip(text, deleted)]
+    authors = np.array([f"redditor{a}" for a in range(10_000)], dtype=object)
+    return pd.DataFrame({
+        'source_platform': np.where(is_post, 'Reddit_Post', 'Reddit_Comment'),
+        'text': text,
+        'location': np.array(LOCATIONS, dtype=object)[rng.integers(len(LOCATIONS), size=rows)],
+        'hashtags': None,
+        'urls': [f"https://www.reddit.com/r/x/comments/{i:x}/" if post else None
+                 for i, post in enumerate(is_post)],
+        'post_author': authors[rng.integers(len(authors), size=rows)],
+        'post_score': rng.integers(0, 5000, size=rows),
+        'comment_count': rng.integers(0, 400, size=rows),
+        'upvote_ratio': np.round(rng.uniform(0.5, 1.0, size=rows), 2),
+        'comment_author': np.where(is_post, None, authors[rng.integers(len(authors), size=rows)]),
+        'comment_score': np.where(is_post, np.nan, rng.integers(-20, 900, size=rows)),
+    })
+
+
+def youtube_comments(rows, seed=0):
+    """Rows shaped like data/youtube_comments.csv."""
+    rng = np.random.default_rng(seed)
+    published = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 230 * 86400, size=rows), unit='s')
+    return pd.DataFrame({
+        'video_id': [f"vid{v:08d}" for v in rng.integers(5000, size=rows)],
+        'comment_text': synthetic_text(rows, rng, max_fragments=3),
+        'author': [f"@viewer{a}" for a in rng.integers(100_000, size=rows)],
+        'like_count': rng.integers(0, 2000, size=rows),
+        'publish_date': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'reply_count': rng.integers(0, 30, size=rows),
+    })
+
+
+def instagram(rows, seed=0):
+    """Rows shaped like the raw Instagram export that clean_insta_slim reads."""
+    rng = np.random.default_rng(seed)
+    posted = pd.Timestamp('2025-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 230 * 86400, size=rows), unit='s')
+    names = np.array(NAMES + [None], dtype=object)
+    first_comment = synthetic_text(rows, rng, max_fragments=2)
+    return pd.DataFrame({
+        'ownerUsername': [f"@Insta_User{a}" for a in rng.integers(20_000, size=rows)],
+        'ownerFullName': names[rng.integers(len(names), size=rows)],
+        'url': [f"https://www.instagram.com/p/{i:011d}/" for i in range(rows)],
+        'caption': synthetic_text(rows, rng),
+        'firstComment': np.where(rng.random(rows) < 0.3, None, np.array(first_comment, dtype=object)),
+        'likesCount': rng.integers(0, 50_000, size=rows),
+        'commentsCount': np.where(rng.random(rows) < 0.05, np.nan, rng.integers(0, 900, size=rows)),
+        'timestamp': posted.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+    })
+
+
+def engagement_counts(rows, seed=0):
+    """Like/retweet counts as X displays them."""
+    rng = np.random.default_rng(seed)
+    return pd.Series(np.array(COUNTS, dtype=object)[rng.integers(len(COUNTS), size=rows)])
+
+
+def write_xlsx(df, path):
+    """Writes `df` as an .xlsx with openpyxl's streaming writer (Excel caps sheets at 1,048,575 rows)."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(path)
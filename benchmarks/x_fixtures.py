@@ -0,0 +1,78 @@
+"""Synthetic X search-page markup using the same data-testid structure the spider scrapes."""
+
+import html
+
+
+def tweet_article(i):
+    tags = ''.join(f' <a href="/hashtag/tag{i % 5}{k}">#tag{i % 5}{k}</a>' for k in range(i % 3))
+    return f"""
+<article data-testid="tweet">
+  <a href="/user{i % 97}/status/{1956000000000000000 + i}">{i}m</a>
+  <div data-testid="tweetText"><span>{html.escape(f'Tweet number {i} about @zomato delivery')}</span>{tags}</div>
+  <button data-testid="retweet" aria-label="{i * 3:,} reposts. Repost"></button>
+  <button data-testid="like"><span data-testid="app-text-transition-container"><span>{i % 1000 if i % 7 else f'{i % 9}.{i % 10}K'}</span></span></button>
+</article>"""
+
+
+def search_page(count):
+    return "<html><body><main>" + "".join(tweet_article(i) for i in range(count)) + "</main></body></html>"
+
+
+def timeline_tweet(i):
+    """One SearchTimeline entry shaped like x.com's GraphQL response."""
+    tweet_id = str(1956000000000000000 + i)
+    result = {
+        '__typename': 'Tweet',
+        'rest_id': tweet_id,
+        'core': {'user_results': {'result': {'__typename': 'User', 'legacy': {'screen_name': f"user{i % 97}"}}}},
+        'legacy': {
+            'id_str': tweet_id,
+            'full_text': f"Tweet number {i} about @zomato delivery",
+            'favorite_count': i * 1234,
+            'retweet_count': i * 3,
+            'created_at': 'Wed Aug 13 10:00:00 +0000 2025',
+            'entities': {'hashtags': [{'text': f"tag{i % 5}{k}"} for k in range(i % 3)]},
+        },
+    }
+    if i % 10 == 0:
+        result = {'__typename': 'TweetWithVisibilityResults', 'tweet': result}
+    return {'entryId': f"tweet-{tweet_id}", 'content': {
+        'entryType': 'TimelineTimelineItem',
+        'itemContent': {'itemType': 'TimelineTweet', 'tweet_results': {'result': result}},
+    }}
+
+
+def timeline_page(cursor, per_page, total):
+    """Canned SearchTimeline page starting at tweet `cursor`; empty once `total` is reached."""
+    entries = [timeline_tweet(i) for i in range(cursor, min(cursor + per_page, total))]
+    entries.append({'entryId': f"cursor-bottom-{cursor + per_page}", 'content': {
+        'entryType': 'TimelineTimelineCursor', 'value': str(cursor + per_page), 'cursorType': 'Bottom'}})
+    instructions = [{'type': 'TimelineAddEntries', 'entries': entries}]
+    return {'data': {'search_by_raw_query': {'search_timeline': {'timeline': {'instructions': instructions}}}}}
+
+
+# A page that loads timeline JSON the way the web client does: on load and whenever it is scrolled to the bottom
+TIMELINE_SEARCH_PAGE = """<html><body style="margin:0"><main id="feed"></main><script>
+let cursor = 0, loading = false;
+async function loadMore() {
+  if (loading) return;
+  loading = true;
+  const r = await fetch('/i/api/graphql/fixture/SearchTimeline?cursor=' + cursor);
+  const body = await r.json();
+  const entries = body.data.search_by_raw_query.search_timeline.timeline.instructions[0].entries;
+  for (const e of entries) {
+    if (e.content.entryType === 'TimelineTimelineCursor') { cursor = e.content.value; continue; }
+    const div = document.createElement('article');
+    div.setAttribute('data-testid', 'tweet');
+    div.style.height = '300px';
+    div.textContent = e.entryId;
+    document.getElementById('feed').appendChild(div);
+  }
+  document.getElementById('feed').appendChild(Object.assign(document.createElement('div'), {style: 'height:2000px'}));
+  loading = false;
+}
+window.addEventListener('scroll', () => {
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 10) loadMore();
+});
+loadMore();
+</script></body></html>"""
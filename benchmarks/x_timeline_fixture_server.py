@@ -0,0 +1,60 @@
+"""Serves a search page plus canned SearchTimeline JSON pages for the spider's network mode."""
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from x_fixtures import TIMELINE_SEARCH_PAGE, timeline_page
+
+
+class XTimelineFixtureServer:
+    """`total` tweets served `per_page` at a time, each timeline response delayed by `latency` seconds."""
+
+    def __init__(self, total=500, per_page=20, latency=0.2):
+        self.total = total
+        self.per_page = per_page
+        self.latency = latency
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def search_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/search?q=zomato"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                if parsed.path.endswith('/SearchTimeline'):
+                    time.sleep(fixture.latency)
+                    cursor = int(dict(urllib.parse.parse_qsl(parsed.query)).get('cursor', 0))
+                    self._send('application/json', json.dumps(timeline_page(cursor, fixture.per_page, fixture.total)))
+                else:
+                    self._send('text/html', TIMELINE_SEARCH_PAGE)
+
+            def _send(self, content_type, body):
+                payload = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,183 @@
+"""Local stand-in for the YouTube Data API v3, with injected latency and quota errors."""
+
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubYouTubeServer:
+    """
+    Serves /youtube/v3/{channels,playlistItems,videos,commentThreads,comments} from generated data.
+
+    latency          seconds added to every response
+    resource_latency per-resource overrides of `latency`, e.g. {'comments': 0.3}
+    error_rate       fraction of requests answered with a 403 quotaExceeded / 429
+    comments_per_video  total top-level comments available for each video
+    uploads          number of videos in the channel's uploads playlist
+    replies          replies per thread: 'cycle' (comment i has i % 7), 'pareto'
+                     (heavy-tailed with shape `reply_alpha`, capped at `max_replies`)
+                     or a function of the thread's comment ID
+    """
+
+    # Every few top-level comments read negative, so reply expansion has something to rank
+    TEXTS = ["comment {i} on {video}", "worst delivery ever, still waiting. comment {i} on {video}",
+             "love the new ad! comment {i} on {video}", "comment {i} on {video}, ok I guess"]
+
+    def __init__(self, latency=0.05, error_rate=0.0, comments_per_video=50, uploads=500, seed=0,
+                 resource_latency=None, replies='cycle', reply_alpha=1.2, max_replies=2_000):
+        self.latency = latency
+        self.resource_latency = resource_latency or {}
+        self.replies = replies
+        self.reply_alpha = reply_alpha
+        self.max_replies = max_replies
+        self.seed = seed
+        self.error_rate = error_rate
+        self.comments_per_video = comments_per_video
+        self.uploads = []
+        self.add_uploads(uploads)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_counts = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/youtube/v3"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_uploads(self, count):
+        """Publishes `count` new videos at the head of the uploads playlist."""
+        start = len(self.uploads)
+        self.uploads = [f"up{i:06d}" for i in range(start + count - 1, start - 1, -1)] + self.uploads
+
+    def reply_count(self, comment_id):
+        """Replies available under thread `comment_id`, the same on every call."""
+        if callable(self.replies):
+            return self.replies(comment_id)
+        if self.replies == 'pareto':
+            # Seeded per comment so the count doesn't depend on request order
+            draw = random.Random(f"{self.seed}:{comment_id}").paretovariate(self.reply_alpha)
+            return min(int(draw) - 1, self.max_replies)
+        return int(comment_id.rsplit('-c', 1)[-1]) % 7
+
+    # --- resources ---
+    def channels(self, params):
+        return {'items': [{'id': params['id'], 'contentDetails': {'relatedPlaylists': {'uploads': 'UUstub'}}}]}
+
+    def playlist_items(self, params):
+        start = int(params.get('pageToken') or 0)
+        end = min(start + min(int(params.get('maxResults', 5)), 50), len(self.uploads))
+        body = {'items': [{'contentDetails': {'videoId': video_id}} for video_id in self.uploads[start:end]]}
+        if end < len(self.uploads):
+            body['nextPageToken'] = str(end)
+        return body
+
+    def videos(self, params):
+        items = []
+        for video_id in params['id'].split(',')[:50]:
+            n = int(video_id[2:]) if video_id.startswith('up') else 0
+            items.append({
+                'id': video_id,
+                'snippet': {'title': f"Video {n}", 'description': '', 'tags': ['stub'],
+                            'publishedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1.6e9 + n * 3600))},
+                'statistics': {'viewCount': str(n * 100), 'likeCount': str(n), 'commentCount': str(n % 50)},
+            })
+        return {'items': items}
+
+    def comment_threads(self, params):
+        video_id = params['videoId']
+        start = int(params.get('pageToken') or 0)
+        page_size = min(int(params.get('maxResults', 20)), 100)
+        end = min(start + page_size, self.comments_per_video)
+        items = [{
+            'id': f"{video_id}-c{i}",
+            'snippet': {
+                'videoId': video_id,
+                'totalReplyCount': self.reply_count(f"{video_id}-c{i}"),
+                'topLevelComment': {'id': f"{video_id}-c{i}", 'snippet': {
+                    'textDisplay': self.TEXTS[i % len(self.TEXTS)].format(i=i, video=video_id),
+                    'authorDisplayName': f"@user{i}",
+                    'likeCount': i * 3,
+                    'publishedAt': '2025-08-19T10:31:24Z',
+                }},
+            },
+        } for i in range(start, end)]
+        body = {'kind': 'youtube#commentThreadListResponse', 'items': items}
+        if end < self.comments_per_video:
+            body['nextPageToken'] = str(end)
+        return body
+
+    def comments(self, params):
+        parent_id = params['parentId']
+        total = self.reply_count(parent_id)
+        start = int(params.get('pageToken') or 0)
+        page_size = min(int(params.get('maxResults', 20)), 100)
+        end = min(start + page_size, total)
+        items = [{
+            'id': f"{parent_id}.r{j}",
+            'snippet': {
+                'parentId': parent_id,
+                'textDisplay': f"reply {j} to {parent_id}",
+                'authorDisplayName': f"@replier{j}",
+                'likeCount': j % 5,
+                'publishedAt': '2025-08-20T08:02:11Z',
+            },
+        } for j in range(start, end)]
+        body = {'kind': 'youtube#commentListResponse', 'items': items}
+        if end < total:
+            body['nextPageToken'] = str(end)
+        return body
+
+    def _handler(self):
+        stub = self
+        routes = {
+            'channels': self.channels,
+            'playlistItems': self.playlist_items,
+            'videos': self.videos,
+            'commentThreads': self.comment_threads,
+            'comments': self.comments,
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                resource = parsed.path.rsplit('/', 1)[-1]
+                params = dict(urllib.parse.parse_qsl(parsed.query))
+                with stub.lock:
+                    stub.request_counts[resource] = stub.request_counts.get(resource, 0) + 1
+                    fail = stub.random.random() < stub.error_rate
+                time.sleep(stub.resource_latency.get(resource, stub.latency))
+
+                if resource not in routes:
+                    self._send(404, {'error': {'code': 404, 'message': 'not found', 'errors': [{'reason': 'notFound'}]}})
+                elif fail:
+                    status, reason = stub.random.choice([(403, 'quotaExceeded'), (429, 'rateLimitExceeded')])
+                    self._send(status, {'error': {'code': status, 'message': reason, 'errors': [{'reason': reason}]}})
+                else:
+                    self._send(200, routes[resource](params))
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
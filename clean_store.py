@@ -0,0 +1,190 @@
+"""
+Incremental cleaning: only rows that have not been cleaned before go through a cleaner.
+
+Each cleaner run is identified by a config key, a hash of the cleaner's
+version and everything that shapes its output (stopword lists, flags,
+library versions). The store remembers, per config key:
+
+  - the tokens produced for each distinct text (keyed by a hash of the text)
+  - which raw rows have already been written to each output file
+
+so a rerun skips rows that are already in the output, takes tokens for
+repeated texts from the store, and cleans only the rest. Changing the config
+(e.g. bumping CLEANER_VERSION) gives a new key, which misses everything and
+makes the output be rewritten in full.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DB = 'data/clean_store.db'
+# Bumped when row_hashes changes, so outputs recorded with the old hashes are rewritten, not appended to
+ROW_HASH_VERSION = 2
+
+
+def config_key(cleaner, **config):
+    """Stable hash of a cleaner name and its output-affecting settings."""
+    blob = json.dumps({'cleaner': cleaner, **config}, sort_keys=True, default=list)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()[:16]
+
+
+def _as_text(column):
+    """A column's values as strings, the same whatever dtype pandas inferred for it; missing values are ''."""
+    if pd.api.types.is_float_dtype(column):
+        # A blank cell turns an integer column into floats; whole numbers still hash as '3', not '3.0'
+        values = column.to_numpy(dtype=float, na_value=np.nan)
+        whole = np.isfinite(values) & (values == np.round(values))
+        text = pd.Series(column.astype(str).to_numpy(dtype=object), index=column.index)
+        text[whole] = values[whole].astype(np.int64).astype(str)
+        text[np.isnan(values)] = ''
+        return text
+    return column.astype('string').fillna('').astype(object)
+
+
+def row_hashes(df):
+    """64-bit hash of every row's values, as signed integers SQLite can store."""
+    text = pd.DataFrame({name: _as_text(column) for name, column in df.items()}, index=df.index)
+    # categorize=False: raw text columns are mostly distinct, so factorizing first only costs time
+    return pd.util.hash_pandas_object(text, index=False, categorize=False).astype('int64')
+
+
+def text_hashes(column):
+    return pd.util.hash_pandas_object(column.astype(object), index=False, categorize=False).astype('int64')
+
+
+class CleanStore:
+
+    def __init__(self, db_path=DEFAULT_STORE_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cleaned_texts (
+                config TEXT NOT NULL,
+                text_hash INTEGER NOT NULL,
+                tokens TEXT NOT NULL,
+                PRIMARY KEY (config, text_hash)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS outputs (
+                output TEXT PRIMARY KEY,
+                config TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS output_rows (
+                output TEXT NOT NULL,
+                row_hash INTEGER NOT NULL,
+                PRIMARY KEY (output, row_hash)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def _with_hashes(self, hashes):
+        """Loads `hashes` into a temp table to join against."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (hash INTEGER PRIMARY KEY)")
+        self.conn.execute("DELETE FROM lookup")
+        self.conn.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", ((int(h),) for h in hashes))
+
+    def tokens(self, config, hashes):
+        """{text_hash: token list} for the hashes already cleaned under `config`."""
+        self._with_hashes(hashes)
+        rows = self.conn.execute(
+            "SELECT c.text_hash, c.tokens FROM lookup JOIN cleaned_texts c "
+            "ON c.config = ? AND c.text_hash = lookup.hash", (config,)
+        )
+        return {text_hash: json.loads(tokens) for text_hash, tokens in rows}
+
+    def save_tokens(self, config, hashes, token_lists):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cleaned_texts (config, text_hash, tokens) VALUES (?, ?, ?)",
+                ((config, int(h), json.dumps(tokens if isinstance(tokens, (list, str)) else list(tokens),
+                                             ensure_ascii=False))
+                 for h, tokens in zip(hashes, token_lists))
+            )
+
+    def written(self, output, hashes):
+        """Boolean mask of the rows in `hashes` already written to `output`."""
+        rows = self.conn.execute("SELECT row_hash FROM output_rows WHERE output = ?", (output,))
+        seen = np.fromiter((h for (h,) in rows), dtype=np.int64)
+        return pd.Series(np.isin(hashes.to_numpy(), seen), index=hashes.index)
+
+    def output_config(self, output):
+        row = self.conn.execute("SELECT config FROM outputs WHERE output = ?", (output,)).fetchone()
+        return row[0] if row else None
+
+    def reset_output(self, output, config):
+        """Forgets what was written to `output`, which is about to be rewritten under `config`."""
+        with self.conn:
+            self.conn.execute("DELETE FROM output_rows WHERE output = ?", (output,))
+            self.conn.execute("INSERT OR REPLACE INTO outputs (output, config) VALUES (?, ?)", (output, config))
+
+    def mark_written(self, output, hashes):
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO output_rows (output, row_hash) VALUES (?, ?)",
+                                  ((output, int(h)) for h in hashes))
+
+    def close(self):
+        self.conn.close()
+
+
+def clean_incremental(df, clean, text_column, token_column, config, output, finish=None, store=None):
+    """
+    Cleans the rows of `df` that are not yet in `output` and appends them to it.
+
+    `clean(frame)` is the full cleaner; it only sees rows whose text has never
+    been cleaned under `config`. Rows it drops (e.g. '[deleted]') stay out of
+    the output, and repeats of a row already written are skipped, like
+    `drop_duplicates`. The output is rewritten from scratch when it is missing
+    or was written under a different config. `finish(rows)`, if given, adds
+    any columns derived from the tokens before the rows are written.
+
+    Returns the written rows and whether they were appended (False when the
+    output was rewritten).
+    """
+    owns_store = store is None
+    store = store or CleanStore()
+    output = str(output)
+    state = f"{config}/rows-v{ROW_HASH_VERSION}"
+    try:
+        if store.output_config(output) != state or not Path(output).exists():
+            print(f"No incremental state for '{output}' under this cleaner config; cleaning everything")
+            store.reset_output(output, state)
+            append = False
+        else:
+            append = True
+
+        hashes = row_hashes(df)
+        new = ~store.written(output, hashes) & ~hashes.duplicated()
+        new_df = df[new].reset_index(drop=True)
+        new_hashes = hashes[new].reset_index(drop=True)
+        print(f"{len(df) - len(new_df)} of {len(df)} rows already in '{output}' or repeated; {len(new_df)} new")
+
+        texts = text_hashes(new_df[text_column])
+        known = store.tokens(config, texts.unique())
+        tokens = pd.Series([known.get(h) for h in texts.tolist()], index=new_df.index, dtype=object)
+        miss = tokens.isna()
+        keep = ~miss
+        print(f"{int(keep.sum())} rows reuse stored tokens; cleaning {int(miss.sum())}")
+
+        if miss.any():
+            cleaned = clean(new_df[miss])
+            tokens.loc[cleaned.index] = cleaned[token_column]
+            keep.loc[cleaned.index] = True
+            store.save_tokens(config, texts[cleaned.index], cleaned[token_column])
+
+        result = new_df[keep].copy()
+        result[token_column] = tokens[keep]
+        if finish is not None:
+            result = finish(result)
+        result.to_csv(output, mode='a' if append else 'w', header=not append, index=False)
+        # Dropped rows are marked too, so they are not recleaned on the next run
+        store.mark_written(output, new_hashes)
+        return result, append
+    finally:
+        if owns_store:
+            store.close()
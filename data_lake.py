@@ -0,0 +1,323 @@
+"""
+Partitioned Parquet store for everything the pipeline collects and cleans.
+
+Each dataset lives under data/lake/<platform>/<stage>/ and is hive-partitioned
+by location and date, e.g. data/lake/reddit/clean/location=mumbai/date=2025-08-20/.
+Readers get column projection and filter pushdown from pyarrow.dataset, so a
+slice such as one subreddit never opens the other partitions' files; the union
+of the files' columns is recorded in the dataset's _common_metadata file, so
+opening a dataset reads that one schema rather than every file's footer.
+Writers only ever add new files, and skip rows whose key the dataset already
+holds, so rerunning a stage doesn't duplicate its output. Each row's key is
+stored hashed in an int64 `row_key` column, so that check reads one compact
+column of the partitions a batch falls into. Token lists are stored as
+list<string> columns rather than stringified into CSV cells.
+"""
+
+import argparse
+import ast
+import uuid
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+LAKE_ROOT = 'data/lake'
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('location', pa.string()), ('date', pa.string())]), flavor='hive'
+)
+
+# Reddit rows have no ID of their own: a comment's URL is its permalink, but a
+# post's is whatever it links to, so the text and authors are part of the key
+REDDIT_KEY = ['urls', 'source_platform', 'post_author', 'comment_author', 'text']
+
+# platform/stage directory, the columns that supply location and date (None when
+# the data has none), the CSV the dataset replaces, its token-list columns, and
+# the columns that identify a row (the first must be set for a row to be matched)
+DATASETS = {
+    'reddit_raw': {'path': 'reddit/raw', 'location': 'location', 'date': None,
+                   'csv': 'data/reddit_rawdata.csv', 'lists': [], 'key': REDDIT_KEY},
+    'reddit_clean': {'path': 'reddit/clean', 'location': 'location', 'date': None,
+                     'csv': 'data/reddit_data_cleaned.csv', 'lists': ['cleaned_text_tokens'], 'key': REDDIT_KEY},
+    'youtube_videos': {'path': 'youtube/videos', 'location': None, 'date': 'publish_date',
+                       'csv': 'data/youtube_official_videos.csv', 'lists': [], 'key': ['video_id']},
+    'youtube_comments': {'path': 'youtube/comments', 'location': None, 'date': 'publish_date',
+                         'csv': 'data/youtube_comments.csv', 'lists': [], 'key': ['comment_id']},
+    'tweets_raw': {'path': 'twitter/raw', 'location': None, 'date': 'created_at',
+                   'csv': 'data/zomato_tweets.csv', 'lists': [], 'key': ['tweet_id']},
+    'tweets_clean': {'path': 'twitter/clean', 'location': None, 'date': 'created_at',
+                     'csv': 'data/twts_clean.csv', 'lists': ['cleaned_tokens'], 'key': ['tweet_id']},
+}
+
+UNKNOWN = 'unknown'
+SCHEMA_FILE = '_common_metadata'   # pyarrow skips files starting with '_' when listing data files
+ROW_KEY = 'row_key'
+
+# Milliseconds between the Unix epoch and X's snowflake epoch
+SNOWFLAKE_EPOCH_MS = 1288834974657
+
+
+def dataset_path(name, root=LAKE_ROOT):
+    return Path(root) / DATASETS[name]['path']
+
+
+def exists(name, root=LAKE_ROOT):
+    return any(dataset_path(name, root).rglob('*.parquet'))
+
+
+def tweet_times(urls):
+    """Posting time (UTC) of each tweet, decoded from the snowflake ID in its status URL."""
+    ids = pd.to_numeric(urls.str.extract(r'/status/(\d+)', expand=False), errors='coerce')
+    ms = (ids // 2**22) + SNOWFLAKE_EPOCH_MS
+    return pd.to_datetime(ms, unit='ms', errors='coerce', utc=True)
+
+
+def tweet_dates(urls):
+    """Posting date (YYYY-MM-DD) of each tweet, decoded from the snowflake ID in its status URL."""
+    return tweet_times(urls).dt.strftime('%Y-%m-%d')
+
+
+def partition_columns(df, name):
+    """The location and date partition keys for each row of `df`."""
+    spec = DATASETS[name]
+    if spec['location']:
+        location = df[spec['location']].astype('string').fillna(UNKNOWN)
+    else:
+        location = pd.Series(UNKNOWN, index=df.index, dtype='string')
+
+    if spec['date'] and spec['date'] in df.columns:
+        day = pd.to_datetime(df[spec['date']], errors='coerce', utc=True).dt.strftime('%Y-%m-%d')
+    else:
+        day = pd.Series(pd.NA, index=df.index, dtype='string')
+    if 'tweet_url' in df.columns:
+        day = day.fillna(tweet_dates(df['tweet_url']))
+    # Data with no timestamp of its own is filed under the day it was written
+    day = day.fillna(date.today().isoformat())
+    return location, day
+
+
+def _key_hashes(df, columns):
+    # Compared as text, so a key read back from Parquet matches one parsed from a CSV
+    hashes = pd.util.hash_pandas_object(df[columns].astype('string').fillna(''), index=False)
+    return hashes.to_numpy().view(np.int64)
+
+
+def _stored_keys(name, location, day, root=LAKE_ROOT):
+    """
+    Row keys held by the partitions of dataset `name` that rows filed under
+    `location` and `day` could already be in. Files written before row keys were
+    stored are hashed from their key columns instead.
+    """
+    spec = DATASETS[name]
+    lake = dataset(name, root)
+    if not set(spec['key']) <= set(lake.schema.names):
+        return np.empty(0, dtype=np.int64)
+    scope = ds.field('location').isin(location.unique().tolist())
+    # Without a date column of its own, a row is filed under the day it was written,
+    # so a repeat of it can be in any of its location's date partitions
+    if spec['date']:
+        scope &= ds.field('date').isin(day.unique().tolist())
+
+    if ROW_KEY in lake.schema.names:
+        stored = lake.to_table(columns=[ROW_KEY], filter=scope).column(ROW_KEY)
+        if not stored.null_count:
+            return stored.to_numpy()
+
+    keys = []
+    for fragment in lake.get_fragments(filter=scope):
+        if ROW_KEY in lake.schema.names:
+            column = fragment.to_table(columns=[ROW_KEY], schema=lake.schema).column(ROW_KEY)
+            if not column.null_count:
+                keys.append(column.to_numpy())
+                continue
+        legacy = fragment.to_table(columns=spec['key'], schema=lake.schema).to_pandas()
+        keys.append(_key_hashes(legacy, spec['key']))
+    return np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+
+
+def new_rows(df, name, root=LAKE_ROOT):
+    """
+    The rows of `df` whose key is neither already in dataset `name` nor repeated
+    earlier in `df`. Rows with no key value, or a frame without the key columns,
+    are all kept. `df` must carry the partition columns, as `append` adds them.
+    """
+    columns = DATASETS[name]['key']
+    if df.empty or not set(columns) <= set(df.columns):
+        return df
+    keyed = df[columns[0]].notna().to_numpy()
+    hashes = df[ROW_KEY].to_numpy() if ROW_KEY in df.columns else _key_hashes(df, columns)
+    seen = pd.Series(hashes).duplicated().to_numpy().copy()
+    if exists(name, root):
+        stored = _stored_keys(name, df['location'], df['date'], root)
+        # Probe the stored keys against the batch's, hashing the smaller side
+        seen |= np.isin(hashes, stored[pd.Series(stored).isin(hashes).to_numpy()])
+    return df[~(keyed & seen)]
+
+
+def append(df, name, root=LAKE_ROOT):
+    """
+    Appends the rows of `df` that dataset `name` doesn't hold yet (see `new_rows`)
+    as new Parquet files, one per partition touched. Existing files are never
+    rewritten. Returns the number of rows written.
+    """
+    if df.empty:
+        return 0
+    location, day = partition_columns(df, name)
+    # A partition key that is also a data column would be written twice
+    df = df.drop(columns=['location', 'date'], errors='ignore').assign(location=location, date=day)
+    if 'tweet_url' in df.columns:
+        # Excel rounded tweet_id in the CSVs; the status URL still has it exactly
+        df['tweet_id'] = df['tweet_url'].str.extract(r'/status/(\d+)', expand=False)
+    key = DATASETS[name]['key']
+    if set(key) <= set(df.columns):
+        df[ROW_KEY] = _key_hashes(df, key)
+    df = new_rows(df, name, root)
+    if df.empty:
+        return 0
+
+    schema = None
+    if exists(name, root):
+        # Match earlier files so a chunk whose column is all-null doesn't change its type
+        existing = dataset(name, root).schema
+        if set(existing.names) == set(df.columns):
+            schema = existing
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    ds.write_dataset(
+        table, dataset_path(name, root), format='parquet', partitioning=PARTITIONING,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    _record_schema(dataset_path(name, root), table.schema)
+    return len(df)
+
+
+def dataset(name, root=LAKE_ROOT):
+    """
+    Dataset `name` with the union of its files' columns, as `append` records it.
+    pyarrow would otherwise take the schema of the first file it finds, hiding
+    columns that later files added; files without a column read it as null.
+    """
+    path = dataset_path(name, root)
+    return ds.dataset(path, format='parquet', partitioning=PARTITIONING, schema=_stored_schema(path))
+
+
+def _stored_schema(path):
+    schema_file = path / SCHEMA_FILE
+    if schema_file.exists():
+        return pq.read_schema(schema_file)
+    # Datasets written before the schema was recorded are unified from their files once
+    files = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+    schemas = [fragment.physical_schema for fragment in files.get_fragments()]
+    if not schemas:
+        return None
+    return _record_schema(path, pa.unify_schemas(schemas, promote_options='permissive'))
+
+
+def _record_schema(path, schema):
+    """Widens the dataset's recorded schema to cover `schema`; returns the result."""
+    schema_file = path / SCHEMA_FILE
+    schemas = [schema.remove_metadata(), PARTITIONING.schema]
+    if schema_file.exists():
+        schemas.insert(0, pq.read_schema(schema_file))
+    unified = pa.unify_schemas(schemas, promote_options='permissive')
+    if not schema_file.exists() or not unified.equals(schemas[0]):
+        # Written aside and moved into place, so a reader never sees half a file
+        partial = path / f"{SCHEMA_FILE}.{uuid.uuid4().hex}"
+        pq.write_metadata(unified, partial)
+        partial.replace(schema_file)
+    return unified
+
+
+def filter_expression(filters):
+    """
+    Turns {'location': 'mumbai', 'date': ('>=', '2025-08-01')} into a pyarrow
+    expression. A list or set value means "any of", a tuple is (operator, value).
+    """
+    expression = None
+    for column, value in (filters or {}).items():
+        field = ds.field(column)
+        if isinstance(value, (list, set)):
+            condition = field.isin(list(value))
+        elif isinstance(value, tuple):
+            op, operand = value
+            condition = {'==': field == operand, '!=': field != operand, '<': field < operand,
+                         '<=': field <= operand, '>': field > operand, '>=': field >= operand}[op]
+        else:
+            condition = field == value
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read(name, columns=None, filters=None, root=LAKE_ROOT):
+    """
+    Reads a slice of dataset `name` into a DataFrame. Partitions that `filters`
+    rules out are skipped without being opened, and only `columns` are decoded.
+    """
+    lake = dataset(name, root)
+    table = lake.to_table(columns=columns or _data_columns(lake), filter=filter_expression(filters))
+    return _to_pandas(table)
+
+
+def iter_batches(name, columns=None, filters=None, batch_size=100_000, root=LAKE_ROOT):
+    """Like `read`, but yields DataFrames of at most `batch_size` rows."""
+    lake = dataset(name, root)
+    scanner = lake.scanner(columns=columns or _data_columns(lake), filter=filter_expression(filters),
+                           batch_size=batch_size)
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield _to_pandas(pa.Table.from_batches([batch]))
+
+
+def _data_columns(lake):
+    # The stored row key is the lake's own bookkeeping, not data
+    return [column for column in lake.schema.names if column != ROW_KEY]
+
+
+def _to_pandas(table):
+    df = table.to_pandas()
+    # Token lists come back as Python lists, as the cleaners produce them
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = table.column(field.name).to_pylist()
+    return df
+
+
+def _parse_token_list(value):
+    if isinstance(value, str) and value.startswith('['):
+        return ast.literal_eval(value)
+    return None
+
+
+def import_csv(name, csv_path=None, chunksize=100_000, root=LAKE_ROOT):
+    """Appends an existing CSV hand-off file to the lake, restoring token lists from their string form."""
+    spec = DATASETS[name]
+    total = 0
+    for chunk in pd.read_csv(csv_path or spec['csv'], chunksize=chunksize, dtype={'tweet_id': str}):
+        for column in spec['lists']:
+            if column in chunk.columns:
+                chunk[column] = chunk[column].map(_parse_token_list)
+        total += append(chunk, name, root)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import the CSV hand-off files in data/ into the Parquet lake.")
+    parser.add_argument('names', nargs='*', default=list(DATASETS), help="datasets to import (default: all)")
+    parser.add_argument('--force', action='store_true', help="import even if the dataset already has data "
+                                                             "(rows it already holds are skipped)")
+    args = parser.parse_args()
+
+    for name in args.names:
+        csv_path = DATASETS[name]['csv']
+        if not Path(csv_path).exists():
+            print(f"{name}: '{csv_path}' not found, skipping")
+        elif exists(name) and not args.force:
+            print(f"{name}: already imported, skipping (use --force to append again)")
+        else:
+            rows = import_csv(name)
+            print(f"{name}: {rows} rows from '{csv_path}' -> {dataset_path(name)}")
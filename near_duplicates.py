@@ -0,0 +1,355 @@
+"""
+Near-duplicate detection over cleaned tokens with MinHash and LSH banding.
+
+Each document becomes a set of token bigrams (or of its single token),
+hashed from the token strings so ids from different TokenCorpus
+vocabularies agree. NUM_PERM MinHash values are computed for every
+document at once with NumPy multiply-shift hashing, then cut into BANDS
+bands. Documents that share a whole band are candidates; candidates whose
+signatures agree on at least `threshold` of their positions are linked.
+
+Clusters are labelled by their earliest document (the canonical one), so
+labels stay stable as new batches are added with `NearDuplicateIndex.add`.
+Band keys are kept sorted per band: a new batch finds the earlier documents
+in its buckets with binary search, and each new document is compared with
+every member of the buckets it falls into. Exact copies are clustered on
+their whole signature and kept out of the buckets.
+Memory is about 230 bytes per indexed document.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from token_corpus import TokenCorpus
+
+NUM_PERM = 64
+BANDS = 8
+THRESHOLD = 0.8
+BATCH_DOCS = 500_000   # documents hashed at a time, to bound the temporary arrays
+LINK_PAIRS = 5_000_000   # candidate pairs verified at a time
+
+EMPTY = np.uint64(0)   # band key of documents without tokens; they are never matched
+SIGNATURE_DTYPE = np.uint16   # b-bit MinHash: low 16 bits are plenty to compare signatures
+
+
+def token_hashes(vocab):
+    """64-bit hash of each vocabulary string."""
+    return pd.util.hash_pandas_object(pd.Series(vocab, dtype=object), index=False, categorize=False).to_numpy()
+
+
+def _shingles(corpus):
+    """Hashed token bigrams per document (single-token documents keep their token), CSR-style."""
+    hashes = token_hashes(corpus.vocab)[corpus.token_ids]
+    lengths = corpus.lengths.astype(np.int64)
+    starts = corpus.offsets[:-1].astype(np.int64)
+    # A bigram starts at every token except the last of its document
+    is_last = np.zeros(len(hashes), dtype=bool)
+    is_last[(starts + lengths - 1)[lengths > 0]] = True
+    first = np.flatnonzero(~is_last)
+    # Wrapping uint64 arithmetic is intended here
+    with np.errstate(over='ignore'):
+        bigrams = hashes[first] * np.uint64(0x9E3779B97F4A7C15) + hashes[first + 1]
+    single = (starts[lengths == 1]).astype(np.int64)
+    counts = np.maximum(lengths - 1, 0)
+    counts[lengths == 1] = 1
+    values = np.empty(int(counts.sum()), dtype=np.uint64)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    # Bigrams are already in document order; single-token documents slot in at their offset
+    is_single = np.zeros(len(values), dtype=bool)
+    is_single[offsets[:-1][lengths == 1]] = True
+    values[is_single] = hashes[single]
+    values[~is_single] = bigrams
+    return values, offsets
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash(corpus, num_perm=NUM_PERM, seed=1):
+    """
+    (docs, num_perm) uint32 MinHash signatures of a TokenCorpus; documents
+    without tokens get all-ones rows. One vectorized pass per permutation.
+    """
+    values, offsets = _shingles(corpus)
+    a, b = _permutations(num_perm, seed)
+    docs = len(offsets) - 1
+    signatures = np.full((docs, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    nonempty = np.flatnonzero(np.diff(offsets) > 0)
+    if len(nonempty):
+        starts = offsets[nonempty]
+        with np.errstate(over='ignore'):
+            for k in range(num_perm):
+                # Multiply-shift: the top 32 bits of a*x + b are a universal hash of x
+                hashed = ((values * a[k] + b[k]) >> np.uint64(32)).astype(np.uint32)
+                signatures[nonempty, k] = np.minimum.reduceat(hashed, starts)
+    return signatures
+
+
+def band_keys(signatures, bands=BANDS):
+    """(docs, bands) uint64 key per band; equal keys mean the band's MinHash values all agree."""
+    rows = signatures.shape[1] // bands
+    keys = np.empty((len(signatures), bands), dtype=np.uint64)
+    empty = signatures[:, 0] == np.iinfo(np.uint32).max
+    with np.errstate(over='ignore'):
+        for band in range(bands):
+            key = np.full(len(signatures), np.uint64(band) + np.uint64(1), dtype=np.uint64)
+            for column in signatures[:, band * rows:(band + 1) * rows].T:
+                key = key * np.uint64(0x100000001B3) ^ column.astype(np.uint64)
+            key[key == EMPTY] = np.uint64(1)
+            key[empty] = EMPTY
+            keys[:, band] = key
+    return keys
+
+
+class NearDuplicateIndex:
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.seed = seed
+        # Signatures and cluster labels live in buffers that grow geometrically,
+        # so adding a batch does not copy everything indexed so far
+        self.size = 0
+        self._signatures = np.empty((0, num_perm), dtype=SIGNATURE_DTYPE)
+        self._cluster = np.empty(0, dtype=np.int64)
+        # Per band: keys in sorted order and the document each belongs to
+        self.band_keys = [np.empty(0, dtype=np.uint64) for _ in range(bands)]
+        self.band_docs = [np.empty(0, dtype=np.int32) for _ in range(bands)]
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def signatures(self):
+        return self._signatures[:self.size]
+
+    @property
+    def cluster(self):
+        """Cluster id of every indexed document: the position of its cluster's first document."""
+        return self._cluster[:self.size]
+
+    def _append(self, signatures):
+        """Stores a batch's signatures; returns the positions given to its documents."""
+        start, end = self.size, self.size + len(signatures)
+        if end > len(self._cluster):
+            capacity = max(end, 2 * len(self._cluster))
+            grown = np.empty((capacity, self.num_perm), dtype=SIGNATURE_DTYPE)
+            grown[:start] = self.signatures
+            self._signatures = grown
+            grown = np.empty(capacity, dtype=np.int64)
+            grown[:start] = self.cluster
+            self._cluster = grown
+        ids = np.arange(start, end, dtype=np.int64)
+        self._signatures[start:end] = signatures
+        self._cluster[start:end] = ids
+        self.size = end
+        return ids
+
+    def add(self, docs):
+        """
+        Indexes a batch of documents (a TokenCorpus, or token lists / cleaned
+        strings) and returns their cluster ids: the position, in insertion
+        order, of each cluster's first document.
+        """
+        if not isinstance(docs, TokenCorpus):
+            docs = TokenCorpus.from_series(pd.Series(list(docs), dtype=object))
+        corpus = docs
+        start = len(self)
+        for first in range(0, len(corpus), BATCH_DOCS):
+            rows = np.arange(first, min(first + BATCH_DOCS, len(corpus)))
+            self._add_batch(corpus.select(rows) if len(corpus) > BATCH_DOCS else corpus)
+        return self.cluster[start:].copy()
+
+    def _add_batch(self, corpus):
+        signatures = minhash(corpus, self.num_perm, self.seed)
+        keys = band_keys(signatures, self.bands)
+        ids = self._append(signatures.astype(SIGNATURE_DTYPE))
+        real = np.flatnonzero(keys[:, 0] != EMPTY)
+        if not len(real):
+            return
+
+        # Exact copies within the batch join their first occurrence's cluster and stay
+        # out of the band tables: any document matching a copy matches the original
+        _, first, group = np.unique(keys[real], axis=0, return_index=True, return_inverse=True)
+        self._link(ids[real[first]][group.ravel()], ids[real])
+        distinct = np.sort(real[first])
+
+        for band in range(self.bands):
+            new_keys, new_docs = keys[distinct, band], ids[distinct]
+            old_keys, old_docs = self.band_keys[band], self.band_docs[band]
+
+            # Earlier documents in the buckets this batch falls into, by binary search in the sorted keys
+            touched = np.unique(new_keys)
+            lo, hi = np.searchsorted(old_keys, touched, 'left'), np.searchsorted(old_keys, touched, 'right')
+            counts = hi - lo
+            positions = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            self._link_buckets(np.concatenate([old_keys[positions], new_keys]),
+                               np.concatenate([old_docs[positions].astype(np.int64), new_docs]), ids[0])
+
+            # Merge the batch into the sorted band table
+            order = np.argsort(new_keys, kind='stable')
+            insert_at = np.searchsorted(old_keys, new_keys[order], 'right')
+            self.band_keys[band] = np.insert(old_keys, insert_at, new_keys[order])
+            self.band_docs[band] = np.insert(old_docs, insert_at, new_docs[order])
+
+    def _link_buckets(self, keys, docs, first_new):
+        """
+        Links documents that share a bucket `key`: every new document (position
+        `first_new` on) is a candidate with every member before it in its bucket.
+        Candidates already in the same cluster are not verified again.
+        """
+        order = np.lexsort((docs, keys))
+        keys, docs = keys[order], docs[order]
+        position = np.arange(len(keys))
+        run_start = np.maximum.accumulate(np.where(np.r_[True, keys[1:] != keys[:-1]], position, 0))
+        # Older documents sort first in a bucket, so each new one pairs with everything before it
+        earlier = np.where(docs >= first_new, position - run_start, 0)
+
+        # Candidates are generated LINK_PAIRS at a time to bound memory on crowded buckets
+        total = np.cumsum(earlier)
+        bounds = np.searchsorted(total, np.arange(LINK_PAIRS, int(total[-1]), LINK_PAIRS), 'right')
+        for chunk in np.split(position, bounds):
+            counts = earlier[chunk]
+            later = docs[np.repeat(chunk, counts)]
+            offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            before = docs[np.repeat(run_start[chunk], counts) + offset]
+            unlinked = self.cluster[before] != self.cluster[later]
+            self._link(before[unlinked], later[unlinked])
+
+    def _link(self, a, b):
+        """Verifies candidate pairs on their signatures and merges the clusters of those that match."""
+        pairs = np.unique(np.stack([np.minimum(a, b), np.maximum(a, b)], axis=1), axis=0)
+        if not len(pairs):
+            return
+        agreement = (self.signatures[pairs[:, 0]] == self.signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[agreement >= self.threshold]
+        if not len(pairs):
+            return
+
+        # Connected components over the clusters the matching pairs touch
+        ends = self.cluster[pairs]
+        nodes, local = np.unique(ends, return_inverse=True)
+        local = local.reshape(-1, 2)
+        graph = coo_matrix((np.ones(len(local)), (local[:, 0], local[:, 1])), shape=(len(nodes), len(nodes)))
+        _, labels = connected_components(graph, directed=False)
+        # Each component is labelled by its earliest document (nodes are sorted, so the first seen)
+        first = np.full(labels.max() + 1, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, labels, nodes)
+        new_label = first[labels]
+
+        changed = new_label != nodes
+        if changed.any():
+            nodes, new_label = nodes[changed], new_label[changed]
+            position = np.searchsorted(nodes, self.cluster)
+            position[position == len(nodes)] = 0
+            hit = nodes[position] == self.cluster
+            self.cluster[hit] = new_label[position[hit]]
+
+    # --- results ---
+    def is_canonical(self):
+        """True for the first document of each cluster (and for every singleton)."""
+        return self.cluster == np.arange(len(self))
+
+    def cluster_sizes(self):
+        return np.bincount(self.cluster, minlength=len(self))[self.cluster]
+
+    def frame(self):
+        """cluster_id, is_canonical and cluster_size for every indexed document, in insertion order."""
+        return pd.DataFrame({
+            'cluster_id': self.cluster,
+            'is_canonical': self.is_canonical(),
+            'cluster_size': self.cluster_sizes(),
+        })
+
+    # --- persistence ---
+    def save(self, path):
+        """Writes the index as a directory of .npy files."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / 'params.npy', np.array([self.num_perm, self.bands, self.seed, self.threshold]))
+        np.save(path / 'signatures.npy', self.signatures)
+        np.save(path / 'cluster.npy', self.cluster)
+        np.save(path / 'band_keys.npy', np.stack(self.band_keys) if len(self) else np.empty((self.bands, 0), np.uint64))
+        np.save(path / 'band_docs.npy', np.stack(self.band_docs) if len(self) else np.empty((self.bands, 0), np.int32))
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        num_perm, bands, seed, threshold = np.load(path / 'params.npy').tolist()
+        index = cls(int(num_perm), int(bands), threshold, int(seed))
+        index._signatures = np.load(path / 'signatures.npy')
+        index._cluster = np.load(path / 'cluster.npy')
+        index.size = len(index._cluster)
+        # Band tables hold the same documents (those with tokens, less exact copies), so all bands have the same length
+        index.band_keys = list(np.load(path / 'band_keys.npy'))
+        index.band_docs = list(np.load(path / 'band_docs.npy'))
+        return index
+
+
+def mark_duplicates(df, column, index=None, prefix=''):
+    """
+    Adds `cluster_id`, `is_canonical` and `cluster_size` columns for the
+    token lists (or cleaned strings) in `df[column]`, indexing them into
+    `index` (a fresh one if not given). Cluster ids are positions in the index.
+    """
+    if index is None:
+        index = NearDuplicateIndex()
+    start = len(index)
+    index.add(TokenCorpus.from_series(df[column]))
+    result = index.frame().iloc[start:]
+    out = df.copy()
+    for name in result.columns:
+        out[prefix + name] = result[name].to_numpy()
+    return out
+
+
+# Cleaned outputs that can be indexed together: (label, token corpus, or CSV and column)
+SOURCES = [
+    ('twitter', 'data/twts_clean.tokens', None),
+    ('reddit', 'reddit_data_cleaned_2.tokens', None),
+    ('instagram', 'insta_cleaned_slim.csv', 'caption_clean'),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--index', default='data/near_duplicates.idx',
+                        help="where to save the index, for NearDuplicateIndex.load and later add() calls")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--output', default='data/near_duplicates.csv')
+    args = parser.parse_args()
+
+    # Indexing is always from scratch here, so cluster ids line up with the rows listed below
+    index = NearDuplicateIndex(threshold=args.threshold)
+    labels = []
+    for platform, path, column in SOURCES:
+        if not Path(path).exists():
+            print(f"Skipping {platform}: '{path}' not found")
+            continue
+        if column is None:
+            corpus = TokenCorpus.load(path)
+        else:
+            corpus = TokenCorpus.from_series(pd.read_csv(path, usecols=[column])[column].fillna(''))
+        index.add(corpus)
+        labels.append(pd.DataFrame({'platform': platform, 'row': np.arange(len(corpus))}))
+        print(f"Indexed {len(corpus)} {platform} documents")
+
+    if labels:
+        result = pd.concat(labels, ignore_index=True).join(index.frame())
+        result.to_csv(args.output, index=False)
+        index.save(args.index)
+        duplicates = int((~result['is_canonical']).sum())
+        print(f"{duplicates} of {len(result)} documents are near-duplicates of an earlier one "
+              f"(Jaccard >= {args.threshold}); clusters written to '{args.output}'")
@@ -0,0 +1,284 @@
+"""
+Per-stage timing, memory and row counts for the cleaners, and call latency
+percentiles for the collectors.
+
+Off by default. Set PIPELINE_PROFILE to a comma-separated list of options:
+
+    PIPELINE_PROFILE=1                  wall time, rows/s and row deltas per stage
+    PIPELINE_PROFILE=memory             ... plus tracemalloc peak per stage (slows Python code down)
+    PIPELINE_PROFILE=memory,cprofile    ... plus a cProfile dump of the whole run
+
+When the process exits the report is printed and written to
+PIPELINE_PROFILE_DIR (default data/profiles) as JSON and CSV, plus a .prof
+file with cprofile. When profiling is off, `stage` and `latency` return a shared
+no-op context, so the instrumentation can stay in place.
+"""
+
+import atexit
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from pathlib import Path
+
+ENV_VAR = 'PIPELINE_PROFILE'
+DIR_ENV_VAR = 'PIPELINE_PROFILE_DIR'
+DEFAULT_DIR = 'data/profiles'
+PERCENTILES = (50, 90, 95, 99)
+CSV_COLUMNS = ['name', 'depth', 'start', 'seconds', 'rows_in', 'rows_out', 'rows_delta', 'rows_per_sec', 'peak_mb']
+
+
+class _NullStage:
+    """Stands in for a Stage when profiling is off; setting rows_out is a no-op."""
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+_NULL_LATENCY = nullcontext()
+
+
+class Stage:
+    """One timed block. Set `rows_out` inside the block when the stage drops or adds rows."""
+
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows_in = rows
+        self.rows_out = None
+        self.max_peak = 0
+
+    def __enter__(self):
+        self.profiler._push(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.profiler._pop(self, seconds)
+        return False
+
+
+class Latency:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record_latency(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+
+    def __init__(self, options=()):
+        self.enabled = False
+        self.trace_memory = False
+        self.records = []
+        self.latencies = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.cprofile = None
+        self.started = None
+        if options:
+            self.enable(options)
+
+    def enable(self, options=('time',)):
+        """Turns profiling on; `options` may include 'memory' and 'cprofile'."""
+        if self.enabled:
+            return
+        options = set(options)
+        self.enabled = True
+        self.started = time.time()
+        self.origin = time.perf_counter()
+        self.trace_memory = 'memory' in options
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if 'cprofile' in options:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        atexit.register(self.report)
+
+    # --- instrumentation ---
+    def stage(self, name, rows=None):
+        """Context manager timing one stage that starts with `rows` rows."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return Stage(self, name, rows)
+
+    def timed(self, name=None):
+        """
+        Decorator form of `stage` for functions that take a DataFrame first and
+        return one; rows in and out are taken from their lengths.
+        """
+        def decorate(fn):
+            stage_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                rows = _length(args[0]) if args else None
+                with self.stage(stage_name, rows) as stage:
+                    result = fn(*args, **kwargs)
+                    stage.rows_out = _length(result)
+                return result
+            return wrapper
+        return decorate
+
+    def latency(self, name):
+        """Context manager recording how long one API call took under `name`."""
+        if not self.enabled:
+            return _NULL_LATENCY
+        return Latency(self, name)
+
+    def record_latency(self, name, seconds):
+        with self.lock:
+            self.latencies.setdefault(name, []).append(seconds)
+
+    def _stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def _push(self, stage):
+        stack = self._stack()
+        stage.depth = len(stack)
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The enclosing stage keeps the peak reached so far before it is reset
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+            tracemalloc.reset_peak()
+            stage.base_memory = current
+        stack.append(stage)
+
+    def _pop(self, stage, seconds):
+        stack = self._stack()
+        stack.pop()
+        record = {
+            'name': stage.name,
+            'depth': stage.depth,
+            'start': stage.start - self.origin,
+            'seconds': seconds,
+            'rows_in': stage.rows_in,
+            'rows_out': stage.rows_out if stage.rows_out is not None else stage.rows_in,
+        }
+        if stage.rows_in is not None and record['rows_out'] is not None:
+            record['rows_delta'] = record['rows_out'] - stage.rows_in
+        if stage.rows_in and seconds > 0:
+            record['rows_per_sec'] = stage.rows_in / seconds
+        if self.trace_memory:
+            peak = max(tracemalloc.get_traced_memory()[1], stage.max_peak)
+            record['peak_mb'] = (peak - stage.base_memory) / 2**20
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+        with self.lock:
+            self.records.append(record)
+
+    # --- reporting ---
+    def latency_summary(self):
+        """Count, mean, percentiles and max (in ms) for each latency name."""
+        summary = {}
+        with self.lock:
+            items = {name: sorted(values) for name, values in self.latencies.items()}
+        for name, values in items.items():
+            summary[name] = {
+                'count': len(values),
+                'mean_ms': 1000 * sum(values) / len(values),
+                **{f"p{p}_ms": 1000 * _percentile(values, p) for p in PERCENTILES},
+                'max_ms': 1000 * values[-1],
+            }
+        return summary
+
+    def report(self, directory=None):
+        """Prints the report and writes it as JSON, CSV and (with cprofile) a .prof file."""
+        if not self.enabled or not (self.records or self.latencies or self.cprofile):
+            return None
+        directory = Path(directory or os.environ.get(DIR_ENV_VAR, DEFAULT_DIR))
+        directory.mkdir(parents=True, exist_ok=True)
+        script = Path(sys.argv[0]).stem or 'python'
+        base = directory / f"{script}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))}"
+
+        # Stages finish inner-first; list them in the order they started
+        records = sorted(self.records, key=lambda r: r['start'])
+        latencies = self.latency_summary()
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump({'script': script, 'started': self.started, 'stages': records, 'latency': latencies},
+                      f, indent=2)
+        with open(f"{base}.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            writer.writerows(records)
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(f"{base}.prof")
+
+        print_report(records, latencies)
+        print(f"Profile written to {base}.json")
+        return base
+
+
+def _length(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def _percentile(values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(values) * p // 100))
+    return values[min(rank, len(values)) - 1]
+
+
+def print_report(records, latencies):
+    if records:
+        print(f"\n{'stage':<42} {'seconds':>9} {'rows in':>10} {'delta':>8} {'rows/s':>11} {'peak MB':>8}")
+        for r in records:
+            rows_per_sec = f"{r['rows_per_sec']:,.0f}" if 'rows_per_sec' in r else '-'
+            peak = f"{r['peak_mb']:,.1f}" if 'peak_mb' in r else '-'
+            rows_in = f"{r['rows_in']:,}" if r['rows_in'] is not None else '-'
+            delta = f"{r['rows_delta']:+,}" if r.get('rows_delta') else ''
+            name = '  ' * r['depth'] + r['name']
+            print(f"{name:<42} {r['seconds']:>9.3f} {rows_in:>10} {delta:>8} {rows_per_sec:>11} {peak:>8}")
+    if latencies:
+        print(f"\n{'call':<32} {'count':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, s in sorted(latencies.items()):
+            print(f"{name:<32} {s['count']:>7,} {s['p50_ms']:>8.1f} {s['p90_ms']:>8.1f} "
+                  f"{s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}")
+
+
+def _options_from_env():
+    value = os.environ.get(ENV_VAR, '').strip().lower()
+    if value in ('', '0', 'false', 'off', 'no'):
+        return ()
+    return tuple(option.strip() for option in value.split(',')) + ('time',)
+
+
+# One process-wide profiler, configured from the environment
+profiler = Profiler(_options_from_env())
+enable = profiler.enable
+stage = profiler.stage
+timed = profiler.timed
+latency = profiler.latency
+record_latency = profiler.record_latency
@@ -1,72 +1,208 @@
 """Experiment 2 - data collection from REDDIT"""
 
-import praw
-import pandas as pd
+import argparse
+import asyncio
+import csv
+import json
+import os
+from pathlib import Path
 
-# ---AUTHENTICATION---
-import config
+import asyncpraw
 
-reddit = praw.Reddit(
-    client_id=config.CLIENT_ID,
-    client_secret=config.CLIENT_SECRET,
-    user_agent=config.USER_AGENT
-)
+import profiling
 
 # --- CONFIGURATION ---
 search_query = "zomato"
 target_subreddits = ['mumbai', 'delhi', 'bangalore', 'pune', 'india', 'IndianStreetBets', 'indiasocial']
-scraped_data = []
+POSTS_PER_SUBREDDIT = 30
+COMMENTS_PER_POST = 5
+MAX_CONCURRENT_SUBMISSIONS = 8   # submissions being fetched at once, across all subreddits
+output_file = 'reddit_rawdata.csv'
+checkpoint_file = 'reddit_rawdata.checkpoint.jsonl'
+
+COLUMNS = ['source_platform', 'text', 'location', 'hashtags', 'urls', 'post_author', 'post_score',
+           'comment_count', 'upvote_ratio', 'comment_author', 'comment_score']
+
+
+def post_row(submission, sub_name):
+    return {
+        'source_platform': 'Reddit_Post',
+        'text': f"Title: {submission.title}. Body: {submission.selftext}",
+        'location': sub_name,
+        'hashtags': None, # Keeping schema consistent
+        'urls': submission.url,
+        'post_author': str(submission.author),
+        'post_score': submission.score,
+        'comment_count': submission.num_comments,
+        'upvote_ratio': submission.upvote_ratio,
+        'comment_author': None, # Not a comment
+        'comment_score': None # Not a comment
+    }
+
+
+def comment_row(comment, submission, sub_name):
+    return {
+        'source_platform': 'Reddit_Comment',
+        'text': comment.body,
+        'location': sub_name,
+        'hashtags': None,
+        'urls': f"https://reddit.com{comment.permalink}",
+        'post_author': str(submission.author),
+        'post_score': submission.score,
+        'comment_count': submission.num_comments,
+        'upvote_ratio': submission.upvote_ratio,
+        'comment_author': str(comment.author),
+        'comment_score': comment.score
+    }
+
+
+class Checkpoint:
+    """
+    Append-only JSON Lines log of finished submissions and subreddits.
+    A submission is only logged after its rows are on disk, so a crash can
+    at worst repeat the one submission that was being written.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done_subreddits = set()
+        self.done_submissions = set()
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if 'submission' in entry:
+                        self.done_submissions.add((entry['subreddit'], entry['submission']))
+                    else:
+                        self.done_subreddits.add(entry['subreddit'])
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _append(self, entry):
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def mark_submission(self, sub_name, submission_id):
+        self.done_submissions.add((sub_name, submission_id))
+        self._append({'subreddit': sub_name, 'submission': submission_id})
+
+    def mark_subreddit(self, sub_name):
+        self.done_subreddits.add(sub_name)
+        self._append({'subreddit': sub_name})
+
+    def close(self):
+        self.file.close()
+
+
+class RowWriter:
+    """Streams rows to the output CSV, writing the header only for a new file."""
+
+    def __init__(self, path):
+        is_new = not Path(path).exists() or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        if is_new:
+            self.writer.writeheader()
+        self.rows_written = 0
 
-# --- DATA COLLECTION ---
-# Loop through each subreddit individually
-for sub_name in target_subreddits:
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.rows_written += len(rows)
+
+    def close(self):
+        self.file.close()
+
+
+async def collect_submission(submission, sub_name, writer, checkpoint, semaphore):
+    async with semaphore:
+        # --- For Comments ---
+        # Fetch the top comments of the post
+        with profiling.latency('reddit.submission.load'):
+            await submission.load()
+        with profiling.latency('reddit.replace_more'):
+            await submission.comments.replace_more(limit=0)
+        comments = submission.comments.list()[:COMMENTS_PER_POST]
+    rows = [post_row(submission, sub_name)] + [comment_row(c, submission, sub_name) for c in comments]
+    writer.write(rows)
+    checkpoint.mark_submission(sub_name, submission.id)
+
+
+async def collect_subreddit(reddit, sub_name, writer, checkpoint, semaphore):
+    if sub_name in checkpoint.done_subreddits:
+        print(f"--- Skipping r/{sub_name} (already collected) ---")
+        return
     print(f"--- Searching in r/{sub_name} ---")
-    subreddit = reddit.subreddit(sub_name)
-    
     try:
-        # Search for the top 40 posts of the year in the subreddit
-        for submission in subreddit.search(search_query, sort='top', time_filter='year', limit=30):
-            # --- For Posts ---
-            # Create a dictionary for the post itself
-            scraped_data.append({
-                'source_platform': 'Reddit_Post',
-                'text': f"Title: {submission.title}. Body: {submission.selftext}",
-                'location': sub_name,
-                'hashtags': None, # Keeping schema consistent
-                'urls': submission.url,
-                'post_author': str(submission.author),
-                'post_score': submission.score,
-                'comment_count': submission.num_comments,
-                'upvote_ratio': submission.upvote_ratio,
-                'comment_author': None, # Not a comment
-                'comment_score': None # Not a comment
-            })
-
-            # --- For Comments ---
-            # Fetch and loop through the top 5 comments of the post
-            submission.comments.replace_more(limit=0)
-            for comment in submission.comments.list()[:5]:
-                # Create a dictionary for each comment
-                scraped_data.append({
-                    'source_platform': 'Reddit_Comment',
-                    'text': comment.body,
-                    'location': sub_name,
-                    'hashtags': None,
-                    'urls': f"https://reddit.com{comment.permalink}",
-                    'post_author': str(submission.author),
-                    'post_score': submission.score,
-                    'comment_count': submission.num_comments,
-                    'upvote_ratio': submission.upvote_ratio,
-                    'comment_author': str(comment.author),
-                    'comment_score': comment.score
-                })
+        subreddit = await reddit.subreddit(sub_name)
+        async with semaphore:
+            with profiling.latency('reddit.subreddit.search'):
+                submissions = [s async for s in subreddit.search(search_query, sort='top', time_filter='year',
+                                                                   limit=POSTS_PER_SUBREDDIT)]
     except Exception as e:
         print(f"Could not process r/{sub_name}. Error: {e}")
+        return
+
+    pending = [s for s in submissions if (sub_name, s.id) not in checkpoint.done_submissions]
+    results = await asyncio.gather(
+        *(collect_submission(s, sub_name, writer, checkpoint, semaphore) for s in pending),
+        return_exceptions=True
+    )
+    failures = [r for r in results if isinstance(r, Exception)]
+    for error in failures:
+        print(f"Could not process a submission in r/{sub_name}. Error: {error}")
+    # Subreddits with failed submissions are left open so the next run retries them
+    if not failures:
+        checkpoint.mark_subreddit(sub_name)
+
+
+async def collect(reddit, subreddits, output_path=output_file, checkpoint_path=checkpoint_file,
+                  max_concurrency=MAX_CONCURRENT_SUBMISSIONS):
+    """
+    Collects all subreddits concurrently, streaming rows to `output_path` and
+    resuming from `checkpoint_path` if an earlier run was interrupted. The
+    checkpoint is deleted once every subreddit is done, so the next run starts
+    a new collection. Returns the number of rows written by this run.
+    """
+    writer = RowWriter(output_path)
+    checkpoint = Checkpoint(checkpoint_path)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    try:
+        await asyncio.gather(*(collect_subreddit(reddit, sub_name, writer, checkpoint, semaphore)
+                               for sub_name in subreddits))
+    finally:
+        writer.close()
+        checkpoint.close()
+    if set(subreddits) <= checkpoint.done_subreddits:
+        Path(checkpoint_path).unlink(missing_ok=True)
+    return writer.rows_written
+
+
+async def main(fresh=False):
+    # ---AUTHENTICATION---
+    import config
+
+    if fresh:
+        for path in (output_file, checkpoint_file):
+            Path(path).unlink(missing_ok=True)
+
+    async with asyncpraw.Reddit(
+        client_id=config.CLIENT_ID,
+        client_secret=config.CLIENT_SECRET,
+        user_agent=config.USER_AGENT
+    ) as reddit:
+        rows_written = await collect(reddit, target_subreddits)
+
+    print(f"\n✅ Successfully collected data!")
+    print(f"{rows_written} new entries (posts and comments) saved to '{output_file}'")
 
-# --- STORING THE DATA ---
-df = pd.DataFrame(scraped_data)
-output_file = 'reddit_rawdata.csv'
-df.to_csv(output_file, index=False)
 
-print(f"\n✅ Successfully collected data!")
-print(f"{len(df)} total entries (posts and comments) saved to '{output_file}'")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fresh', action='store_true', help="discard the checkpoint and previous output")
+    args = parser.parse_args()
+    asyncio.run(main(fresh=args.fresh))
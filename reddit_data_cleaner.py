@@ -0,0 +1,316 @@
+import pandas as pd
+import re
+from concurrent.futures import ProcessPoolExecutor
+import os
+from importlib.metadata import version
+from bs4 import BeautifulSoup
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+import profiling
+from token_cache import DEFAULT_CACHE_DB, TokenCache, combine_stats, print_cache_report
+
+CUSTOM_STOPWORDS = ['zomato', 'title', 'body']
+# Same tokenization TextBlob.correct() uses, so correcting token by token is identical
+CORRECT_TOKEN_RE = re.compile(r"\w+|[^\w\s]|\s")
+
+def make_token_caches(split_words=False, correct_spelling=False, db_path=None):
+    """
+    Builds the cached per-token transforms for steps 8, 9 and 13.
+    Each cache is versioned on the library that produces its output. They only
+    persist across runs when `db_path` is given (e.g. DEFAULT_CACHE_DB).
+    """
+    caches = {
+        'lemmatize': TokenCache('lemmatize', f"nltk-{version('nltk')}", WordNetLemmatizer().lemmatize, db_path),
+    }
+    if split_words:
+        import wordsegment
+        wordsegment.load()
+        caches['segment'] = TokenCache('segment', f"wordsegment-{version('wordsegment')}",
+                                       lambda word: ' '.join(wordsegment.segment(word)), db_path)
+    if correct_spelling:
+        from textblob import Word
+        caches['correct'] = TokenCache('correct', f"textblob-{version('textblob')}",
+                                       lambda token: str(Word(token).correct()), db_path)
+    return caches
+
+@profiling.timed()
+def clean_social_media_data(df: pd.DataFrame, split_words: bool = False, correct_spelling: bool = False,
+                            caches: dict = None) -> pd.DataFrame:
+    """
+    A single function to clean a DataFrame containing social media text data.
+    Steps 8, 9 and 13 go through `caches` (see `make_token_caches`), so each
+    unique word is segmented, corrected and lemmatized only once.
+    """
+    print("--- Starting Data Cleaning Process ---")
+
+    owns_caches = caches is None
+    if owns_caches:
+        caches = make_token_caches(split_words, correct_spelling)
+
+    clean_df = df.copy()
+
+    # Step 0: Filter out deleted/removed entries
+    original_rows = len(clean_df)
+    with profiling.stage('step 0: deleted/removed', original_rows) as stage:
+        # The `isin()` method checks for exact matches to '[deleted]' or '[removed]'
+        # The `~` symbol inverts the selection, keeping all rows that DO NOT match.
+        clean_df = clean_df[~clean_df['text'].isin(['[deleted]', '[removed]'])]
+        stage.rows_out = len(clean_df)
+    rows_removed = original_rows - len(clean_df)
+    if rows_removed > 0:
+        print(f"Step 0: Removed {rows_removed} deleted/removed entries.")
+
+    # Step 1: Duplicate Removal
+    with profiling.stage('step 1: duplicates', len(clean_df)) as stage:
+        clean_df.drop_duplicates(inplace=True)
+        stage.rows_out = len(clean_df)
+    print("Step 1: Duplicates removed.")
+
+    text_column = clean_df['text']
+    rows = len(text_column)
+
+    # Step 2: Convert to Lowercase
+    with profiling.stage('step 2: lowercase', rows):
+        text_column = text_column.str.lower()
+    print("Step 2: Converted text to lowercase.")
+
+    # Step 3: Remove URLs
+    with profiling.stage('step 3: urls', rows):
+        text_column = text_column.apply(lambda x: re.sub(r'https?://\S+|www\.\S+', '', x))
+    print("Step 3: URLs removed.")
+
+    # Step 4: Remove HTML tags
+    with profiling.stage('step 4: html', rows):
+        text_column = text_column.apply(lambda x: BeautifulSoup(x, "html.parser").get_text())
+    print("Step 4: HTML tags removed.")
+
+    # Step 5: Basic Cleaning (Remove mentions, hashtags, and special characters)
+    with profiling.stage('step 5: mentions/hashtags/special chars', rows):
+        text_column = text_column.apply(lambda x: re.sub(r'@[A-Za-z0-9_]+|#[A-Za-z0-9_]+', '', x))
+        text_column = text_column.apply(lambda x: re.sub(r'[^a-zA-Z\s]', '', x))
+    print("Step 5: Mentions, hashtags, and special chars removed.")
+
+    # Step 6: Remove Multiple Letters (e.g., 'sooo' -> 'so')
+    with profiling.stage('step 6: elongated words', rows):
+        text_column = text_column.apply(lambda x: re.sub(r'(.)\1{2,}', r'\1\1', x))
+    print("Step 6: Elongated words shortened")
+
+    # Step 7: Whitespace Removal
+    with profiling.stage('step 7: whitespace', rows):
+        text_column = text_column.apply(lambda x: x.strip())
+        text_column = text_column.apply(lambda x: re.sub(r'\s+', ' ', x))
+    print("Step 7: Extra whitespace removed.")
+
+    # Step 8: Split Attached Words (e.g., 'goodservice' -> 'good service')
+    # Segmented word by word so that each unique word is only segmented once
+    if split_words:
+        segment = caches['segment']
+        with profiling.stage('step 8: split words', rows):
+            text_column = text_column.apply(lambda x: ' '.join(segment(word) for word in x.split()))
+        print("Step 8: Attached words split.")
+
+    # Step 9: Spelling Correction
+    if correct_spelling:
+        correct = caches['correct']
+        with profiling.stage('step 9: spelling', rows):
+            text_column = text_column.apply(lambda x: ''.join(correct(token) for token in CORRECT_TOKEN_RE.findall(x)))
+        print("Step 9: Spelling correction applied.")
+
+    # Step 10: Grammar Correction
+    # text_column = text_column.apply(lambda x: lang_tool.correct(x))
+    # print("Step 10: Grammar correction applied.")
+
+    # Step 11: Tokenization
+    with profiling.stage('step 11: tokenize', rows):
+        text_column = text_column.apply(word_tokenize)
+    print("Step 11: Text tokenized.")
+
+    # Step 12: Remove Stopwords
+    with profiling.stage('step 12: stopwords', rows):
+        stop_words = set(stopwords.words('english'))
+        custom_stopwords = CUSTOM_STOPWORDS
+        stop_words.update(custom_stopwords)
+        text_column = text_column.apply(lambda tokens: [word for word in tokens if word not in stop_words])
+    print("Step 12: Stopwords removed.")
+
+    # Step 13: Lemmatization
+    lemmatize = caches['lemmatize']
+    with profiling.stage('step 13: lemmatize', rows):
+        text_column = text_column.apply(lambda tokens: [lemmatize(word) for word in tokens])
+    print("Step 13: Words lemmatized.")
+
+    # Assign the cleaned text back to the DataFrame
+    clean_df['cleaned_text_tokens'] = text_column
+
+    print_cache_report([cache.stats() for cache in caches.values()])
+    for cache in caches.values():
+        cache.flush()
+        if owns_caches:
+            cache.close()
+
+    print("--- Cleaning Process Finished ---")
+    return clean_df
+
+# --- PARALLEL MODE ---
+# Steps 2-13 fused into one per-row function and run over row chunks in a
+# process pool. Each worker builds its stopword set and lemmatizer once.
+URL_RE = re.compile(r'https?://\S+|www\.\S+')
+MENTION_HASHTAG_RE = re.compile(r'@[A-Za-z0-9_]+|#[A-Za-z0-9_]+')
+SPECIAL_CHARS_RE = re.compile(r'[^a-zA-Z\s]')
+ELONGATED_RE = re.compile(r'(.)\1{2,}')
+WHITESPACE_RE = re.compile(r'\s+')
+
+_worker_stop_words = None
+_worker_caches = None
+
+def _init_worker(split_words=False, correct_spelling=False, cache_db=None):
+    global _worker_stop_words, _worker_caches
+    _worker_stop_words = set(stopwords.words('english'))
+    _worker_stop_words.update(CUSTOM_STOPWORDS)
+    _worker_caches = make_token_caches(split_words, correct_spelling, cache_db)
+    _worker_caches['lemmatize'].transform('warmup')  # force WordNet to load now, not on the first row
+
+def clean_text(text):
+    """Runs steps 2-13 of `clean_social_media_data` on a single string."""
+    text = text.lower()
+    text = URL_RE.sub('', text)
+    text = BeautifulSoup(text, "html.parser").get_text()
+    text = MENTION_HASHTAG_RE.sub('', text)
+    text = SPECIAL_CHARS_RE.sub('', text)
+    text = ELONGATED_RE.sub(r'\1\1', text)
+    text = WHITESPACE_RE.sub(' ', text.strip())
+    if 'segment' in _worker_caches:
+        segment = _worker_caches['segment']
+        text = ' '.join(segment(word) for word in text.split())
+    if 'correct' in _worker_caches:
+        correct = _worker_caches['correct']
+        text = ''.join(correct(token) for token in CORRECT_TOKEN_RE.findall(text))
+    tokens = word_tokenize(text)
+    lemmatize = _worker_caches['lemmatize']
+    return [lemmatize(word) for word in tokens if word not in _worker_stop_words]
+
+def _clean_chunk(texts):
+    for cache in _worker_caches.values():
+        cache.reset_stats()
+    rows = [clean_text(text) for text in texts]
+    for cache in _worker_caches.values():
+        cache.flush()
+    return rows, [cache.stats() for cache in _worker_caches.values()]
+
+@profiling.timed()
+def clean_social_media_data_parallel(df: pd.DataFrame, workers: int = None, chunk_size: int = 5000,
+                                     split_words: bool = False, correct_spelling: bool = False,
+                                     cache_db: str = None) -> pd.DataFrame:
+    """
+    Same output as `clean_social_media_data`, with the per-row work spread
+    across `workers` processes (defaults to the CPU count). Token caches are
+    kept in `cache_db` across runs when it is given, and in memory otherwise.
+    """
+    print("--- Starting Data Cleaning Process (parallel) ---")
+
+    clean_df = df.copy()
+
+    # Steps 0 and 1 need the whole frame, so they stay in the parent process
+    original_rows = len(clean_df)
+    with profiling.stage('step 0: deleted/removed', original_rows) as stage:
+        clean_df = clean_df[~clean_df['text'].isin(['[deleted]', '[removed]'])]
+        stage.rows_out = len(clean_df)
+    rows_removed = original_rows - len(clean_df)
+    if rows_removed > 0:
+        print(f"Step 0: Removed {rows_removed} deleted/removed entries.")
+    with profiling.stage('step 1: duplicates', len(clean_df)) as stage:
+        clean_df.drop_duplicates(inplace=True)
+        stage.rows_out = len(clean_df)
+    print("Step 1: Duplicates removed.")
+
+    texts = clean_df['text'].tolist()
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    workers = workers or os.cpu_count()
+
+    init_args = (split_words, correct_spelling, cache_db)
+    results = []
+    cache_stats = []
+    if workers == 1:
+        _init_worker(*init_args)
+        chunk_results = map(_clean_chunk, chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args)
+        chunk_results = executor.map(_clean_chunk, chunks)
+    try:
+        with profiling.stage(f"steps 2-13: {workers} workers", len(texts)):
+            for rows, stats in chunk_results:
+                results.extend(rows)
+                cache_stats.extend(stats)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        else:
+            for cache in _worker_caches.values():
+                cache.close()
+    print(f"Steps 2-13: Cleaned {len(results)} rows across {workers} workers.")
+    print_cache_report(combine_stats(cache_stats))
+
+    clean_df['cleaned_text_tokens'] = pd.Series(results, index=clean_df.index, dtype=object)
+
+    print("--- Cleaning Process Finished ---")
+    return clean_df
+
+
+# Bump whenever a change to the cleaning steps changes their output; this
+# invalidates everything the incremental mode has stored (see clean_store.py)
+CLEANER_VERSION = 1
+
+def cleaner_config(split_words=False, correct_spelling=False) -> str:
+    """Key for everything that shapes the cleaned tokens, for `clean_store`."""
+    from clean_store import config_key
+    libraries = {'nltk': version('nltk')}
+    if split_words:
+        libraries['wordsegment'] = version('wordsegment')
+    if correct_spelling:
+        libraries['textblob'] = version('textblob')
+    return config_key('reddit_data_cleaner', version=CLEANER_VERSION, split_words=split_words,
+                      correct_spelling=correct_spelling, stopwords=sorted(stopwords.words('english')),
+                      custom_stopwords=CUSTOM_STOPWORDS, **libraries)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--incremental', action='store_true',
+                        help="only clean rows not already in reddit_data_cleaned_2.csv, and append them")
+    args = parser.parse_args()
+
+    import nltk
+    nltk.download('punkt_tab')
+    nltk.download('stopwords')
+    nltk.download('wordnet')
+
+    raw_df = pd.read_csv('reddit_rawdata.csv')
+    print(f"Shape of raw data: {raw_df.shape}")
+
+    cleaned_data_path = 'reddit_data_cleaned_2.csv'
+    if args.incremental:
+        from clean_store import clean_incremental
+        cleaned_df, appended = clean_incremental(
+            raw_df, lambda df: clean_social_media_data_parallel(df, split_words=True, correct_spelling=True,
+                                                                cache_db=DEFAULT_CACHE_DB),
+            'text', 'cleaned_text_tokens', cleaner_config(split_words=True, correct_spelling=True),
+            cleaned_data_path
+        )
+        print(f"{'Appended' if appended else 'Wrote'} {len(cleaned_df)} cleaned rows to '{cleaned_data_path}'")
+    else:
+        cleaned_df = clean_social_media_data_parallel(raw_df, split_words=True, correct_spelling=True,
+                                                      cache_db=DEFAULT_CACHE_DB)
+        cleaned_df.to_csv(cleaned_data_path, index=False)
+        appended = False
+        print(f"Cleaned data saved to '{cleaned_data_path}'")
+
+    # Compact copy of the tokens that loads without literal_eval (see token_corpus.py)
+    from token_corpus import save_column
+    save_column(cleaned_df['cleaned_text_tokens'], 'reddit_data_cleaned_2.tokens', append=appended)
+
+    import data_lake
+    written = data_lake.append(cleaned_df, 'reddit_clean')
+    print(f"Appended {written} new rows to the 'reddit_clean' dataset")
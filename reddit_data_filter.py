@@ -1,11 +1,20 @@
 import pandas as pd
 
-df = pd.read_csv('data/reddit_data_cleaned_2.csv')
+import data_lake
 
-print(f"Total rows in the dataset: {len(df)}")
+CLEANED_CSV = 'data/reddit_data_cleaned_2.csv'
 
-# Filter for rows where the 'location' column is 'mumbai'
-mumbai_df = df[df['location'] == 'mumbai']
+if data_lake.exists('reddit_clean'):
+    # Only the location=mumbai partitions of the cleaned Reddit data are read
+    mumbai_df = data_lake.read('reddit_clean', filters={'location': 'mumbai'})
+    # The date partition key is the lake's, not a column of the cleaned data, and
+    # location comes back last; put it back after text, where the cleaner writes it
+    mumbai_df = mumbai_df.drop(columns=['date'])
+    mumbai_df.insert(mumbai_df.columns.get_loc('text') + 1, 'location', mumbai_df.pop('location'))
+else:
+    df = pd.read_csv(CLEANED_CSV)
+    print(f"Total rows in the dataset: {len(df)}")
+    mumbai_df = df[df['location'] == 'mumbai']
 
 print(f"Found {len(mumbai_df)} entries specifically for the location 'mumbai'.")
 
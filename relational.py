@@ -1,25 +1,157 @@
+import argparse
 import sqlite3
 import pandas as pd
 
+import data_lake
+
 DB_NAME = "twitter_zomato.db"
 
-def connect_db():
+TWEET_COLUMNS = {
+    'tweet_id': 'INTEGER PRIMARY KEY',
+    'tweet_url': 'TEXT NOT NULL',
+    'author': 'TEXT',
+    'text': 'TEXT',
+    'likes': 'INTEGER NOT NULL DEFAULT 0',
+    'retweets': 'INTEGER NOT NULL DEFAULT 0',
+    'hashtags': 'TEXT',
+    'created_at': 'TEXT',
+}
+
+# Typed schema for each table; every table also gets author and created_at indexes
+TABLES = {
+    'raw_data': TWEET_COLUMNS,
+    'clean_data': {**TWEET_COLUMNS, 'cleaned_tokens': 'TEXT', 'cleaned_text_str': 'TEXT'},
+}
+
+# CSV hand-off file and the data lake dataset each table can be loaded from
+SOURCES = {
+    'raw_data': ('data/zomato_tweets.csv', 'tweets_raw'),
+    'clean_data': ('data/twts_clean.csv', 'tweets_clean'),
+}
+
+# The CSVs went through Excel, which turned tweet_id into 1.95657E+18, so the
+# key is recovered from the status URL instead
+STATUS_ID_RE = r'/status/(\d+)'
+
+def connect_db(db_name=DB_NAME):
     """Connects to the SQLite database and returns the connection object."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        print(f"Successfully connected to database '{DB_NAME}'")
+        conn = sqlite3.connect(db_name)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+        conn.execute("PRAGMA mmap_size=268435456")
+        print(f"Successfully connected to database '{db_name}'")
         return conn
     except sqlite3.Error as e:
         print(f"Error connecting to database: {e}")
         return None
 
-conn = connect_db()
+def create_schema(conn):
+    """
+    Creates the typed tables and their indexes. A table left over from the old
+    `to_sql(if_exists='replace')` loader has no primary key; it only ever held
+    a copy of the CSVs, so it is dropped and rebuilt.
+    """
+    for table, columns in TABLES.items():
+        info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        if info and not any(row[5] for row in info):
+            print(f"Rebuilding untyped legacy table '{table}'")
+            conn.execute(f"DROP TABLE {table}")
+        column_defs = ',\n    '.join(f"{name} {sql_type}" for name, sql_type in columns.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    {column_defs}\n)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_author ON {table} (author)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at)")
+    conn.commit()
+
+def tweet_rows(df, columns):
+    """Returns `df` as a list of tuples in `columns` order, keyed by an integer tweet_id."""
+    df = df.reindex(columns=list(columns))
+    ids = df['tweet_url'].str.extract(STATUS_ID_RE, expand=False)
+    df = df[ids.notna()].assign(tweet_id=ids.dropna().astype('int64'))
+    df = df.drop_duplicates('tweet_id', keep='last')
+    # The CSVs have no created_at; the snowflake ID in the URL has the posting time,
+    # written in the scraper's isoformat() form
+    created_at = data_lake.tweet_times(df['tweet_url']).dt.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+    df['created_at'] = df['created_at'].fillna(created_at)
+    for column in ('likes', 'retweets'):
+        df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
+    return list(zip(*(_sql_values(df[column]) for column in df.columns)))
+
+def _sql_values(series):
+    """Column values as Python objects, with NaN as None (NULL)."""
+    values = series.tolist()
+    if series.hasnans:
+        return [None if value != value else value for value in values]
+    return values
+
+def upsert_sql(table, columns):
+    """
+    INSERT for new tweets; for existing ones, UPDATE only when some column
+    actually differs, so unchanged rows cost a lookup and no write.
+    """
+    names = list(columns)
+    values = [name for name in names if name != 'tweet_id']
+    return (
+        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})\n"
+        f"ON CONFLICT(tweet_id) DO UPDATE SET {', '.join(f'{n} = excluded.{n}' for n in values)}\n"
+        f"WHERE {' OR '.join(f'{n} IS NOT excluded.{n}' for n in values)}"
+    )
+
+def load_frames(conn, table, frames):
+    """
+    Upserts each DataFrame in `frames` into `table` with one executemany per
+    frame, all inside one transaction. Returns the number of rows inserted or changed.
+    """
+    columns = TABLES[table]
+    sql = upsert_sql(table, columns)
+    before = conn.total_changes
+    with conn:
+        for frame in frames:
+            conn.executemany(sql, tweet_rows(frame, columns))
+    return conn.total_changes - before
+
+def load_table(conn, table, csv_path, chunksize=100_000):
+    """Upserts a CSV into `table` in batches of `chunksize` rows."""
+    return load_frames(conn, table, pd.read_csv(csv_path, chunksize=chunksize, dtype={'tweet_id': str}))
+
+def load_dataset(conn, table, name, filters=None, batch_size=100_000):
+    """
+    Upserts a slice of a data lake dataset into `table`, e.g.
+    filters={'date': ('>=', '2025-08-01')}. Only the table's columns are read.
+    """
+    available = set(data_lake.dataset(name).schema.names)
+    columns = [column for column in TABLES[table] if column in available]
+
+    list_columns = [column for column in data_lake.DATASETS[name]['lists'] if column in columns]
+
+    def frames():
+        for frame in data_lake.iter_batches(name, columns, filters, batch_size):
+            # Token lists are stored in their printed form, as the CSV loader does
+            for column in list_columns:
+                frame[column] = frame[column].map(lambda v: str(v) if isinstance(v, list) else v)
+            yield frame
+
+    return load_frames(conn, table, frames())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--since', help="only load tweets posted on or after this date (YYYY-MM-DD, data lake only)")
+    args = parser.parse_args()
 
-raw_df = pd.read_csv('data/zomato_tweets.csv')
-cleaned_df = pd.read_csv('data/twts_clean.csv')
-raw_df.to_sql('raw_data', conn, if_exists='replace', index=False)
-cleaned_df.to_sql('clean_data', conn, if_exists='replace', index=False)
+    conn = connect_db()
+    create_schema(conn)
 
-conn.close()
-print(f"Data successfully stored in the {DB_NAME} SQLite file")
+    for table, (csv_path, dataset_name) in SOURCES.items():
+        if data_lake.exists(dataset_name):
+            filters = {'date': ('>=', args.since)} if args.since else None
+            changed = load_dataset(conn, table, dataset_name, filters)
+        else:
+            changed = load_table(conn, table, csv_path)
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"{table}: {changed} new or changed rows, {total} rows in total")
 
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    print(f"Data successfully stored in the {DB_NAME} SQLite file")
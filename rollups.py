@@ -0,0 +1,441 @@
+"""
+Pre-aggregated engagement cubes, so dashboard questions ("best posting hour
+on Instagram", "views per weekday") read a few thousand cells instead of
+rescanning every post.
+
+Every post contributes one value per metric (likes, comments, engagement, ...)
+to the cell of its platform × location × date × hour × weekday, in IST like
+`clean_insta_slim`. A cell keeps the count and sum of its values and a
+log-bucketed quantile sketch (values in a bucket are within
+RELATIVE_ACCURACY of each other), all of which add up across cells, so any
+roll-up to fewer dimensions is a sum over cells.
+
+The cube lives in SQLite (data/rollups.db) and is updated a batch at a
+time. The last value each post contributed is kept, so a post seen again is
+skipped and a post whose counts changed since (e.g. a refreshed YouTube
+video) has its old value taken out before the new one goes in.
+"""
+
+import argparse
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_lake
+from clean_store import row_hashes
+
+DEFAULT_ROLLUP_DB = 'data/rollups.db'
+TIMEZONE = 'Asia/Kolkata'
+DIMENSIONS = ['platform', 'location', 'date', 'hour', 'weekday']
+UNKNOWN = 'unknown'
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+BUCKET_BIAS = 1 << 20   # keeps positive keys above zero and negative ones below
+QUANTILES = (0.5, 0.9, 0.99)
+DENSE_QUANTILE_LIMIT = 4_000_000   # groups × distinct buckets summed in one dense array
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Per source: its CSV, platform, the columns identifying a post, its timestamp
+# column (naive timestamps are in `naive_tz`), location column, the rows to
+# keep, each metric's column, and the columns that add up to 'engagement'
+SOURCES = {
+    'twitter': {'csv': 'data/zomato_tweets.csv', 'key': ['tweet_url'], 'time': 'created_at', 'naive_tz': 'UTC',
+                'location': None, 'rows': None,
+                'metrics': {'likes': 'likes', 'retweets': 'retweets'}, 'engagement': ['likes', 'retweets']},
+    'instagram': {'csv': 'insta_cleaned_slim.csv', 'key': ['url'], 'time': 'posted_at', 'naive_tz': TIMEZONE,
+                  'location': None, 'rows': None,
+                  'metrics': {'likes': 'likesCount', 'comments': 'commentsCount'},
+                  'engagement': ['likesCount', 'commentsCount']},
+    'youtube': {'csv': 'data/youtube_official_videos.csv', 'key': ['video_id'], 'time': 'publish_date',
+                'naive_tz': 'UTC', 'location': None, 'rows': None,
+                'metrics': {'views': 'view_count', 'likes': 'like_count', 'comments': 'comment_count'},
+                'engagement': ['like_count', 'comment_count']},
+    # Comment rows repeat their post's score and comment count, so only posts are rolled up
+    'reddit': {'csv': 'data/reddit_rawdata.csv', 'key': ['urls'], 'time': None, 'naive_tz': 'UTC',
+               'location': 'location', 'rows': ('source_platform', 'Reddit_Post'),
+               'metrics': {'score': 'post_score', 'comments': 'comment_count'},
+               'engagement': ['post_score', 'comment_count']},
+}
+
+
+# --- quantile sketch ---
+def bucket_keys(values):
+    """Log-bucket key of each value; keys sort in the same order as the values they hold."""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        k = np.ceil(np.log(np.abs(values)) / np.log(GAMMA))
+    k = np.clip(np.nan_to_num(k, neginf=-BUCKET_BIAS), 1 - BUCKET_BIAS, BUCKET_BIAS - 1).astype(np.int64) + BUCKET_BIAS
+    return np.where(values > 0, k, np.where(values < 0, -k, 0))
+
+
+def bucket_values(keys):
+    """The value a bucket stands for, within RELATIVE_ACCURACY of every value in it."""
+    keys = np.asarray(keys, dtype=np.int64)
+    magnitude = 2 * GAMMA ** (np.abs(keys) - BUCKET_BIAS).astype(np.float64) / (GAMMA + 1)
+    return np.where(keys > 0, magnitude, np.where(keys < 0, -magnitude, 0.0))
+
+
+# --- turning posts into cell contributions ---
+def _numbers(column):
+    """Counts as floats; scraped text like '1.2K' or '1,234' is expanded."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype('float64')
+    text = column.astype('string').str.strip().str.lower().str.replace(',', '', regex=False)
+    parts = text.str.extract(r'^(-?[0-9]*\.?[0-9]+)([kmb]?)$')
+    multiplier = parts[1].map({'': 1, 'k': 1e3, 'm': 1e6, 'b': 1e9}).astype('float64')
+    return pd.to_numeric(parts[0], errors='coerce') * multiplier
+
+
+def time_dimensions(times, naive_tz='UTC'):
+    """IST date (YYYY-MM-DD), hour and weekday name of each timestamp; 'unknown' / -1 when missing."""
+    parsed = pd.to_datetime(times, errors='coerce')
+    if parsed.dt.tz is None:
+        parsed = parsed.dt.tz_localize(naive_tz, ambiguous='NaT', nonexistent='NaT')
+    local = parsed.dt.tz_convert(TIMEZONE).dt.tz_localize(None)
+    missing = local.isna().to_numpy()
+    # NumPy's day resolution formats dates far faster than strftime
+    days = local.to_numpy().astype('datetime64[D]')
+    date = np.where(missing, UNKNOWN, days.astype(str).astype(object))
+    weekday = np.where(missing, UNKNOWN, np.array(WEEKDAYS, dtype=object)[(days.view('int64') + 3) % 7])
+    return date, local.dt.hour.fillna(-1).astype('int64').to_numpy(), weekday
+
+
+def metric_names(source):
+    spec = SOURCES[source]
+    return list(spec['metrics']) + ['engagement']
+
+
+def observations(df, source):
+    """
+    One row per post: its key, its cell's dimensions, and its value for each
+    of the source's metrics (NaN where a value is missing).
+    """
+    spec = SOURCES[source]
+    metrics = metric_names(source)
+    if spec['rows'] is not None:
+        column, value = spec['rows']
+        df = df[df[column] == value]
+    df = df.reset_index(drop=True)
+    if df.empty:
+        return pd.DataFrame(columns=['row_key', *DIMENSIONS, *metrics])
+
+    if spec['time'] in df.columns:
+        times = df[spec['time']]
+    elif 'tweet_url' in df.columns:
+        times = data_lake.tweet_times(df['tweet_url'])
+    else:
+        times = pd.Series(pd.NaT, index=df.index)
+    date, hour, weekday = time_dimensions(times, spec['naive_tz'])
+    location = (df[spec['location']].astype(object).fillna(UNKNOWN).str.lower() if spec['location']
+                else pd.Series(UNKNOWN, index=df.index, dtype=object))
+    obs = pd.DataFrame({'row_key': row_hashes(df[spec['key']]), 'platform': source, 'location': location,
+                        'date': date, 'hour': hour, 'weekday': weekday})
+    for metric, column in spec['metrics'].items():
+        obs[metric] = _numbers(df[column]) if column in df.columns else np.nan
+    obs['engagement'] = sum(_numbers(df[column]).fillna(0) for column in spec['engagement'])
+    # A post listed twice in one batch counts once, with its latest values
+    return obs.drop_duplicates('row_key', keep='last').reset_index(drop=True)
+
+
+def _same(a, b):
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+
+class Rollup:
+
+    def __init__(self, db_path=DEFAULT_ROLLUP_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cells (
+                cell INTEGER PRIMARY KEY,
+                platform TEXT NOT NULL,
+                location TEXT NOT NULL,
+                date TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                weekday TEXT NOT NULL,
+                UNIQUE (platform, location, date, hour, weekday)
+            );
+            CREATE TABLE IF NOT EXISTS measures (
+                cell INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL NOT NULL,
+                PRIMARY KEY (cell, metric)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS buckets (
+                cell INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (cell, metric, bucket)
+            ) WITHOUT ROWID;
+            -- What each post last added: its cell and its metric values as packed float64s
+            CREATE TABLE IF NOT EXISTS contributions (
+                source TEXT NOT NULL,
+                row_key INTEGER NOT NULL,
+                cell INTEGER NOT NULL,
+                metric_values BLOB NOT NULL,
+                PRIMARY KEY (source, row_key)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+        self._cells = None
+        self._buckets = None
+        self._cuboids = {}
+
+    # --- updating ---
+    def _cell_ids(self, obs):
+        """Cell id for each observation, creating the cells not seen before."""
+        combos = obs[DIMENSIONS].drop_duplicates()
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_cells (platform, location, date, hour, weekday)")
+        self.conn.execute("DELETE FROM batch_cells")
+        self.conn.executemany("INSERT INTO batch_cells VALUES (?, ?, ?, ?, ?)",
+                              combos.itertuples(index=False, name=None))
+        self.conn.execute(f"INSERT OR IGNORE INTO cells ({', '.join(DIMENSIONS)}) "
+                          f"SELECT {', '.join(DIMENSIONS)} FROM batch_cells")
+        ids = pd.DataFrame(self.conn.execute(
+            "SELECT c.cell, b.* FROM batch_cells b JOIN cells c USING (platform, location, date, hour, weekday)"
+        ).fetchall(), columns=['cell'] + DIMENSIONS)
+        return obs[DIMENSIONS].merge(ids, on=DIMENSIONS, how='left')['cell'].to_numpy()
+
+    def _previous(self, source, row_keys, width):
+        """Cell (-1 if none) and metric values each post contributed last time."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_keys (row_key INTEGER PRIMARY KEY)")
+        self.conn.execute("DELETE FROM batch_keys")
+        self.conn.executemany("INSERT INTO batch_keys VALUES (?)", ((k,) for k in row_keys.tolist()))
+        rows = self.conn.execute(
+            "SELECT c.row_key, c.cell, c.metric_values FROM batch_keys k "
+            "JOIN contributions c ON c.source = ? AND c.row_key = k.row_key", (source,)
+        ).fetchall()
+        cells = np.full(len(row_keys), -1, dtype=np.int64)
+        values = np.full((len(row_keys), width), np.nan)
+        if rows:
+            keys, old_cells, blobs = zip(*rows)
+            position = pd.Index(row_keys).get_indexer(keys)
+            cells[position] = old_cells
+            values[position] = np.frombuffer(b''.join(blobs), dtype=np.float64).reshape(len(rows), width)
+        return cells, values
+
+    def add(self, df, source):
+        """
+        Rolls a batch of `source` posts into the cube. Returns the number of
+        posts that were new or changed.
+        """
+        obs = observations(df, source)
+        if obs.empty:
+            return 0
+        metrics = metric_names(source)
+        with self.conn:
+            row_keys = obs['row_key'].to_numpy(np.int64)
+            cells = self._cell_ids(obs)
+            values = obs[metrics].to_numpy(np.float64)
+            old_cells, old_values = self._previous(source, row_keys, len(metrics))
+            changed = ~((old_cells == cells) & _same(old_values, values).all(axis=1))
+            row_keys, cells, values = row_keys[changed], cells[changed], values[changed]
+            old_cells, old_values = old_cells[changed], old_values[changed]
+
+            # Old contributions come out, new ones go in; one delta per (post, metric) with a value
+            old_rows, old_metrics = np.nonzero(~np.isnan(old_values))
+            new_rows, new_metrics = np.nonzero(~np.isnan(values))
+            deltas = pd.DataFrame({
+                'cell': np.concatenate([old_cells[old_rows], cells[new_rows]]),
+                'metric': np.array(metrics, dtype=object)[np.concatenate([old_metrics, new_metrics])],
+                'count': np.concatenate([np.full(len(old_rows), -1), np.ones(len(new_rows), dtype=np.int64)]),
+                'sum': np.concatenate([-old_values[old_rows, old_metrics], values[new_rows, new_metrics]]),
+                'bucket': bucket_keys(np.concatenate([old_values[old_rows, old_metrics], values[new_rows, new_metrics]])),
+            })
+
+            measures = deltas.groupby(['cell', 'metric'])[['count', 'sum']].sum()
+            self.conn.executemany(
+                "INSERT INTO measures (cell, metric, count, sum) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (cell, metric) DO UPDATE SET count = count + excluded.count, sum = sum + excluded.sum",
+                zip(*[measures.index.get_level_values(i).tolist() for i in range(2)],
+                    measures['count'].tolist(), measures['sum'].tolist()))
+            buckets = deltas.groupby(['cell', 'metric', 'bucket'])['count'].sum()
+            buckets = buckets[buckets != 0]
+            self.conn.executemany(
+                "INSERT INTO buckets (cell, metric, bucket, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (cell, metric, bucket) DO UPDATE SET count = count + excluded.count",
+                zip(*[buckets.index.get_level_values(i).tolist() for i in range(3)], buckets.tolist()))
+            self.conn.execute("DELETE FROM buckets WHERE count = 0")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO contributions (source, row_key, cell, metric_values) VALUES (?, ?, ?, ?)",
+                zip([source] * len(row_keys), row_keys.tolist(), cells.tolist(), (row.tobytes() for row in values)))
+        self._cells = self._buckets = None
+        self._cuboids = {}
+        return int(changed.sum())
+
+    # --- querying ---
+    def cells(self):
+        """
+        Every non-empty (cell, metric) with its dimensions, count and sum, kept
+        in memory (with the bucket counts) until the next update.
+        """
+        if self._cells is None:
+            cells = pd.read_sql_query(
+                "SELECT m.cell, c.platform, c.location, c.date, c.hour, c.weekday, m.metric, m.count, m.sum "
+                "FROM measures m JOIN cells c USING (cell) WHERE m.count > 0 ORDER BY m.cell, m.metric", self.conn)
+            buckets = pd.read_sql_query("SELECT cell, metric, bucket, count FROM buckets "
+                                        "ORDER BY cell, metric, bucket", self.conn)
+            for column in ['platform', 'location', 'date', 'weekday']:
+                cells[column] = cells[column].astype('category')
+            metrics = pd.CategoricalDtype(sorted(set(cells['metric']) | set(buckets['metric'])))
+            cells['metric'] = cells['metric'].astype(metrics)
+            # (cell, metric) as one integer, to find each bucket's row in `cells`
+            width = len(metrics.categories) or 1
+            cells['slot'] = cells['cell'].to_numpy() * width + cells['metric'].cat.codes.to_numpy()
+            keys, rank = np.unique(buckets['bucket'].to_numpy(), return_inverse=True)
+            self._buckets = {
+                'slot': buckets['cell'].to_numpy() * width + buckets['metric'].astype(metrics).cat.codes.to_numpy(),
+                'rank': rank.ravel(),
+                'count': buckets['count'].to_numpy(),
+                'keys': keys,
+            }
+            self._cells = cells
+        return self._cells
+
+    def _cuboid(self, dims):
+        """
+        The cells rolled up to `dims` (plus metric), with their bucket counts.
+        Built on first use and kept until the next update, so repeated
+        dashboard questions only touch the few cells of their cuboid.
+        """
+        key = tuple(dim for dim in DIMENSIONS if dim in dims)
+        if key in self._cuboids:
+            return self._cuboids[key]
+        base, buckets = self.cells(), self._buckets
+        if key == tuple(DIMENSIONS):
+            self._cuboids[key] = base, buckets
+            return self._cuboids[key]
+        grouped = base.groupby([*key, 'metric'], observed=True, sort=True)
+        cells = grouped[['count', 'sum']].sum().reset_index()
+        cells['slot'] = np.arange(len(cells))
+        # Each base bucket row's new slot, through the base row that owns it
+        new_slot = grouped.ngroup().to_numpy()[np.searchsorted(base['slot'].to_numpy(), buckets['slot'])]
+        width = max(len(buckets['keys']), 1)
+        combined = new_slot * width + buckets['rank']
+        if len(cells) * width <= DENSE_QUANTILE_LIMIT:
+            counts = np.bincount(combined, weights=buckets['count'], minlength=len(cells) * width)
+            combined = np.flatnonzero(counts)
+            counts = counts[combined]
+        else:
+            combined, inverse = np.unique(combined, return_inverse=True)
+            counts = np.bincount(inverse.ravel(), weights=buckets['count'], minlength=len(combined))
+        rolled = {'slot': combined // width, 'rank': combined % width, 'count': counts, 'keys': buckets['keys']}
+        self._cuboids[key] = cells, rolled
+        return self._cuboids[key]
+
+    def query(self, metric='engagement', by=(), quantiles=QUANTILES, **filters):
+        """
+        Count, sum, mean and quantiles of `metric`, grouped by the dimensions
+        in `by`. Filters are dimension=value, dimension=[values] or, for an
+        inclusive range, dimension=(low, high), e.g.
+        `query('engagement', by=['hour'], platform='instagram')`.
+        Quantiles are nearest-rank, within RELATIVE_ACCURACY.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        for dim in [*by, *filters]:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension '{dim}'; expected one of {DIMENSIONS}")
+        cells, buckets = self._cuboid({*by, *filters})
+        mask = (cells['metric'] == metric).to_numpy().copy()
+        for dim, value in filters.items():
+            column = cells[dim]
+            if isinstance(value, tuple):
+                low, high = value
+                values = column.astype(object) if isinstance(column.dtype, pd.CategoricalDtype) else column
+                mask &= ((values >= low) & (values <= high)).to_numpy()
+            elif isinstance(value, (list, set)):
+                mask &= column.isin(list(value)).to_numpy()
+            else:
+                mask &= (column == value).to_numpy()
+        selected = cells[mask]
+
+        if by:
+            grouped = selected.groupby(by, observed=True, sort=True)
+            group = grouped.ngroup().to_numpy()
+            result = grouped[['count', 'sum']].sum()
+        else:
+            group = np.zeros(len(selected), dtype=np.int64)
+            result = pd.DataFrame({'count': [int(selected['count'].sum())], 'sum': [selected['sum'].sum()]},
+                                  index=pd.Index(['all'], name=metric))
+        result['mean'] = result['sum'] / result['count'].where(result['count'] > 0)
+        estimates = self._quantiles(buckets, selected['slot'].to_numpy(), group, len(result), quantiles)
+        for q, values in zip(quantiles, estimates):
+            result[f"p{round(q * 100):g}"] = values
+        return result
+
+    @staticmethod
+    def _quantiles(buckets, slots, group, groups, quantiles):
+        """Quantile estimates per group from the summed bucket counts of its cells."""
+        # Buckets are sorted by slot, so each selected slot's buckets are one contiguous run
+        starts = np.searchsorted(buckets['slot'], slots, side='left')
+        lengths = np.searchsorted(buckets['slot'], slots, side='right') - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        rows = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+        in_group = np.repeat(group, lengths)
+        width = len(buckets['keys'])
+        # Bucket counts per group as a dense groups × buckets table, or sparse if that is too big
+        combined = in_group * width + buckets['rank'][rows]
+        if groups * width <= DENSE_QUANTILE_LIMIT:
+            cells = np.arange(groups * width)
+            counts = np.bincount(combined, weights=buckets['count'][rows], minlength=groups * width)
+        else:
+            cells, inverse = np.unique(combined, return_inverse=True)
+            counts = np.bincount(inverse.ravel(), weights=buckets['count'][rows], minlength=len(cells))
+        owner = cells // max(width, 1)
+        cumulative = np.cumsum(counts)
+        totals = np.bincount(owner, weights=counts, minlength=groups)
+        before = np.concatenate([[0], np.cumsum(totals)[:-1]])
+        estimates = []
+        for q in quantiles:
+            # First bucket whose running count within its group passes rank q * (n - 1)
+            position = np.searchsorted(cumulative, before + q * np.maximum(totals - 1, 0), side='right')
+            position = np.minimum(position, max(len(cells) - 1, 0))
+            values = bucket_values(buckets['keys'][cells[position] % width]) if len(cells) else np.zeros(groups)
+            estimates.append(np.where(totals > 0, values, np.nan))
+        return estimates
+
+    def close(self):
+        self.conn.close()
+
+
+def update(rollup, sources=None, chunksize=100_000):
+    """Rolls every source's CSV into the cube, chunk by chunk; returns the changed posts per source."""
+    changed = {}
+    for source in sources or SOURCES:
+        path = SOURCES[source]['csv']
+        if not Path(path).exists():
+            print(f"Skipping {source}: '{path}' not found")
+            continue
+        changed[source] = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize, encoding='utf-8-sig'):
+            changed[source] += rollup.add(chunk, source)
+        print(f"{source}: {changed[source]} new or changed posts rolled up")
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', default=DEFAULT_ROLLUP_DB)
+    parser.add_argument('--source', action='append', choices=list(SOURCES), help="roll up only these sources")
+    parser.add_argument('--skip-update', action='store_true', help="only answer the query from the cube as it is")
+    parser.add_argument('--metric', default='engagement')
+    parser.add_argument('--by', nargs='*', default=['platform', 'hour'])
+    parser.add_argument('--platform', help="only this platform's cells")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rollup = Rollup(args.db)
+    if not args.skip_update:
+        update(rollup, args.source, args.chunksize)
+    filters = {'platform': args.platform} if args.platform else {}
+    result = rollup.query(args.metric, by=args.by, **filters)
+    print(f"\n{args.metric} by {', '.join(args.by) or 'nothing'}:")
+    print(result.to_string(float_format=lambda v: f"{v:,.1f}"))
+    rollup.close()
@@ -0,0 +1,236 @@
+"""
+Full-text search over the cleaned posts from every platform, backed by SQLite FTS5.
+
+    python search_index.py                      # index new or changed documents
+    python search_index.py 'late AND "cold food"' --platform reddit --location mumbai
+    python search_index.py 'swigg*' --limit 20
+
+Queries use FTS5 syntax: AND / OR / NOT, "exact phrases", prefix* and
+parentheses. Platform and location are indexed as their own FTS columns, so
+filters are resolved inside the index rather than by scanning matches.
+"""
+
+import argparse
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+import data_lake
+
+DB_PATH = 'data/search_index.db'
+
+# Where each platform's cleaned text comes from. `id` names the column that
+# identifies a document; without one, documents are keyed on a hash of `key_columns`.
+# `tokens` marks a text column holding token lists rather than strings, and
+# `date_url` a status-URL column whose snowflake ID dates rows that have no `date`.
+SOURCES = {
+    'twitter': {'csv': 'data/twts_clean.csv', 'dataset': 'tweets_clean', 'text': 'cleaned_text_str',
+                'id': 'tweet_url', 'location': None, 'date': 'created_at', 'date_url': 'tweet_url'},
+    'reddit': {'csv': 'data/reddit_data_cleaned.csv', 'dataset': 'reddit_clean', 'text': 'cleaned_text_tokens',
+               'tokens': True, 'id': None, 'key_columns': ['source_platform', 'location', 'post_author', 'comment_author', 'text'],
+               'location': 'location', 'date': None},
+    'youtube': {'csv': 'data/youtube_comments.csv', 'dataset': 'youtube_comments', 'text': 'comment_text',
+                'id': None, 'key_columns': ['video_id', 'author', 'publish_date', 'comment_text'],
+                'location': None, 'date': 'publish_date'},
+    'instagram': {'csv': 'insta_cleaned_slim.csv', 'dataset': None, 'text': 'caption_clean',
+                  'id': 'url', 'location': None, 'date': 'posted_at'},
+}
+
+# SQLite caps bound parameters per statement
+LOOKUP_BATCH = 900
+
+
+class SearchIndex:
+    """
+    An FTS5 index of documents keyed by `<platform>:<id>`. Re-indexing a source
+    only touches documents that are new or whose text, location or date changed.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_documents (
+                id INTEGER PRIMARY KEY,
+                doc_key TEXT NOT NULL UNIQUE,
+                content_hash TEXT NOT NULL
+            )
+        """)
+        # remove_diacritics only folds Latin accents; Devanagari matras are kept.
+        # Prefix indexes on 2-4 characters keep queries like swig* off a full term scan.
+        self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                body, platform, location, date UNINDEXED, doc_key UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _existing(self, keys):
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            found.update((key, (doc_id, content_hash)) for key, doc_id, content_hash in self.conn.execute(
+                f"SELECT doc_key, id, content_hash FROM search_documents WHERE doc_key IN ({','.join('?' * len(batch))})",
+                batch
+            ))
+        return found
+
+    def add_documents(self, docs):
+        """
+        Indexes (doc_key, body, platform, location, date) tuples in one
+        transaction. Returns (added, updated); unchanged documents are skipped.
+        """
+        docs = list({doc[0]: doc for doc in docs}.values())
+        existing = self._existing([doc[0] for doc in docs])
+        new_docs, changed_docs = [], []
+        for doc in docs:
+            content_hash = hashlib.sha1('\x1f'.join(str(v) for v in doc[1:]).encode('utf-8')).hexdigest()
+            if doc[0] not in existing:
+                new_docs.append((doc, content_hash))
+            elif existing[doc[0]][1] != content_hash:
+                changed_docs.append((existing[doc[0]][0], doc, content_hash))
+
+        with self.conn:
+            next_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM search_documents").fetchone()[0]
+            ids = range(next_id, next_id + len(new_docs))
+            self.conn.executemany(
+                "INSERT INTO search_documents (id, doc_key, content_hash) VALUES (?, ?, ?)",
+                [(doc_id, doc[0], content_hash) for doc_id, (doc, content_hash) in zip(ids, new_docs)]
+            )
+            self.conn.executemany(
+                "INSERT INTO search_fts (rowid, body, platform, location, date, doc_key) VALUES (?, ?, ?, ?, ?, ?)",
+                [(doc_id, doc[1], doc[2], doc[3], doc[4], doc[0]) for doc_id, (doc, _) in zip(ids, new_docs)]
+            )
+            self.conn.executemany("DELETE FROM search_fts WHERE rowid = ?", [(doc_id,) for doc_id, _, _ in changed_docs])
+            self.conn.executemany(
+                "INSERT INTO search_fts (rowid, body, platform, location, date, doc_key) VALUES (?, ?, ?, ?, ?, ?)",
+                [(doc_id, doc[1], doc[2], doc[3], doc[4], doc[0]) for doc_id, doc, _ in changed_docs]
+            )
+            self.conn.executemany(
+                "UPDATE search_documents SET content_hash = ? WHERE id = ?",
+                [(content_hash, doc_id) for doc_id, _, content_hash in changed_docs]
+            )
+        return len(new_docs), len(changed_docs)
+
+    def optimize(self):
+        """Merges the index's b-trees; worth running after a large load."""
+        with self.conn:
+            self.conn.execute("INSERT INTO search_fts (search_fts) VALUES ('optimize')")
+
+    def search(self, query, platform=None, location=None, limit=50, ranked=False):
+        """
+        Runs an FTS5 query over document bodies. `ranked=True` orders by BM25,
+        which has to score every match, so it is slower for very common terms.
+        """
+        order = "ORDER BY rank" if ranked else ""
+        return pd.read_sql_query(
+            f"""SELECT doc_key, platform, location, date,
+                       snippet(search_fts, 0, '[', ']', '…', 12) AS snippet
+                FROM search_fts WHERE search_fts MATCH ? {order} LIMIT ?""",
+            self.conn, params=(_match(query, platform, location), limit)
+        )
+
+    def count(self, query, platform=None, location=None):
+        return self.conn.execute("SELECT COUNT(*) FROM search_fts WHERE search_fts MATCH ?",
+                                 (_match(query, platform, location),)).fetchone()[0]
+
+
+def _match(query, platform=None, location=None):
+    """Scopes a user query to the body column and adds the platform/location filters."""
+    match = f"body : ({query})"
+    if platform:
+        match += f' AND platform : {_phrase(platform)}'
+    if location:
+        match += f' AND location : {_phrase(location)}'
+    return match
+
+
+def _phrase(value):
+    # Inside an FTS5 string a double quote is escaped by doubling it
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _token_text(value):
+    # Token lists arrive as lists from the data lake and in printed form from CSV
+    if isinstance(value, str) and value.startswith('['):
+        value = data_lake._parse_token_list(value)
+    return ' '.join(value) if isinstance(value, list) else value
+
+
+def documents(df, platform):
+    """Turns a cleaned DataFrame from `platform` into (doc_key, body, platform, location, date) tuples."""
+    spec = SOURCES[platform]
+    text = df[spec['text']]
+    if spec.get('tokens'):
+        text = text.map(_token_text)
+    text = text.fillna('').astype(str)
+
+    if spec['id']:
+        ids = df[spec['id']].astype(str)
+    else:
+        # hash_pandas_object uses a fixed key, so the same row gets the same id on every run
+        key_frame = df.reindex(columns=spec['key_columns']).astype(str)
+        ids = pd.util.hash_pandas_object(key_frame, index=False).map('{:016x}'.format)
+    location = df[spec['location']].fillna('').astype(str) if spec['location'] else pd.Series('', index=df.index)
+    date = df[spec['date']] if spec['date'] in df.columns else pd.Series(None, index=df.index, dtype=object)
+    if spec.get('date_url'):
+        times = pd.to_datetime(date, errors='coerce', utc=True, format='ISO8601')
+        date = times.fillna(data_lake.tweet_times(df[spec['date_url']].astype(str))).dt.strftime('%Y-%m-%d')
+    date = date.fillna('').astype(str).str[:10]
+
+    keep = text.str.len() > 0
+    return list(zip(platform + ':' + ids[keep], text[keep], [platform] * int(keep.sum()),
+                    location[keep], date[keep]))
+
+
+def iter_source(platform, chunksize=100_000):
+    """Reads a platform's cleaned output from the data lake if present, else from its CSV."""
+    spec = SOURCES[platform]
+    if spec['dataset'] and data_lake.exists(spec['dataset']):
+        yield from data_lake.iter_batches(spec['dataset'], batch_size=chunksize)
+    elif Path(spec['csv']).exists():
+        yield from pd.read_csv(spec['csv'], chunksize=chunksize)
+
+
+def update_index(index, platforms=None, chunksize=100_000):
+    """Indexes every source; returns {platform: (added, updated)}."""
+    summary = {}
+    for platform in platforms or SOURCES:
+        added = updated = 0
+        for chunk in iter_source(platform, chunksize):
+            a, u = index.add_documents(documents(chunk, platform))
+            added += a
+            updated += u
+        summary[platform] = (added, updated)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('query', nargs='?', help="FTS5 query; omit to update the index")
+    parser.add_argument('--platform', choices=list(SOURCES))
+    parser.add_argument('--location')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--ranked', action='store_true', help="order results by BM25")
+    args = parser.parse_args()
+
+    index = SearchIndex()
+    if args.query is None:
+        for platform, (added, updated) in update_index(index).items():
+            print(f"{platform}: {added} documents added, {updated} updated")
+        index.optimize()
+    else:
+        total = index.count(args.query, args.platform, args.location)
+        results = index.search(args.query, args.platform, args.location, args.limit, args.ranked)
+        print(f"{total} matching documents")
+        for row in results.itertuples():
+            print(f"[{row.platform}{'/' + row.location if row.location else ''} {row.date}] {row.snippet}")
+    index.close()
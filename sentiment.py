@@ -0,0 +1,187 @@
+"""
+Lexicon sentiment scoring over cleaned tokens, for millions of documents at once.
+
+Every vocabulary entry of a TokenCorpus is looked up in the lexicons once;
+after that the scoring is array arithmetic over the corpus's token ids:
+
+  - a known word right after a modifier ("very", "bahut") has its polarity
+    scaled by the modifier's intensity, and the modifier itself is not scored
+  - a known word within NEGATION_WINDOW tokens after a negation ("dont",
+    "nahi", "नहीं") in the same document has its polarity multiplied by -0.5
+  - a document's polarity is the mean over its known words (0 if it has none)
+
+This follows TextBlob's pattern analyzer, with one difference: the cleaners
+drop English "not" and "no" as stopwords and strip "n't", so negation
+reaches over a few tokens instead of only across one-letter words.
+
+The lexicons are tab-separated files in lexicons/: the English one is
+derived from the pattern lexicon TextBlob ships, and the Hinglish one adds
+romanized Hindi and Devanagari words, which the cleaners keep.
+"""
+
+import argparse
+import csv
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_lake
+from token_corpus import TokenCorpus
+
+LEXICON_DIR = Path(__file__).resolve().parent / 'lexicons'
+DEFAULT_LEXICONS = (LEXICON_DIR / 'sentiment_en.tsv', LEXICON_DIR / 'sentiment_hinglish.tsv')
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.5
+LABEL_THRESHOLD = 0.05
+BATCH_DOCS = 1_000_000   # documents scored at a time, to bound the per-token temporary arrays
+
+
+class SentimentLexicon:
+
+    def __init__(self, table):
+        """`table` has columns word, polarity, intensity and role (word, modifier or negation)."""
+        # Later lexicons win for words listed twice
+        table = table.drop_duplicates('word', keep='last')
+        self.words = pd.Index(table['word'].to_numpy(dtype=object))
+        self.polarity = table['polarity'].to_numpy(dtype=np.float32)
+        self.intensity = table['intensity'].to_numpy(dtype=np.float32)
+        role = table['role'].to_numpy(dtype=object)
+        self.is_modifier = role == 'modifier'
+        self.is_negation = role == 'negation'
+
+    @classmethod
+    def load(cls, paths=DEFAULT_LEXICONS):
+        tables = [pd.read_csv(path, sep='\t', comment='#', keep_default_na=False, quoting=csv.QUOTE_NONE)
+                  for path in paths]
+        return cls(pd.concat(tables, ignore_index=True))
+
+    def __len__(self):
+        return len(self.words)
+
+    def lookup(self, vocab):
+        """
+        Per vocabulary entry: polarity (NaN for words that are not scored),
+        intensity, and whether it is a modifier or a negation.
+        """
+        entry = self.words.get_indexer(pd.Series(vocab, dtype=object).str.lower())
+        found = entry >= 0
+        polarity = np.full(len(entry), np.nan, dtype=np.float32)
+        intensity = np.ones(len(entry), dtype=np.float32)
+        is_modifier = np.zeros(len(entry), dtype=bool)
+        is_negation = np.zeros(len(entry), dtype=bool)
+        polarity[found] = self.polarity[entry[found]]
+        intensity[found] = self.intensity[entry[found]]
+        is_modifier[found] = self.is_modifier[entry[found]]
+        is_negation[found] = self.is_negation[entry[found]]
+        polarity[is_negation] = np.nan
+        return polarity, intensity, is_modifier, is_negation
+
+
+_default_lexicon = None
+
+
+def default_lexicon():
+    global _default_lexicon
+    if _default_lexicon is None:
+        _default_lexicon = SentimentLexicon.load()
+    return _default_lexicon
+
+
+def _score_tokens(token_ids, offsets, tables):
+    """Polarity sum and number of scored words per document, for one CSR slice."""
+    polarity, intensity, is_modifier, is_negation = tables
+    ids = np.asarray(token_ids)
+    lengths = np.diff(offsets)
+    docs = len(lengths)
+    doc = np.repeat(np.arange(docs), lengths)
+    position = np.arange(len(ids))
+    doc_start = np.repeat(offsets[:-1] - offsets[0], lengths)
+    has_prev = position > doc_start
+
+    p = polarity[ids]
+    known = ~np.isnan(p)
+
+    # Modifier directly before a known word: scale the word, drop the modifier
+    modified = np.zeros(len(ids), dtype=bool)
+    modified[1:] = known[1:] & is_modifier[ids[:-1]] & has_prev[1:]
+    scale = np.ones(len(ids), dtype=np.float32)
+    scale[1:] = intensity[ids[:-1]]
+    p = np.where(modified, np.clip(p * scale, -1.0, 1.0), p)
+    scored = known.copy()
+    scored[:-1] &= ~modified[1:]
+
+    # Position of the latest negation strictly before each token
+    negation_at = np.where(is_negation[ids], position, -1)
+    last_negation = np.empty(len(ids), dtype=np.int64)
+    if len(ids):
+        last_negation[0] = -1
+        last_negation[1:] = np.maximum.accumulate(negation_at)[:-1]
+    negated = (last_negation >= doc_start) & (position - last_negation <= NEGATION_WINDOW)
+    p = np.where(negated, p * NEGATION_FACTOR, p)
+
+    sums = np.bincount(doc[scored], weights=p[scored], minlength=docs)
+    hits = np.bincount(doc[scored], minlength=docs)
+    return sums, hits
+
+
+def score_corpus(corpus, lexicon=None):
+    """Polarity in [-1, 1], number of scored words and a label for every document of `corpus`."""
+    tables = (lexicon or default_lexicon()).lookup(corpus.vocab)
+    sums = np.zeros(len(corpus))
+    hits = np.zeros(len(corpus), dtype=np.int64)
+    offsets = np.asarray(corpus.offsets, dtype=np.int64)
+    for start in range(0, len(corpus), BATCH_DOCS):
+        end = min(start + BATCH_DOCS, len(corpus))
+        batch = offsets[start:end + 1]
+        sums[start:end], hits[start:end] = _score_tokens(corpus.token_ids[batch[0]:batch[-1]], batch, tables)
+    polarity = np.divide(sums, hits, out=np.zeros(len(corpus)), where=hits > 0)
+    label = np.full(len(corpus), 'neutral', dtype=object)
+    label[polarity > LABEL_THRESHOLD] = 'positive'
+    label[polarity < -LABEL_THRESHOLD] = 'negative'
+    return pd.DataFrame({'polarity': polarity, 'hits': hits, 'label': label})
+
+
+def score_frame(df, column=None, corpus=None, prefix='sentiment_', lexicon=None):
+    """
+    Adds `{prefix}polarity`, `{prefix}hits` and `{prefix}label` to `df`, scored
+    from its token `column` or from `corpus`, which holds the same rows in order.
+    """
+    if corpus is None:
+        corpus = TokenCorpus.from_series(df[column])
+    if len(corpus) != len(df):
+        raise ValueError(f"Corpus has {len(corpus)} documents but the frame has {len(df)} rows")
+    scores = score_corpus(corpus, lexicon)
+    for name in scores.columns:
+        df[prefix + name] = scores[name].to_numpy()
+    return df
+
+
+# (cleaned CSV, token column, saved corpus of that column, columns that identify a row, scores CSV)
+SOURCES = [
+    ('data/twts_clean.csv', 'cleaned_tokens', 'data/twts_clean.tokens', ['tweet_url'], 'data/twts_sentiment.csv'),
+    ('reddit_data_cleaned_2.csv', 'cleaned_text_tokens', 'reddit_data_cleaned_2.tokens', data_lake.REDDIT_KEY,
+     'reddit_data_sentiment.csv'),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefix', default='sentiment_')
+    args = parser.parse_args()
+
+    for path, column, tokens_path, key, output in SOURCES:
+        if not Path(path).exists():
+            print(f"Skipping '{path}': not found")
+            continue
+        df = pd.read_csv(path)
+        # The saved corpus skips parsing the printed token lists, when it is in step with the CSV
+        corpus = TokenCorpus.load(tokens_path) if Path(tokens_path).exists() else None
+        if corpus is None or len(corpus) != len(df):
+            corpus = TokenCorpus.from_series(df[column])
+        # Scores go to their own file, joined back on `key`: the cleaners own the cleaned
+        # CSV and append to it with their own columns
+        scores = score_frame(df[key].copy(), corpus=corpus, prefix=args.prefix)
+        scores.to_csv(output, index=False)
+        counts = scores[args.prefix + 'label'].value_counts()
+        print(f"Scored {len(scores)} rows of '{path}' into '{output}': "
+              + ', '.join(f"{counts.get(label, 0)} {label}" for label in ('positive', 'negative', 'neutral')))
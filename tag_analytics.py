@@ -0,0 +1,374 @@
+"""
+Hashtag and mention analytics: top tags, tags that co-occur with a tag, and
+trending tags between time windows, built a batch of posts at a time.
+
+Each batch is turned into a posts × tags 0/1 sparse matrix X; the number of
+posts per tag is X's column sums and the number of posts per tag pair the
+upper triangle of X.T @ X, so pairs are never materialized row by row.
+Batch totals are then folded into one of two stores:
+
+  - 'exact': a tag vocabulary, a count array and a symmetric scipy.sparse
+    co-occurrence matrix. Memory grows with the distinct tags and pairs.
+  - 'sketch': Count-Min sketches for tag and pair counts, plus Space-Saving
+    summaries that track which tags and pairs are the heaviest. Memory is
+    fixed by `width`, `depth` and `capacity`; counts are overestimates by at
+    most a small fraction of the stream.
+
+Tags are lowercased, so '#Zomato' and '#zomato' count as one, and keep their
+'#' or '@', so hashtags and mentions stay apart. Windows (e.g. one per day)
+keep tag counts only, and only the `max_windows` most recent are kept.
+"""
+
+import argparse
+import ast
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix, triu
+
+import data_lake
+from near_duplicates import token_hashes
+from token_corpus import TokenCorpus
+
+WINDOW = '1D'
+MAX_WINDOWS = 30
+SKETCH_WIDTH = 2**18
+SKETCH_DEPTH = 4
+CAPACITY = 10_000
+
+
+def parse_tags(value):
+    """Tag list from a list, its printed form ("['#a', '#b']") or '|'-joined text."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            return ast.literal_eval(value)
+        return [tag for tag in value.split('|') if tag]
+    return value if isinstance(value, (list, tuple, np.ndarray)) else ()
+
+
+def _tag_matrix(tag_lists):
+    """Posts × tags 0/1 matrix for a batch of tag lists, and the batch's tags."""
+    corpus = TokenCorpus.from_token_lists([tags if type(tags) is list else parse_tags(tags) for tags in tag_lists])
+    codes, tags = pd.factorize(pd.Series(corpus.vocab, dtype=object).str.lower())
+    columns = codes[corpus.token_ids] if len(corpus.token_ids) else np.zeros(0, dtype=np.int64)
+    matrix = csr_matrix((np.ones(len(columns), dtype=np.int64), (corpus.doc_index(), columns)),
+                        shape=(len(corpus), len(tags)))
+    # A tag repeated within a post counts once
+    matrix.data[:] = 1
+    return matrix, np.asarray(tags, dtype=object)
+
+
+class TagBatch:
+    """Per-tag and per-pair post counts of one batch."""
+
+    def __init__(self, matrix, tags, pairs=True):
+        counts = np.asarray(matrix.sum(axis=0)).ravel()
+        # A slice of a batch (one window's posts) still has every tag of the batch as a column
+        present = np.flatnonzero(counts)
+        if len(present) < len(tags):
+            matrix, tags, counts = matrix[:, present], tags[present], counts[present]
+        self.tags = tags
+        self.counts = counts
+        if pairs:
+            together = triu(matrix.T @ matrix, k=1).tocoo()
+            self.pair_rows, self.pair_cols, self.pair_counts = together.row, together.col, together.data
+        else:
+            self.pair_rows = self.pair_cols = self.pair_counts = None
+
+    def pair_keys(self):
+        """'a b' with the two tags in sorted order, one per pair."""
+        a, b = self.tags[self.pair_rows], self.tags[self.pair_cols]
+        first = np.where(a < b, a, b)
+        second = np.where(a < b, b, a)
+        return (pd.Series(first, dtype=object) + ' ' + pd.Series(second, dtype=object)).to_numpy(dtype=object)
+
+
+class CountMinSketch:
+    """Count-Min sketch over 64-bit key hashes; estimates never undercount."""
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH, seed=1):
+        if width & (width - 1):
+            raise ValueError("width must be a power of two")
+        rng = np.random.default_rng(seed)
+        self.shift = np.uint64(64 - int(width).bit_length() + 1)
+        self.multipliers = rng.integers(1, 2**63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _buckets(self, hashes):
+        # Multiply-shift: the top bits of a * h index each row
+        with np.errstate(over='ignore'):
+            return (np.asarray(hashes, dtype=np.uint64)[None, :] * self.multipliers[:, None]) >> self.shift
+
+    def add(self, hashes, counts):
+        width = self.table.shape[1]
+        for row, buckets in enumerate(self._buckets(hashes)):
+            self.table[row] += np.bincount(buckets.astype(np.int64), weights=counts, minlength=width).astype(np.int64)
+
+    def estimate(self, hashes):
+        buckets = self._buckets(hashes).astype(np.int64)
+        return self.table[np.arange(len(self.table))[:, None], buckets].min(axis=0)
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters (Metwally et al.), merged a batch at a time:
+    batch counts are added to the tracked keys, unseen keys start from the
+    smallest tracked count (their worst-case undercount, kept in `errors`),
+    and only the `capacity` largest are kept.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+
+    def add(self, keys, counts):
+        batch = pd.Series(counts, index=pd.Index(keys, dtype=object), dtype='int64')
+        batch = batch.groupby(level=0, sort=False).sum()
+        floor = int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+        known = batch.index.isin(self.counts.index)
+        counts = self.counts.add(batch[known], fill_value=0).astype('int64')
+        new = batch[~known]
+        counts = pd.concat([counts, new + floor])
+        errors = pd.concat([self.errors, pd.Series(floor, index=new.index, dtype='int64')])
+        if len(counts) > self.capacity:
+            counts = counts.nlargest(self.capacity)
+        self.counts = counts
+        self.errors = errors.reindex(counts.index)
+
+    def top(self, k):
+        return self.counts.nlargest(k)
+
+
+class ExactTagCounts:
+
+    def __init__(self, cooccurrence=True):
+        self.tags = []
+        self.ids = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.cooccurrence = csr_matrix((0, 0), dtype=np.int64) if cooccurrence else None
+
+    def _tag_ids(self, tags):
+        ids = np.empty(len(tags), dtype=np.int64)
+        for i, tag in enumerate(tags):
+            tag_id = self.ids.get(tag)
+            if tag_id is None:
+                tag_id = self.ids[tag] = len(self.tags)
+                self.tags.append(tag)
+            ids[i] = tag_id
+        return ids
+
+    def add(self, batch):
+        ids = self._tag_ids(batch.tags)
+        size = len(self.tags)
+        if size > len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros(size - len(self.counts), dtype=np.int64)])
+        self.counts[ids] += batch.counts
+        if self.cooccurrence is not None:
+            rows, cols = ids[batch.pair_rows], ids[batch.pair_cols]
+            pairs = coo_matrix((np.concatenate([batch.pair_counts, batch.pair_counts]),
+                                (np.concatenate([rows, cols]), np.concatenate([cols, rows]))), shape=(size, size))
+            self.cooccurrence.resize((size, size))
+            self.cooccurrence = self.cooccurrence + pairs.tocsr()
+
+    def candidates(self):
+        return np.asarray(self.tags, dtype=object)[self.counts > 0]
+
+    def estimate(self, tags):
+        ids = np.fromiter((self.ids.get(tag, -1) for tag in tags), dtype=np.int64, count=len(tags))
+        return np.where(ids >= 0, self.counts[np.maximum(ids, 0)] if len(self.counts) else 0, 0)
+
+    def top(self, k):
+        order = np.argsort(-self.counts, kind='stable')[:k]
+        return pd.Series(self.counts[order], index=np.asarray(self.tags, dtype=object)[order], dtype='int64')
+
+    def related(self, tag, k):
+        tag_id = self.ids.get(tag)
+        if tag_id is None or self.cooccurrence is None:
+            return pd.Series(dtype='int64')
+        row = self.cooccurrence[tag_id]
+        order = np.argsort(-row.data, kind='stable')[:k]
+        return pd.Series(row.data[order], index=np.asarray(self.tags, dtype=object)[row.indices[order]],
+                         dtype='int64')
+
+
+class SketchTagCounts:
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH, capacity=CAPACITY, cooccurrence=True, seed=1):
+        self.tag_counts = CountMinSketch(width, depth, seed)
+        self.top_tags = SpaceSaving(capacity)
+        self.pair_counts = CountMinSketch(width, depth, seed + 1) if cooccurrence else None
+        self.top_pairs = SpaceSaving(capacity) if cooccurrence else None
+
+    def add(self, batch):
+        self.tag_counts.add(token_hashes(batch.tags), batch.counts)
+        self.top_tags.add(batch.tags, batch.counts)
+        if self.pair_counts is not None and len(batch.pair_counts):
+            keys = batch.pair_keys()
+            self.pair_counts.add(token_hashes(keys), batch.pair_counts)
+            self.top_pairs.add(keys, batch.pair_counts)
+
+    def candidates(self):
+        return self.top_tags.counts.index.to_numpy(dtype=object)
+
+    def estimate(self, tags):
+        return self.tag_counts.estimate(token_hashes(tags)) if len(tags) else np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def _tightest(summary, sketch, keys):
+        # Both are upper bounds on the true count; the smaller one is closer
+        counts = np.minimum(summary.counts[keys].to_numpy(), sketch.estimate(token_hashes(keys)))
+        return pd.Series(counts, index=keys, dtype='int64').sort_values(ascending=False, kind='stable')
+
+    def top(self, k):
+        keys = self.top_tags.counts.index.to_numpy(dtype=object)
+        return self._tightest(self.top_tags, self.tag_counts, keys).head(k)
+
+    def related(self, tag, k):
+        if self.top_pairs is None or not len(self.top_pairs.counts):
+            return pd.Series(dtype='int64')
+        keys = self.top_pairs.counts.index.to_series()
+        parts = keys.str.split(' ', n=1, expand=True)
+        mine = (parts[0] == tag) | (parts[1] == tag)
+        if not mine.any():
+            return pd.Series(dtype='int64')
+        counts = self._tightest(self.top_pairs, self.pair_counts, keys[mine].to_numpy(dtype=object))
+        others = np.where(parts.loc[counts.index, 0] == tag, parts.loc[counts.index, 1], parts.loc[counts.index, 0])
+        return pd.Series(counts.to_numpy(), index=others, dtype='int64').head(k)
+
+
+class TagAnalytics:
+    """
+    Running tag statistics over all posts, plus tag counts per time window.
+    `mode` is 'exact' or 'sketch'; `window` is a pandas frequency for
+    `Series.dt.floor` (e.g. '1D', '6h').
+    """
+
+    def __init__(self, mode='exact', window=WINDOW, max_windows=MAX_WINDOWS,
+                 width=SKETCH_WIDTH, depth=SKETCH_DEPTH, capacity=CAPACITY):
+        if mode not in ('exact', 'sketch'):
+            raise ValueError(f"Unknown mode '{mode}'; expected 'exact' or 'sketch'")
+        self.mode = mode
+        self.window = window
+        self.max_windows = max_windows
+        self.sketch_args = (width, depth, capacity)
+        self.total = self._counts(cooccurrence=True)
+        self.windows = {}
+        self.posts = 0
+
+    def _counts(self, cooccurrence):
+        if self.mode == 'exact':
+            return ExactTagCounts(cooccurrence)
+        width, depth, capacity = self.sketch_args
+        return SketchTagCounts(width, depth, capacity, cooccurrence)
+
+    def add(self, tag_lists, times=None):
+        """Adds a batch of posts: their tag lists and, for the windows, their timestamps."""
+        matrix, tags = _tag_matrix(tag_lists)
+        self.posts += matrix.shape[0]
+        self.total.add(TagBatch(matrix, tags))
+        if times is None:
+            return
+        times = times.reset_index(drop=True) if isinstance(times, pd.Series) else pd.Series(times)
+        labels = pd.to_datetime(times, errors='coerce', utc=True).dt.floor(self.window)
+        for label in labels.dropna().unique():
+            rows = (labels == label).to_numpy()
+            if label not in self.windows:
+                self.windows[label] = self._counts(cooccurrence=False)
+            self.windows[label].add(TagBatch(matrix[rows], tags, pairs=False))
+        # Keep the most recent windows only
+        for label in sorted(self.windows)[:-self.max_windows]:
+            del self.windows[label]
+
+    def top(self, k=20):
+        """The `k` tags in the most posts, with their post counts."""
+        return self.total.top(k)
+
+    def related(self, tag, k=20):
+        """The `k` tags that appear in the most posts together with `tag`."""
+        return self.total.related(tag.lower(), k)
+
+    def trending(self, current=None, previous=None, k=20):
+        """
+        Tags whose post count grew the most from window `previous` to
+        `current` (by default the two latest windows). Only tags that grew are
+        listed, so fewer than `k` come back when fewer grew.
+        """
+        labels = sorted(self.windows)
+        if current is None:
+            if len(labels) < 2:
+                return pd.DataFrame(columns=['tag', 'previous', 'current', 'delta', 'growth'])
+            previous, current = labels[-2], labels[-1]
+        current, previous = pd.Timestamp(current), pd.Timestamp(previous)
+        before, after = self.windows.get(previous), self.windows.get(current)
+        if after is None:
+            raise KeyError(f"No window {current}; windows kept: {[str(label) for label in labels]}")
+        tags = after.candidates()
+        if before is not None:
+            tags = pd.unique(np.concatenate([tags, before.candidates()]))
+        result = pd.DataFrame({
+            'tag': tags,
+            'previous': before.estimate(tags) if before is not None else 0,
+            'current': after.estimate(tags),
+        })
+        result['delta'] = result['current'] - result['previous']
+        # Add-one smoothing, so tags new in this window do not divide by zero
+        result['growth'] = (result['current'] + 1) / (result['previous'] + 1)
+        result = result[result['delta'] > 0]
+        return result.sort_values(['delta', 'growth'], ascending=False, kind='stable').head(k).reset_index(drop=True)
+
+
+def tweet_times(df):
+    """Tweet timestamps from `created_at`, or from the snowflake IDs in the status URLs."""
+    if 'created_at' in df.columns:
+        return pd.to_datetime(df['created_at'], errors='coerce', utc=True)
+    # Excel rounded tweet_id in the CSVs; the status URL still has it exactly
+    return data_lake.tweet_times(df['tweet_url'])
+
+
+# (platform, CSV, tag columns, timestamp column or function)
+SOURCES = [
+    ('twitter', 'data/zomato_tweets.csv', ['hashtags'], tweet_times),
+    ('instagram', 'insta_cleaned_slim.csv', ['hashtags', 'mentions'], 'posted_at'),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['exact', 'sketch'], default='exact')
+    parser.add_argument('--window', default=WINDOW, help="pandas frequency of the trending windows")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--tag', action='append', default=[], help="also list the tags that co-occur with this one")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    analytics = TagAnalytics(args.mode, args.window)
+    for platform, path, columns, time_column in SOURCES:
+        if not Path(path).exists():
+            print(f"Skipping {platform}: '{path}' not found")
+            continue
+        rows = 0
+        for chunk in pd.read_csv(path, chunksize=args.chunksize, encoding='utf-8-sig'):
+            times = time_column(chunk) if callable(time_column) else chunk[time_column]
+            # Hashtags and mentions of a post go in together, so they count as co-occurring
+            tag_lists = chunk[columns[0]].map(parse_tags).map(list)
+            for column in columns[1:]:
+                tag_lists = tag_lists + chunk[column].map(parse_tags).map(list)
+            analytics.add(tag_lists, times)
+            rows += len(chunk)
+        print(f"Added {rows} {platform} posts")
+
+    print(f"\nTop {args.top} tags over {analytics.posts} posts ({args.mode}):")
+    print(analytics.top(args.top).to_string())
+    for tag in args.tag:
+        print(f"\nTags that appear with {tag}:")
+        print(analytics.related(tag, args.top).to_string())
+    if len(analytics.windows) >= 2:
+        previous, current = sorted(analytics.windows)[-2:]
+        trending = analytics.trending(k=args.top)
+        if len(trending):
+            print(f"\nTrending from {previous} to {current}:")
+            print(trending.to_string(index=False))
+        else:
+            print(f"\nNo tag grew from {previous} to {current}")
@@ -0,0 +1,141 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Next to this module rather than the working directory, so every run shares one store
+DEFAULT_CACHE_DB = str(Path(__file__).resolve().parent / 'data' / 'token_cache.db')
+
+class TokenCache:
+    """
+    Memoizes a one-token-in, one-string-out transform (lemmatize, segment, correct).
+    Results are kept in a bounded in-memory LRU and, when `db_path` is given,
+    in a SQLite table that persists across runs, keyed by (transform name,
+    version, token).
+    Bump `version` whenever the transform's output can change. The time each
+    value originally took to compute is stored alongside it, so hits report the
+    work they actually avoided.
+    """
+
+    def __init__(self, name, version, transform, db_path=None,
+                 max_memory_items=200_000, flush_every=5_000):
+        self.name = name
+        self.version = str(version)
+        self.transform = transform
+        self.max_memory_items = max_memory_items
+        self.flush_every = flush_every
+        self.memory = OrderedDict()
+        self.pending = []
+        self.reset_stats()
+
+        self.conn = None
+        if db_path is None:
+            return
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS token_cache (
+                transform TEXT NOT NULL,
+                version TEXT NOT NULL,
+                token TEXT NOT NULL,
+                value TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                PRIMARY KEY (transform, version, token)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def reset_stats(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.compute_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def __call__(self, token):
+        entry = self.memory.get(token)
+        if entry is not None:
+            self.memory_hits += 1
+            self.saved_seconds += entry[1]
+            self.memory.move_to_end(token)
+            return entry[0]
+
+        entry = self.conn and self.conn.execute(
+            "SELECT value, seconds FROM token_cache WHERE transform = ? AND version = ? AND token = ?",
+            (self.name, self.version, token)
+        ).fetchone()
+        if entry is not None:
+            self.disk_hits += 1
+            self.saved_seconds += entry[1]
+        else:
+            self.misses += 1
+            start = time.perf_counter()
+            value = self.transform(token)
+            seconds = time.perf_counter() - start
+            self.compute_seconds += seconds
+            entry = (value, seconds)
+            if self.conn is not None:
+                self.pending.append((self.name, self.version, token, value, seconds))
+                if len(self.pending) >= self.flush_every:
+                    self.flush()
+
+        self.memory[token] = entry
+        if len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+        return entry[0]
+
+    def flush(self):
+        """Writes newly computed values to the on-disk store."""
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO token_cache (transform, version, token, value, seconds) VALUES (?, ?, ?, ?, ?)",
+                    self.pending
+                )
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def stats(self):
+        """Hit counts plus the compute time the hits avoided."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            'transform': self.name,
+            'version': self.version,
+            'lookups': lookups,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'compute_seconds': self.compute_seconds,
+            'saved_seconds': self.saved_seconds,
+        }
+
+def combine_stats(stats_list):
+    """Sums `TokenCache.stats()` dicts per transform, e.g. across pool workers."""
+    combined = {}
+    for s in stats_list:
+        if s['transform'] not in combined:
+            combined[s['transform']] = dict(s)
+            continue
+        total = combined[s['transform']]
+        for key in ('lookups', 'memory_hits', 'disk_hits', 'misses', 'compute_seconds', 'saved_seconds'):
+            total[key] += s[key]
+    for total in combined.values():
+        hits = total['memory_hits'] + total['disk_hits']
+        total['hit_rate'] = hits / total['lookups'] if total['lookups'] else 0.0
+    return list(combined.values())
+
+def print_cache_report(stats_list):
+    """Prints one line per stage from a list of `TokenCache.stats()` dicts."""
+    print("--- Token Cache Report ---")
+    for s in stats_list:
+        print(f"{s['transform']:>10}: {s['lookups']} lookups, hit rate {s['hit_rate']:.1%} "
+              f"(memory {s['memory_hits']}, disk {s['disk_hits']}), {s['misses']} computed "
+              f"in {s['compute_seconds']:.2f}s, {s['saved_seconds']:.2f}s saved")
@@ -0,0 +1,250 @@
+"""
+Compact storage for cleaned token lists.
+
+A TokenCorpus holds every document's tokens as ids into one shared vocabulary,
+laid out CSR-style: document i is `token_ids[offsets[i]:offsets[i + 1]]`.
+That is two int32 arrays plus one string per distinct token, instead of a
+Python list and a string object per token. Saved corpora are plain .npy files
+that load memory-mapped, so opening one costs nothing until it is read.
+"""
+
+import ast
+import io
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ID_DTYPE = np.int32
+
+
+class TokenCorpus:
+
+    def __init__(self, vocab, offsets, token_ids):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.token_ids = token_ids
+        self._vocab_index = None
+
+    # --- building ---
+    @classmethod
+    def from_token_lists(cls, docs):
+        """Builds a corpus from an iterable of token lists (None counts as an empty document)."""
+        docs = [doc if isinstance(doc, (list, tuple, np.ndarray)) else () for doc in docs]
+        lengths = np.fromiter((len(doc) for doc in docs), dtype=np.int64, count=len(docs))
+        flat = np.fromiter(chain.from_iterable(docs), dtype=object, count=int(lengths.sum()))
+        # factorize interns the vocabulary in one hashed pass over all tokens
+        codes, uniques = pd.factorize(flat)
+        offsets = np.zeros(len(docs) + 1, dtype=ID_DTYPE)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(list(uniques), offsets, codes.astype(ID_DTYPE))
+
+    @classmethod
+    def from_series(cls, column):
+        """
+        Builds a corpus from a DataFrame column of token lists, including the
+        printed form they take in the cleaners' CSV output ("['a', 'b']").
+        """
+        return cls.from_token_lists(column.map(_parse_tokens))
+
+    @classmethod
+    def from_arrow(cls, column):
+        """
+        Builds a corpus from an Arrow list<string> column (e.g. read from the
+        data lake) without creating a Python object per token.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if isinstance(column, pa.ChunkedArray):
+            column = column.combine_chunks()
+        column = column.fill_null(pa.scalar([], type=column.type))
+        encoded = pc.dictionary_encode(column.flatten())
+        offsets = np.asarray(pc.subtract(column.offsets, column.offsets[0]), dtype=ID_DTYPE)
+        return cls(encoded.dictionary.to_pylist(), offsets, np.asarray(encoded.indices, dtype=ID_DTYPE))
+
+    def extend(self, docs):
+        """
+        A new corpus with the token lists `docs` appended. Existing token ids
+        are kept and unseen tokens are added to the end of the vocabulary, so
+        the cost is proportional to `docs`, not to the corpus.
+        """
+        docs = [_parse_tokens(doc) for doc in docs]
+        if self._vocab_index is None:
+            self._vocab_index = {word: i for i, word in enumerate(self.vocab)}
+        index = self._vocab_index
+        vocab = list(self.vocab)
+        ids = []
+        for doc in docs:
+            for token in doc:
+                token_id = index.get(token)
+                if token_id is None:
+                    token_id = index[token] = len(vocab)
+                    vocab.append(token)
+                ids.append(token_id)
+        lengths = np.fromiter((len(doc) for doc in docs), dtype=np.int64, count=len(docs))
+        offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(lengths)]).astype(ID_DTYPE)
+        token_ids = np.concatenate([self.token_ids, np.asarray(ids, dtype=ID_DTYPE)])
+        self._vocab_index = None  # it now also holds the new tokens
+        return TokenCorpus(vocab, offsets, token_ids)
+
+    # --- access ---
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """Token ids of document `i`, as a view into the corpus."""
+        return self.token_ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            yield self.token_ids[start:end]
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def token_id(self, token):
+        """Id of `token`, or -1 if it is not in the vocabulary."""
+        if self._vocab_index is None:
+            self._vocab_index = {word: i for i, word in enumerate(self.vocab)}
+        return self._vocab_index.get(token, -1)
+
+    def tokens(self, i):
+        return [self.vocab[t] for t in self[i]]
+
+    def doc_index(self):
+        """For every stored token, the number of the document it belongs to."""
+        return np.repeat(np.arange(len(self), dtype=ID_DTYPE), self.lengths)
+
+    def term_frequencies(self):
+        """Total occurrences of each vocabulary entry across the corpus."""
+        return np.bincount(self.token_ids, minlength=len(self.vocab))
+
+    def document_frequencies(self):
+        """Number of documents each vocabulary entry appears in."""
+        pairs = np.unique(self.doc_index().astype(np.int64) * len(self.vocab) + self.token_ids)
+        return np.bincount(pairs % len(self.vocab), minlength=len(self.vocab))
+
+    def contains(self, token):
+        """Boolean mask of the documents that contain `token`."""
+        mask = np.zeros(len(self), dtype=bool)
+        token_id = self.token_id(token)
+        if token_id >= 0:
+            mask[self.doc_index()[self.token_ids == token_id]] = True
+        return mask
+
+    def select(self, rows):
+        """A new corpus holding only documents `rows` (indices or a boolean mask), in that order."""
+        rows = np.flatnonzero(rows) if np.asarray(rows).dtype == bool else np.asarray(rows)
+        starts, ends = self.offsets[rows], self.offsets[rows + 1]
+        lengths = ends - starts
+        offsets = np.zeros(len(rows) + 1, dtype=ID_DTYPE)
+        np.cumsum(lengths, out=offsets[1:])
+        # Position of each selected token in the source array
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return TokenCorpus(self.vocab, offsets, self.token_ids[positions])
+
+    # --- conversion ---
+    def to_series(self, index=None):
+        """The token lists as a pandas column, as the cleaners produce them."""
+        vocab = np.array(self.vocab, dtype=object)
+        words = vocab[self.token_ids].tolist()
+        offsets = self.offsets.tolist()
+        return pd.Series([words[offsets[i]:offsets[i + 1]] for i in range(len(self))], index=index, dtype=object)
+
+    def join(self, sep=' ', index=None):
+        """Each document's tokens joined into one string (e.g. `cleaned_text_str`)."""
+        vocab = np.array(self.vocab, dtype=object)
+        words = vocab[self.token_ids].tolist()
+        offsets = self.offsets.tolist()
+        return pd.Series([sep.join(words[offsets[i]:offsets[i + 1]]) for i in range(len(self))],
+                         index=index, dtype=object)
+
+    # --- persistence ---
+    def save(self, path):
+        """Writes the corpus as a directory of .npy files."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        encoded = [word.encode('utf-8') for word in self.vocab]
+        vocab_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(word) for word in encoded], out=vocab_offsets[1:])
+        np.save(path / 'offsets.npy', self.offsets)
+        np.save(path / 'token_ids.npy', self.token_ids)
+        np.save(path / 'vocab_offsets.npy', vocab_offsets)
+        np.save(path / 'vocab.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Opens a corpus written by `save`. With `mmap=True` the offset and id
+        arrays are memory-mapped and only paged in as they are read.
+        """
+        path = Path(path)
+        mode = 'r' if mmap else None
+        blob = np.load(path / 'vocab.npy').tobytes()
+        vocab_offsets = np.load(path / 'vocab_offsets.npy').tolist()
+        vocab = [blob[vocab_offsets[i]:vocab_offsets[i + 1]].decode('utf-8') for i in range(len(vocab_offsets) - 1)]
+        return cls(vocab, np.load(path / 'offsets.npy', mmap_mode=mode), np.load(path / 'token_ids.npy', mmap_mode=mode))
+
+    def nbytes(self):
+        """Approximate memory held by the corpus, vocabulary strings included."""
+        return self.offsets.nbytes + self.token_ids.nbytes + sum(len(word) + 49 for word in self.vocab)
+
+
+def save_column(column, path, append=False):
+    """
+    Saves a token column as a corpus at `path`. With `append`, the column's
+    documents are added to the corpus already saved there instead: only the
+    vocabulary is read, and the new ids, offsets and words are appended to
+    the saved files.
+    """
+    path = Path(path)
+    if not (append and path.exists()):
+        corpus = TokenCorpus.from_series(column)
+        corpus.save(path)
+        return corpus
+
+    vocab_offsets = np.load(path / 'vocab_offsets.npy', mmap_mode='r')
+    blob = np.load(path / 'vocab.npy').tobytes()
+    vocab = [blob[vocab_offsets[i]:vocab_offsets[i + 1]].decode('utf-8') for i in range(len(vocab_offsets) - 1)]
+    last_offset = int(np.load(path / 'offsets.npy', mmap_mode='r')[-1])
+    # extend only reads the old arrays' last offset, so empty ones stand in for them
+    delta = TokenCorpus(vocab, np.array([last_offset], dtype=ID_DTYPE), np.empty(0, dtype=ID_DTYPE)).extend(column)
+
+    new_words = [word.encode('utf-8') for word in delta.vocab[len(vocab):]]
+    _append_npy(path / 'token_ids.npy', delta.token_ids)
+    _append_npy(path / 'offsets.npy', delta.offsets[1:])
+    _append_npy(path / 'vocab_offsets.npy', int(vocab_offsets[-1]) + np.cumsum([len(word) for word in new_words]))
+    _append_npy(path / 'vocab.npy', np.frombuffer(b''.join(new_words), dtype=np.uint8))
+    return TokenCorpus.load(path)
+
+
+def _append_npy(path, values):
+    """Appends `values` to the 1-d array saved at `path`, rewriting only the header's shape."""
+    fmt = np.lib.format
+    with open(path, 'r+b') as f:
+        version = fmt.read_magic(f)
+        read_header, write_header = ((fmt.read_array_header_1_0, fmt.write_array_header_1_0) if version == (1, 0)
+                                     else (fmt.read_array_header_2_0, fmt.write_array_header_2_0))
+        shape, fortran_order, dtype = read_header(f)
+        header_end = f.tell()
+        values = np.asarray(values, dtype=dtype)
+        header = io.BytesIO()
+        write_header(header, {'descr': fmt.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                              'shape': (shape[0] + len(values),)})
+        # numpy pads headers so the shape can grow in place
+        if header.tell() == header_end:
+            f.seek(0, io.SEEK_END)
+            f.write(values.tobytes())
+            f.seek(0)
+            f.write(header.getvalue())
+            return
+    np.save(path, np.concatenate([np.load(path), values]))
+
+
+def _parse_tokens(value):
+    if isinstance(value, str):
+        return ast.literal_eval(value) if value.startswith('[') else value.split()
+    return value if isinstance(value, (list, tuple, np.ndarray)) else ()
@@ -1,8 +1,17 @@
+import numpy as np
 import pandas as pd
 import re
 import os # Import the 'os' module to check file size
+import argparse
 from pathlib import Path # Import 'Path' for robust path handling
 
+COUNT_RE = r'^([0-9]*\.?[0-9]+)([kmb]?)$'
+COUNT_MULTIPLIERS = {'': 1, 'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+
+# Column types for streamed output, so every chunk writes the same schema
+STREAM_COLUMNS = ['tweet_id', 'tweet_url', 'author', 'text', 'likes', 'retweets', 'hashtags', 'created_at']
+COUNT_COLUMNS = ['likes', 'retweets']
+
 def clean_engagement_count(value):
     """
     Converts string counts like '16K' or '1.2M' into proper integers.
@@ -18,42 +27,115 @@ def clean_engagement_count(value):
     except (ValueError, TypeError):
         return 0
 
+def clean_engagement_counts(values):
+    """
+    Vectorized clean_engagement_count for a whole column: '16K' -> 16000,
+    '1.2M' -> 1200000, '1,234' -> 1234, anything unreadable -> 0.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0).astype('int64')
+    # Counts repeat heavily, so parse each distinct string once and broadcast back
+    codes, uniques = pd.factorize(values)
+    parsed = _parse_counts(pd.Series(uniques, dtype=object)).to_numpy()
+    return pd.Series(np.where(codes >= 0, parsed[codes], 0), index=values.index)
+
+def _parse_counts(values):
+    text = values.astype('string').str.strip().str.lower().str.replace(',', '', regex=False)
+    parts = text.str.extract(COUNT_RE)
+    number = pd.to_numeric(parts[0], errors='coerce')
+    multiplier = parts[1].map(COUNT_MULTIPLIERS)
+    # Rounded, not truncated: 4.1 * 1e6 is 4099999.9999999995 in floating point
+    return (number * multiplier).round().fillna(0).astype('int64')
+
+def normalize_chunk(df):
+    """Cleans one chunk of tweets into the fixed STREAM_COLUMNS layout."""
+    df = df.reindex(columns=STREAM_COLUMNS)
+    for column in COUNT_COLUMNS:
+        df[column] = clean_engagement_counts(df[column])
+    # Older exports carry hashtags as lists, the item pipeline as '|'-joined text
+    df['hashtags'] = df['hashtags'].map(lambda h: '|'.join(h) if isinstance(h, list) else h)
+    for column in STREAM_COLUMNS:
+        if column not in COUNT_COLUMNS:
+            df[column] = df[column].astype('string')
+    return df
+
+def stream_convert(json_lines_path, output_path, chunksize=100_000):
+    """
+    Converts a JSON Lines export chunk by chunk, so memory stays bounded by
+    `chunksize` whatever the input size. Writes CSV, or Parquet when
+    `output_path` ends in .parquet (one row group per chunk).
+    Returns the number of rows written.
+    """
+    reader = pd.read_json(json_lines_path, lines=True, chunksize=chunksize,
+                          dtype=False, convert_dates=False)
+    total = 0
+    if str(output_path).endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(c, pa.int64() if c in COUNT_COLUMNS else pa.string()) for c in STREAM_COLUMNS])
+        with reader, pq.ParquetWriter(output_path, schema) as writer:
+            for chunk in reader:
+                chunk = normalize_chunk(chunk)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                total += len(chunk)
+    else:
+        with reader, open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+            for i, chunk in enumerate(reader):
+                chunk = normalize_chunk(chunk)
+                chunk.to_csv(f, index=False, header=(i == 0))
+                total += len(chunk)
+    return total
+
 # --- Main Conversion Logic ---
 
-json_file_path = 'zomato_tweets.json'
-csv_file_path = 'zomato_twitter_data_cleaned.csv'
-
-# --- NEW: Check if the file exists and is not empty ---
-if Path(json_file_path).exists() and os.path.getsize(json_file_path) > 0:
-    
-    # --- All the previous logic now goes inside this 'if' block ---
-    
-    print(f"Reading data from '{json_file_path}'...")
-    # 1. Load the JSON Lines file
-    df = pd.read_json(json_file_path)
-
-    # 2. Clean the engagement columns
-    if 'likes' in df.columns:
-        df['likes'] = df['likes'].apply(clean_engagement_count)
-    if 'retweets' in df.columns:
-        df['retweets'] = df['retweets'].apply(clean_engagement_count)
-
-    # 3. Flatten the 'hashtags' list
-    # if 'hashtags' in df.columns:
-    #     df['hashtags'] = df['hashtags'].apply(
-    #         lambda h: '|'.join(h) if isinstance(h, list) else None
-    #     )
-
-    # 4. Clean the 'text' column
-    # if 'text' in df.columns:
-    #     df['text'] = df['text'].str.replace(r'\s+', ' ', regex=True).str.strip()
-
-    # 5. Save the cleaned DataFrame to a CSV file
-    df.to_csv(csv_file_path, index=False, encoding='utf-8-sig')
-
-    print(f"\n✅ Success! Converted {len(df)} records.")
-    print(f"Cleaned CSV file saved as: {csv_file_path}")
-
-else:
-    # --- NEW: Handle the case of an empty or non-existent file ---
-    print(f"'{json_file_path}' is empty or does not exist. No data to convert.")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert scraped tweets to CSV (or Parquet).")
+    parser.add_argument('--input', default='zomato_tweets.json',
+                        help="a .json export, or a .jsonl export to stream in chunks")
+    parser.add_argument('--output', default='zomato_twitter_data_cleaned.csv')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    json_file_path = args.input
+    csv_file_path = args.output
+
+    # --- NEW: Check if the file exists and is not empty ---
+    if not (Path(json_file_path).exists() and os.path.getsize(json_file_path) > 0):
+        # --- NEW: Handle the case of an empty or non-existent file ---
+        print(f"'{json_file_path}' is empty or does not exist. No data to convert.")
+
+    elif json_file_path.endswith('.jsonl'):
+        print(f"Streaming '{json_file_path}' in chunks of {args.chunksize} rows...")
+        total = stream_convert(json_file_path, csv_file_path, args.chunksize)
+        print(f"\n✅ Success! Converted {total} records.")
+        print(f"Cleaned file saved as: {csv_file_path}")
+
+    else:
+        # --- All the previous logic now goes inside this 'if' block ---
+
+        print(f"Reading data from '{json_file_path}'...")
+        # 1. Load the JSON Lines file
+        df = pd.read_json(json_file_path)
+
+        # 2. Clean the engagement columns
+        if 'likes' in df.columns:
+            df['likes'] = df['likes'].apply(clean_engagement_count)
+        if 'retweets' in df.columns:
+            df['retweets'] = df['retweets'].apply(clean_engagement_count)
+
+        # 3. Flatten the 'hashtags' list
+        # if 'hashtags' in df.columns:
+        #     df['hashtags'] = df['hashtags'].apply(
+        #         lambda h: '|'.join(h) if isinstance(h, list) else None
+        #     )
+
+        # 4. Clean the 'text' column
+        # if 'text' in df.columns:
+        #     df['text'] = df['text'].str.replace(r'\s+', ' ', regex=True).str.strip()
+
+        # 5. Save the cleaned DataFrame to a CSV file
+        df.to_csv(csv_file_path, index=False, encoding='utf-8-sig')
+
+        print(f"\n✅ Success! Converted {len(df)} records.")
+        print(f"Cleaned CSV file saved as: {csv_file_path}")
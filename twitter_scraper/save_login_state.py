@@ -0,0 +1,21 @@
+# Log in to X once in a visible browser and save the session for the spider's pooled headless contexts.
+# Usage (from twitter_scraper/): python save_login_state.py
+
+import asyncio
+from playwright.async_api import async_playwright
+from twitter_scraper.settings import LOGIN_STATE_FILE, PLAYWRIGHT_PERSISTENT_CONTEXT
+
+
+async def main():
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(PLAYWRIGHT_PERSISTENT_CONTEXT, headless=False)
+        page = context.pages[0] if context.pages else await context.new_page()
+        await page.goto("https://x.com/login")
+        await asyncio.to_thread(input, "Log in in the browser window (skip if already logged in), then press Enter... ")
+        await context.storage_state(path=LOGIN_STATE_FILE)
+        await context.close()
+    print(f"✅ Login state saved to {LOGIN_STATE_FILE}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
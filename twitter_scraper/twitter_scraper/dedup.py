@@ -0,0 +1,91 @@
+# Persistent record of tweet IDs that have already been scraped, shared across runs.
+
+import json
+import sqlite3
+from pathlib import Path
+
+
+class TweetIdIndex:
+    """
+    Set-like index of seen tweet IDs stored as INTEGER PRIMARY KEYs in SQLite.
+
+    Nothing is loaded up front, so startup time and resident memory stay flat
+    however many IDs have been collected; each membership check is a single
+    B-tree lookup. New IDs are buffered in memory and written in batches.
+    """
+
+    def __init__(self, db_path="seen_tweets.db", flush_every=500):
+        self.db_path = db_path
+        self.flush_every = flush_every
+        self.pending = set()
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_tweets (tweet_id INTEGER PRIMARY KEY)")
+        self.conn.commit()
+
+    def __contains__(self, tweet_id):
+        try:
+            tweet_id = int(tweet_id)
+        except (TypeError, ValueError):
+            return False
+        if tweet_id in self.pending:
+            return True
+        return self.conn.execute(
+            "SELECT 1 FROM seen_tweets WHERE tweet_id = ?", (tweet_id,)
+        ).fetchone() is not None
+
+    def add(self, tweet_id):
+        self.pending.add(int(tweet_id))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def update(self, tweet_ids, batch_size=100_000):
+        """Bulk-inserts an iterable of IDs, e.g. when seeding from an old export."""
+        batch = []
+        for tweet_id in tweet_ids:
+            batch.append((int(tweet_id),))
+            if len(batch) >= batch_size:
+                self._insert(batch)
+                batch = []
+        self._insert(batch)
+
+    def is_empty(self):
+        return not self.pending and self.conn.execute("SELECT 1 FROM seen_tweets LIMIT 1").fetchone() is None
+
+    def flush(self):
+        if self.pending:
+            self._insert([(tweet_id,) for tweet_id in self.pending])
+            self.pending = set()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def _insert(self, rows):
+        if rows:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO seen_tweets (tweet_id) VALUES (?)", rows)
+
+
+def iter_exported_tweet_ids(path):
+    """Yields tweet_id from a Scrapy JSON (array) or JSON Lines feed export."""
+    with open(path, encoding="utf-8") as f:
+        if f.read(1) == "[":
+            f.seek(0)
+            items = json.load(f)
+        else:
+            f.seek(0)
+            items = (json.loads(line) for line in f if line.strip())
+        for item in items:
+            if item.get("tweet_id"):
+                yield item["tweet_id"]
+
+
+def seed_from_export(index, path):
+    """Fills an empty index from an earlier feed export; returns how many IDs were read."""
+    if not Path(path).exists():
+        return 0
+    ids = list(iter_exported_tweet_ids(path))
+    index.update(ids)
+    return len(ids)
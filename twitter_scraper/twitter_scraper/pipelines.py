@@ -3,11 +3,123 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import sqlite3
+from datetime import datetime, timezone
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from twisted.internet import task
+
+COUNT_SUFFIXES = {'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+
+
+def parse_count(value):
+    """
+    Converts engagement counts as X displays them into integers:
+    16K -> 16000, 1.2M -> 1200000, '1,234' -> 1234. Anything unreadable is 0.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(round(value)) if value == value else 0
+    if not isinstance(value, str):
+        return 0
+    value = value.strip().lower().replace(',', '')
+    multiplier = 1
+    if value and value[-1] in COUNT_SUFFIXES:
+        multiplier = COUNT_SUFFIXES[value[-1]]
+        value = value[:-1]
+    try:
+        # round, not int(): 4.1 * 1e6 is 4099999.9999999995 in floating point
+        return int(round(float(value) * multiplier)) if value else 0
+    except ValueError:
+        return 0
 
 
 class TwitterScraperPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class TweetNormalizationPipeline:
+    """
+    Normalizes tweet items inline (integer counts, hashtags joined with '|')
+    and appends them to a SQLite table keyed by the integer tweet_id. A batch is
+    written every TWEET_STORE_BATCH_SIZE items or TWEET_STORE_FLUSH_SECONDS,
+    whichever comes first, so the data is analysis-ready when the crawl ends.
+    """
+
+    def __init__(self, db_path, batch_size=200, flush_seconds=10):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.buffer = []
+        self.items_stored = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            db_path=settings.get('TWEET_STORE_PATH', 'zomato_tweets.db'),
+            batch_size=settings.getint('TWEET_STORE_BATCH_SIZE', 200),
+            flush_seconds=settings.getfloat('TWEET_STORE_FLUSH_SECONDS', 10),
+        )
+
+    def open_spider(self, spider):
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tweets (
+                tweet_id INTEGER PRIMARY KEY,
+                tweet_url TEXT,
+                author TEXT,
+                text TEXT,
+                likes INTEGER,
+                retweets INTEGER,
+                hashtags TEXT,
+                created_at TEXT,
+                scraped_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+        # Time trigger: flush even when items trickle in slowly
+        self.flusher = task.LoopingCall(self.flush)
+        self.flusher.start(self.flush_seconds, now=False)
+
+    def close_spider(self, spider):
+        if self.flusher.running:
+            self.flusher.stop()
+        self.flush()
+        self.conn.close()
+        spider.logger.info(f"Stored {self.items_stored} tweets in {self.db_path}")
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        adapter['likes'] = parse_count(adapter.get('likes'))
+        adapter['retweets'] = parse_count(adapter.get('retweets'))
+        hashtags = adapter.get('hashtags')
+        adapter['hashtags'] = '|'.join(hashtags) if isinstance(hashtags, list) and hashtags else None
+
+        self.buffer.append((
+            int(adapter['tweet_id']), adapter.get('tweet_url'), adapter.get('author'), adapter.get('text'),
+            adapter['likes'], adapter['retweets'], adapter['hashtags'], adapter.get('created_at'),
+            datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        ))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        return item
+
+    def flush(self):
+        if not self.buffer:
+            return
+        with self.conn:
+            # Append-only: a tweet already stored by an earlier crawl is left untouched
+            cursor = self.conn.executemany("""
+                INSERT OR IGNORE INTO tweets
+                (tweet_id, tweet_url, author, text, likes, retweets, hashtags, created_at, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, self.buffer)
+        self.items_stored += cursor.rowcount
+        self.buffer = []
@@ -23,7 +23,8 @@ ROBOTSTXT_OBEY = False
 
 # Concurrency and throttling settings
 #CONCURRENT_REQUESTS = 16
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
+# One search page per browser context; matches the spider's default `contexts` pool size
+CONCURRENT_REQUESTS_PER_DOMAIN = 4
 DOWNLOAD_DELAY = 1
 
 # Disable cookies (enabled by default)
@@ -58,9 +59,14 @@ DOWNLOAD_DELAY = 1
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "twitter_scraper.pipelines.TwitterScraperPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "twitter_scraper.pipelines.TweetNormalizationPipeline": 300,
+}
+
+# TweetNormalizationPipeline: where normalized tweets are appended, and when a batch is written
+TWEET_STORE_PATH = "zomato_tweets.db"
+TWEET_STORE_BATCH_SIZE = 200
+TWEET_STORE_FLUSH_SECONDS = 10
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -93,19 +99,25 @@ DOWNLOAD_HANDLERS = {
 
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 
-# --- NEW: Explicitly configure Playwright to launch a visible browser ---
+# --- NEW: Explicitly configure Playwright ---
 
 # We are explicitly telling Scrapy to use the Chromium browser engine
 PLAYWRIGHT_BROWSER_TYPE = "chromium"
 
 # This dictionary passes arguments directly to the browser launch command.
-# "headless": False is the direct command to open a visible window.
+# Headless by default; set PLAYWRIGHT_HEADLESS=0 to watch the browser.
+import os
 PLAYWRIGHT_LAUNCH_OPTIONS = {
-    "headless": False,
+    "headless": os.environ.get("PLAYWRIGHT_HEADLESS", "1") != "0",
 }
 
+# Upper bound on browser contexts open at once (the spider's query pool)
+PLAYWRIGHT_MAX_CONTEXTS = 4
+
 # --- NEW: Tell Playwright to save and reuse a browser session ---
-import os
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 PLAYWRIGHT_PERSISTENT_CONTEXT = str(BASE_DIR / 'playwright_user_data')
+# Cookies/localStorage exported from that profile by save_login_state.py.
+# Every pooled context is created from this file, so they all share the login.
+LOGIN_STATE_FILE = str(BASE_DIR / 'x_login_state.json')
@@ -1,8 +1,12 @@
+import asyncio
 import scrapy
-import pandas as pd
 import re
+import time
+import urllib.parse
 from pathlib import Path
 from scrapy_playwright.page import PageMethod
+from twitter_scraper.dedup import TweetIdIndex, seed_from_export
+from twitter_scraper.timeline import is_search_timeline, parse_search_timeline
 
 def should_abort_request(request):
     if request.resource_type in ("image", "stylesheet", "font", "media"):
@@ -11,51 +15,269 @@ def should_abort_request(request):
         return True
     return False
 
+# Pulls every visible tweet out of the page in a single round trip.
+# Mirrors the selectors used by `extract_with_handles` one for one.
+EXTRACT_TWEETS_JS = """
+() => Array.from(document.querySelectorAll('article[data-testid="tweet"]')).map(article => {
+    const link = article.querySelector('a[href*="/status/"]');
+    const textElement = article.querySelector('div[data-testid="tweetText"]');
+    const likesElement = article.querySelector('button[data-testid="like"] span[data-testid="app-text-transition-container"] span');
+    const retweetButton = article.querySelector('button[data-testid="retweet"]');
+    return {
+        permalink: link ? link.getAttribute('href') : null,
+        text: textElement ? textElement.innerText : null,
+        likes: likesElement ? likesElement.textContent : null,
+        retweets_label: retweetButton ? retweetButton.getAttribute('aria-label') : '',
+        hashtags: textElement
+            ? Array.from(textElement.querySelectorAll('a')).map(a => a.innerText).filter(t => (t || '').startsWith('#'))
+            : [],
+    };
+})
+"""
+
+async def extract_with_handles(page, seen_tweet_ids):
+    """
+    Element-handle extraction: one awaited Playwright call per field.
+    Returns the same raw dicts as EXTRACT_TWEETS_JS, skipping tweets already seen.
+    """
+    raw_tweets = []
+    for tweet_element in await page.query_selector_all('article[data-testid="tweet"]'):
+        try:
+            permalink_element = await tweet_element.query_selector('a[href*="/status/"]')
+            permalink = await permalink_element.get_attribute('href') if permalink_element else None
+            if not permalink or parse_permalink(permalink)[1] in seen_tweet_ids:
+                raw_tweets.append({'permalink': permalink})
+                continue
+
+            text_content_element = await tweet_element.query_selector('div[data-testid="tweetText"]')
+            if not text_content_element:
+                raw_tweets.append({'permalink': permalink, 'text': None})
+                continue
+            likes_element = await tweet_element.query_selector('button[data-testid="like"] span[data-testid="app-text-transition-container"] span')
+            retweet_button = await tweet_element.query_selector('button[data-testid="retweet"]')
+            raw_tweets.append({
+                'permalink': permalink,
+                'text': await text_content_element.inner_text(),
+                'likes': await likes_element.text_content() if likes_element else None,
+                'retweets_label': await retweet_button.get_attribute('aria-label') if retweet_button else '',
+                'hashtags': [await link.inner_text() for link in await text_content_element.query_selector_all('a') if (await link.inner_text() or '').startswith('#')],
+            })
+        except Exception:
+            raw_tweets.append({'permalink': None})
+    return raw_tweets
+
+def parse_permalink(permalink):
+    """'/user/status/123?x' -> ('@user', '123', 'https://x.com/user/status/123?x')"""
+    parts = permalink.split('/')
+    return f"@{parts[1]}", parts[3].split('?')[0], f"https://x.com{permalink}"
+
+def parse_retweets(aria_label):
+    if aria_label:
+        found_numbers = re.search(r'(\d[\d,]*)', aria_label)
+        if found_numbers:
+            return found_numbers.group(1).replace(',', '')
+    return '0'
+
+class QueryProgress:
+    """Counters and stop condition for one search query."""
+
+    def __init__(self, query, tweet_limit, time_budget_minutes=None):
+        self.query = query
+        self.tweet_limit = tweet_limit
+        self.time_budget_minutes = time_budget_minutes
+        self.tweets = 0
+        self.pages = 0
+        self.started = time.monotonic()
+
+    @property
+    def minutes(self):
+        return (time.monotonic() - self.started) / 60
+
+    def done(self):
+        if self.tweets >= self.tweet_limit:
+            return True
+        return self.time_budget_minutes is not None and self.minutes >= self.time_budget_minutes
+
+    def summary(self):
+        minutes = max(self.minutes, 1e-9)
+        return {
+            'tweets': self.tweets,
+            'pages': self.pages,
+            'minutes': round(self.minutes, 2),
+            'pages_per_minute': round(self.pages / minutes, 1),
+            'tweets_per_minute': round(self.tweets / minutes, 1),
+        }
+
 class ZomatoSpiderSpider(scrapy.Spider):
     name = "zomato_spider"
-    TWEET_LIMIT = 200
+    TWEET_LIMIT = 200  # per query
+    # Comma-separated search queries, or a file with one query per line:
+    # `scrapy crawl zomato_spider -a queries="zomato,swiggy,#ZomatoCare"` / `-a queries_file=queries.txt`
+    queries = "zomato"
+    queries_file = None
+    # Queries are spread round-robin over this many browser contexts, all loaded with the saved login state
+    contexts = 4
+    # Optional per-query time limit in minutes, on top of TWEET_LIMIT and the empty-scroll stop
+    time_budget = None
+    # 'batch': one page.evaluate per scroll; 'handles': the old per-field element queries;
+    # 'network': read tweets from the SearchTimeline JSON responses instead of the DOM.
+    # Override with `scrapy crawl zomato_spider -a extraction=network`.
+    extraction = "batch"
+    # Network mode: how long to wait for the next timeline page after a scroll
+    TIMELINE_WAIT_SECONDS = 10
+    # SQLite file holding every tweet ID scraped so far (see twitter_scraper/dedup.py)
+    dedup_index = "seen_tweets.db"
 
     def __init__(self, *args, **kwargs):
         super(ZomatoSpiderSpider, self).__init__(*args, **kwargs)
         self.scraped_items_count = 0
         self.output_file = 'zomato_tweets.json'
-        self.seen_tweet_ids = set()
+        self.seen_tweet_ids = TweetIdIndex(self.dedup_index)
+        self.timeline_queues = {}
+        self.query_progress = {}
+
+        if self.queries_file:
+            with open(self.queries_file, encoding='utf-8') as f:
+                self.query_list = [line.strip() for line in f if line.strip()]
+        else:
+            self.query_list = [q.strip() for q in self.queries.split(',') if q.strip()]
 
-        if Path(self.output_file).exists():
-            self.logger.info(f"Reading existing tweets from {self.output_file}")
+        # First run with the index: seed it from the tweets we already exported
+        if self.seen_tweet_ids.is_empty():
             try:
-                df = pd.read_csv(self.output_file)
-                if 'tweet_id' in df.columns:
-                    self.seen_tweet_ids = set(df['tweet_id'].astype(str))
-                self.logger.info(f"Loaded {len(self.seen_tweet_ids)} existing tweet IDs.")
+                seeded = seed_from_export(self.seen_tweet_ids, self.output_file)
+                if seeded:
+                    self.logger.info(f"Seeded dedup index with {seeded} tweet IDs from {self.output_file}.")
             except Exception as e:
-                self.logger.error(f"Could not read existing CSV: {e}")
+                self.logger.error(f"Could not read existing tweets from {self.output_file}: {e}")
+
+    def closed(self, reason):
+        self.seen_tweet_ids.close()
+        for query, progress in self.query_progress.items():
+            self.logger.info(f"Query {query!r}: {progress.summary()}")
+
+    def _record_progress(self, progress):
+        summary = progress.summary()
+        self.logger.info(f"Finished query {progress.query!r}: {summary['tweets']} tweets, "
+                         f"{summary['pages_per_minute']} pages/min, {summary['tweets_per_minute']} tweets/min")
+        if hasattr(self, 'crawler'):
+            for key, value in summary.items():
+                self.crawler.stats.set_value(f"queries/{progress.query}/{key}", value)
 
     def start_requests(self):
-        search_query = "zomato"
-        # UPDATED: Removed '&f=live' to get "Top" tweets instead of "Latest"
-        url = f"https://x.com/search?q={search_query}&src=typed_query"
-        
-        yield scrapy.Request(
-            url,
-            meta=dict(
+        login_state = self.settings.get('LOGIN_STATE_FILE')
+        context_kwargs = {'storage_state': login_state} if login_state and Path(login_state).exists() else {}
+        pool_size = max(1, int(self.contexts))
+
+        for i, search_query in enumerate(self.query_list):
+            # UPDATED: Removed '&f=live' to get "Top" tweets instead of "Latest"
+            url = f"https://x.com/search?q={urllib.parse.quote(search_query)}&src=typed_query"
+
+            meta = dict(
                 playwright=True,
                 playwright_include_page=True,
+                playwright_context=f"search-{i % pool_size}",
+                playwright_context_kwargs=context_kwargs,
                 playwright_page_coroutines=[
                     PageMethod("route", "**/*", should_abort_request)
                 ],
                 errback=self.errback,
+                query=search_query,
             )
-        )
+            if self.extraction == "network":
+                # Attached before navigation so the first timeline page is not missed
+                meta["playwright_page_event_handlers"] = {"response": "handle_response"}
+            yield scrapy.Request(url, meta=meta)
+
+    def _start_query(self, query):
+        budget = float(self.time_budget) if self.time_budget else None
+        progress = QueryProgress(query, self.TWEET_LIMIT, budget)
+        self.query_progress[query] = progress
+        return progress
 
     async def errback(self, failure):
         self.logger.error(repr(failure))
         page = failure.request.meta["playwright_page"]
         await page.close()
 
+    def _timeline_queue(self, page):
+        if page not in self.timeline_queues:
+            self.timeline_queues[page] = asyncio.Queue()
+        return self.timeline_queues[page]
+
+    async def handle_response(self, response):
+        """Queues the tweets from every SearchTimeline response the page receives."""
+        if not is_search_timeline(response.url):
+            return
+        try:
+            payload = await response.json()
+        except Exception as e:
+            self.logger.warning(f"Could not decode timeline response {response.url}: {e}")
+            return
+        self._timeline_queue(response.frame.page).put_nowait(parse_search_timeline(payload))
+
+    async def scrape_timeline(self, page, progress):
+        """
+        Network mode: yields tweets from the timeline responses captured by
+        `handle_response`, scrolling only when the previous page has been used
+        up and moving on as soon as the next page arrives.
+        """
+        queue = self._timeline_queue(page)
+        empty_scroll_attempts = 0
+        wait_seconds = 60  # the first page can take a while behind the login/landing redirects
+        try:
+            while not progress.done():
+                try:
+                    tweets = await asyncio.wait_for(queue.get(), timeout=wait_seconds)
+                except asyncio.TimeoutError:
+                    if wait_seconds == 60:
+                        self.logger.error("No timeline response arrived in time. Taking a screenshot and closing.")
+                        await page.screenshot(path="failure_screenshot.png")
+                        return
+                    tweets = []
+                wait_seconds = self.TIMELINE_WAIT_SECONDS
+                progress.pages += 1
+
+                new_tweets_found_this_scroll = 0
+                for item in tweets:
+                    if item['tweet_id'] in self.seen_tweet_ids:
+                        continue
+                    self.seen_tweet_ids.add(item['tweet_id'])
+                    self.scraped_items_count += 1
+                    progress.tweets += 1
+                    new_tweets_found_this_scroll += 1
+                    yield item
+                    if progress.done():
+                        break
+
+                if progress.done():
+                    break
+
+                if new_tweets_found_this_scroll == 0:
+                    empty_scroll_attempts += 1
+                    if empty_scroll_attempts >= 3:
+                        self.logger.info("Ending batch after 3 consecutive empty timeline pages.")
+                        break
+                else:
+                    empty_scroll_attempts = 0
+
+                if queue.empty():
+                    self.logger.info(f"[{progress.query}] Scraped {progress.tweets} new tweets, scrolling for more...")
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
+        finally:
+            self.timeline_queues.pop(page, None)
+
     async def parse(self, response):
         page = response.meta["playwright_page"]
-        
+        progress = self._start_query(response.meta.get("query", self.query_list[0]))
+
+        if self.extraction == "network":
+            async for item in self.scrape_timeline(page, progress):
+                yield item
+            self._record_progress(progress)
+            await page.close()
+            return
+
         try:
             await page.wait_for_selector('div[data-testid="tweetText"]', timeout=60000)
             self.logger.info("Tweet text found. Starting main scrape loop...")
@@ -66,67 +288,53 @@ class ZomatoSpiderSpider(scrapy.Spider):
             return
 
         empty_scroll_attempts = 0
-        while self.scraped_items_count < self.TWEET_LIMIT:
-            tweet_articles = await page.query_selector_all('article[data-testid="tweet"]')
-            
+        while not progress.done():
+            progress.pages += 1
+            if self.extraction == "batch":
+                raw_tweets = await page.evaluate(EXTRACT_TWEETS_JS)
+            else:
+                raw_tweets = await extract_with_handles(page, self.seen_tweet_ids)
+
             new_tweets_found_this_scroll = 0
-            for tweet_element in tweet_articles:
+            for raw in raw_tweets:
                 try:
-                    # --- NEW CONSOLIDATED LOGIC ---
-                    # 1. Find the one reliable link that contains the timestamp and ID.
-                    permalink_element = await tweet_element.query_selector('a[href*="/status/"]')
-                    permalink = await permalink_element.get_attribute('href') if permalink_element else None
-
+                    # 1. The permalink carries the author and the ID.
                     # If we can't find this link, we can't identify the tweet, so we skip it.
+                    permalink = raw.get('permalink')
                     if not permalink:
                         continue
-
-                    # 2. Extract everything from this one link.
-                    parts = permalink.split('/')
-                    author = f"@{parts[1]}"
-                    tweet_id = parts[3].split('?')[0]
-                    tweet_url = f"https://x.com{permalink}"
+                    author, tweet_id, tweet_url = parse_permalink(permalink)
 
                     if tweet_id in self.seen_tweet_ids:
                         continue
-                    
-                    text_content_element = await tweet_element.query_selector('div[data-testid="tweetText"]')
-                    if not text_content_element: continue
-                    text = await text_content_element.inner_text()
-                    
-                    likes_element = await tweet_element.query_selector('button[data-testid="like"] span[data-testid="app-text-transition-container"] span')
-                    retweet_button = await tweet_element.query_selector('button[data-testid="retweet"]')
-                    retweets_aria_label = await retweet_button.get_attribute('aria-label') if retweet_button else ''
-                    retweets = '0'
-                    if retweets_aria_label:
-                        found_numbers = re.search(r'(\d[\d,]*)', retweets_aria_label)
-                        if found_numbers:
-                            retweets = found_numbers.group(1).replace(',', '')
-                    
-                    hashtags = [await link.inner_text() for link in await text_content_element.query_selector_all('a') if (await link.inner_text() or '').startswith('#')]
+                    if raw.get('text') is None:
+                        continue
+
+                    hashtags = raw['hashtags']
                     self.seen_tweet_ids.add(tweet_id)
                     self.scraped_items_count += 1
+                    progress.tweets += 1
                     new_tweets_found_this_scroll += 1
-                    
+
                     yield {
                         'tweet_id': tweet_id,
                         'tweet_url': tweet_url,
                         'author': author,
-                        'text': text,
-                        'likes': await likes_element.text_content() if likes_element else '0',
-                        'retweets': retweets,
+                        'text': raw['text'],
+                        'likes': raw['likes'] if raw['likes'] is not None else '0',
+                        'retweets': parse_retweets(raw['retweets_label']),
                         'hashtags' : hashtags if hashtags else None
                     }
 
-                    if self.scraped_items_count >= self.TWEET_LIMIT:
+                    if progress.done():
                         break
                 except Exception:
                     continue
             
-            if self.scraped_items_count >= self.TWEET_LIMIT:
+            if progress.done():
                 break
             
-            if new_tweets_found_this_scroll == 0 and len(tweet_articles) > 0:
+            if new_tweets_found_this_scroll == 0 and len(raw_tweets) > 0:
                 empty_scroll_attempts += 1
                 if empty_scroll_attempts >= 3:
                     self.logger.info("Ending batch after 3 consecutive empty scrolls.")
@@ -134,11 +342,12 @@ class ZomatoSpiderSpider(scrapy.Spider):
             else:
                 empty_scroll_attempts = 0
 
-            self.logger.info(f"Scraped {self.scraped_items_count} new tweets, scrolling for more...")
+            self.logger.info(f"[{progress.query}] Scraped {progress.tweets} new tweets, scrolling for more...")
             await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
             await page.wait_for_timeout(3000)
 
-        self.logger.info(f"Finished batch. Total new tweets scraped this run: {self.scraped_items_count}.")
+        self._record_progress(progress)
+        self.logger.info(f"Total new tweets scraped this run so far: {self.scraped_items_count}.")
         await page.close()
         
         # # --- UPDATED: Dynamic Wait Logic ---
@@ -0,0 +1,78 @@
+# Parsing of the search timeline JSON that x.com's web client fetches while scrolling.
+
+import re
+from datetime import datetime
+
+SEARCH_TIMELINE_RE = re.compile(r"/i/api/graphql/[^/]+/SearchTimeline")
+
+
+def is_search_timeline(url):
+    return SEARCH_TIMELINE_RE.search(url) is not None
+
+
+def iter_tweet_results(node):
+    """
+    Yields every `tweet_results.result` object in a timeline payload, in order.
+    Walks the whole tree so it keeps working across entry/module layouts, but
+    does not descend into a tweet it found (that would pick up quoted tweets).
+    """
+    if isinstance(node, dict):
+        tweet_results = node.get("tweet_results")
+        if isinstance(tweet_results, dict) and "result" in tweet_results:
+            yield tweet_results["result"]
+            return
+        for value in node.values():
+            yield from iter_tweet_results(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from iter_tweet_results(value)
+
+
+def _parse_created_at(value):
+    # e.g. "Wed Aug 13 10:00:00 +0000 2025"
+    try:
+        return datetime.strptime(value, "%a %b %d %H:%M:%S %z %Y").isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def tweet_item(result):
+    """Turns one tweet result into the spider's item dict, or None if it isn't a readable tweet."""
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet", {})
+    legacy = result.get("legacy")
+    if not legacy:
+        return None
+
+    user = result.get("core", {}).get("user_results", {}).get("result", {})
+    screen_name = (user.get("core", {}).get("screen_name")
+                   or user.get("legacy", {}).get("screen_name"))
+    tweet_id = legacy.get("id_str") or result.get("rest_id")
+    if not tweet_id or not screen_name:
+        return None
+
+    # Tweets over 280 characters carry their full text in note_tweet
+    note = result.get("note_tweet", {}).get("note_tweet_results", {}).get("result", {})
+    text = note.get("text") or legacy.get("full_text", "")
+    hashtags = [f"#{tag['text']}" for tag in legacy.get("entities", {}).get("hashtags", [])]
+
+    return {
+        'tweet_id': tweet_id,
+        'tweet_url': f"https://x.com/{screen_name}/status/{tweet_id}",
+        'author': f"@{screen_name}",
+        'text': text,
+        'likes': int(legacy.get("favorite_count", 0)),
+        'retweets': int(legacy.get("retweet_count", 0)),
+        'hashtags': hashtags if hashtags else None,
+        'created_at': _parse_created_at(legacy.get("created_at")),
+    }
+
+
+def parse_search_timeline(payload):
+    """All tweets in one SearchTimeline response, in timeline order."""
+    items = []
+    for result in iter_tweet_results(payload):
+        item = tweet_item(result)
+        if item is not None:
+            items.append(item)
+    return items
@@ -0,0 +1,215 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+API_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+# Quota units charged per call, from the YouTube Data API quota table
+QUOTA_COST = {
+    'channels': 1,
+    'playlistItems': 1,
+    'videos': 1,
+    'commentThreads': 1,
+    'comments': 1,
+}
+
+# 403 reasons that mean "slow down / try later" rather than "this will never work"
+RETRYABLE_403_REASONS = {'quotaExceeded', 'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+class QuotaBudgetExceeded(Exception):
+    """
+    Raised when a call would take the run over its configured quota budget.
+    `rows` holds whatever the interrupted fetch had already collected.
+    """
+    rows = ()
+
+
+class YouTubeAPIError(Exception):
+    def __init__(self, status, reason, message):
+        super().__init__(f"HTTP {status} ({reason}): {message}")
+        self.status = status
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket measured in YouTube quota units.
+    Refills at `rate` units per second up to `capacity`, and refuses to hand
+    out more than `budget` units in total (the daily quota set aside for this run).
+    """
+
+    def __init__(self, rate, capacity, budget=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.budget = budget
+        self.tokens = capacity
+        self.spent = 0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, units=1):
+        while True:
+            with self.lock:
+                if self.budget is not None and self.spent + units > self.budget:
+                    raise QuotaBudgetExceeded(f"quota budget of {self.budget} units used up")
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= units:
+                    self.tokens -= units
+                    self.spent += units
+                    return
+                wait = (units - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class YouTubeClient:
+    """
+    Minimal REST client for the YouTube Data API v3 with a shared quota
+    limiter and retry/backoff on quota and rate-limit errors.
+    `base_url` can point at a local stub server for testing.
+    """
+
+    def __init__(self, api_key, base_url=API_BASE_URL, units_per_second=10, burst=20,
+                 quota_budget=10_000, max_retries=5, backoff_seconds=1.0, timeout=30):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.limiter = TokenBucket(units_per_second, burst, quota_budget)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+
+    def get(self, resource, **params):
+        """Calls `GET {base_url}/{resource}` and returns the decoded JSON body."""
+        params = {key: value for key, value in params.items() if value is not None}
+        params['key'] = self.api_key
+        url = f"{self.base_url}/{resource}?{urllib.parse.urlencode(params)}"
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(QUOTA_COST.get(resource, 1))
+            try:
+                with profiling.latency(f"youtube.{resource}"), \
+                        urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    return json.load(response)
+            except urllib.error.HTTPError as e:
+                error = _parse_error(e)
+                retryable = e.code == 429 or (e.code == 403 and error.reason in RETRYABLE_403_REASONS)
+                if not retryable or attempt == self.max_retries:
+                    raise error from None
+            # Exponential backoff with jitter so workers don't retry in lockstep
+            time.sleep(self.backoff_seconds * (2 ** attempt) * (0.5 + random.random()))
+
+    def iter_items(self, resource, max_items=None, page_size=50, **params):
+        """Yields items across pages, following `nextPageToken` until `max_items`."""
+        fetched = 0
+        page_token = None
+        while max_items is None or fetched < max_items:
+            size = page_size if max_items is None else min(page_size, max_items - fetched)
+            response = self.get(resource, maxResults=size, pageToken=page_token, **params)
+            items = response.get('items', [])
+            for item in items[:size]:
+                yield item
+            fetched += min(len(items), size)
+            page_token = response.get('nextPageToken')
+            if not page_token or not items:
+                break
+
+
+def _parse_error(http_error):
+    try:
+        body = json.loads(http_error.read().decode('utf-8'))
+        error = body.get('error', {})
+        reason = (error.get('errors') or [{}])[0].get('reason', '')
+        message = error.get('message', '')
+    except ValueError:
+        reason, message = '', str(http_error)
+    return YouTubeAPIError(http_error.code, reason, message)
+
+
+def comment_thread_row(video_id, item):
+    """Flattens a commentThreads item into the youtube_comments.csv schema."""
+    comment_snippet = item['snippet']
+    top_comment = comment_snippet['topLevelComment']['snippet']
+    return {
+        'video_id': video_id,
+        'comment_text': top_comment['textDisplay'],
+        'author': top_comment['authorDisplayName'],
+        'like_count': top_comment['likeCount'],
+        'publish_date': top_comment['publishedAt'],
+        'reply_count': comment_snippet['totalReplyCount'],
+        'comment_id': item['id'],
+        'parent_id': None,
+    }
+
+
+def comment_reply_row(video_id, parent_id, item):
+    """Flattens a comments (reply) item into the same schema, linked to its thread by `parent_id`."""
+    reply = item['snippet']
+    return {
+        'video_id': video_id,
+        'comment_text': reply['textDisplay'],
+        'author': reply['authorDisplayName'],
+        'like_count': reply['likeCount'],
+        'publish_date': reply['publishedAt'],
+        'reply_count': 0,
+        'comment_id': item['id'],
+        'parent_id': parent_id,
+    }
+
+
+def fetch_video_comments(client, video_id, max_comments=20):
+    items = client.iter_items(
+        'commentThreads',
+        max_items=max_comments,
+        page_size=100,
+        part='snippet',
+        videoId=video_id,
+        order='relevance',
+        textFormat='plainText'
+    )
+    rows = []
+    try:
+        for item in items:
+            rows.append(comment_thread_row(video_id, item))
+    except QuotaBudgetExceeded as e:
+        # The pages already fetched were paid for; hand them on with the error
+        e.rows = rows
+        raise
+    return rows
+
+
+def fetch_comments(client, video_ids, max_comments_per_video=20, workers=8):
+    """
+    Fetches top-level comments for every video with up to `workers` requests
+    in flight. Rows come back in `video_ids` order; videos that fail are
+    reported and skipped, as in the original serial loop. Returns the rows and
+    whether every video was fetched: once the quota budget runs out no further
+    videos are started, and the rows collected so far come back with False.
+    """
+    exhausted = threading.Event()
+
+    def fetch(video_id):
+        if exhausted.is_set():
+            return []
+        try:
+            return fetch_video_comments(client, video_id, max_comments_per_video)
+        except QuotaBudgetExceeded as e:
+            exhausted.set()
+            return list(e.rows)
+        except Exception as e:
+            print(f"Could not get comments for video {video_id}: {e}")
+            return []
+
+    all_comments_data = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for rows in executor.map(fetch, video_ids):
+            all_comments_data.extend(rows)
+    return all_comments_data, not exhausted.is_set()
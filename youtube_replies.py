@@ -0,0 +1,238 @@
+"""
+Reply expansion for YouTube comment threads.
+
+get_youtube_comments.py keeps each thread's top-level comment and its
+`reply_count`; this stage fetches the replies themselves with
+comments().list(parentId=...). Threads are valued by their reply count,
+weighted up when the top-level comment reads negative, and their pages are
+fetched most valuable first with a bounded number of requests in flight,
+until a quota or time budget runs out. A thread's next page goes back in
+the queue valued by the replies still to come, so one huge thread doesn't
+hold up the next-busiest ones. Reply rows are streamed into the comments CSV
+and the lake as pages arrive, with `parent_id` set to the thread's comment ID.
+Threads whose every reply is saved are logged, so a later run picks up the
+ones a budget cut short.
+"""
+
+import argparse
+import heapq
+import json
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_lake
+from sentiment import score_corpus
+from token_corpus import TokenCorpus
+from youtube_api import QUOTA_COST, QuotaBudgetExceeded, YouTubeClient, comment_reply_row
+
+COMMENTS_CSV = 'data/youtube_comments.csv'
+DONE_LOG = 'data/youtube_replies_done.jsonl'
+COLUMNS = ['video_id', 'comment_text', 'author', 'like_count', 'publish_date', 'reply_count',
+           'comment_id', 'parent_id']
+REPLY_WORKERS = 8            # reply pages in flight at once
+REPLY_QUOTA_BUDGET = 2_000   # quota units the stage may spend
+REPLY_TIME_BUDGET = 600      # seconds after which no new pages are requested
+NEGATIVE_WEIGHT = 2.0        # a thread opening at polarity -1 is worth 3x its reply count
+PAGE_SIZE = 100              # the most comments().list returns per page
+FLUSH_ROWS = 1_000
+
+WORD = re.compile(r'[^\W_]+')
+APOSTROPHE = re.compile(r"['’]")
+
+
+def thread_priority(threads):
+    """Value of expanding each thread: its reply count, weighted up by how negative its top comment is."""
+    text = threads['comment_text'].fillna('').astype(str).str.lower().str.replace(APOSTROPHE, '', regex=True)
+    # "don't" -> "dont", the form the lexicon's negations are listed under
+    polarity = score_corpus(TokenCorpus.from_token_lists(text.str.findall(WORD)))['polarity'].to_numpy()
+    negativity = np.clip(-polarity, 0, None)
+    return threads['reply_count'].fillna(0).to_numpy(float) * (1 + NEGATIVE_WEIGHT * negativity)
+
+
+def comments_frame(rows):
+    """Comment rows as a frame whose ID columns stay strings when all empty, so lake files agree on them."""
+    return pd.DataFrame(rows, columns=COLUMNS).astype({'comment_id': 'string', 'parent_id': 'string'})
+
+
+def completed_threads(path=DONE_LOG):
+    """Comment IDs of the threads whose replies were all saved, from the sink's log."""
+    done = set()
+    if Path(path).exists():
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['thread'])
+                except (ValueError, KeyError):
+                    continue  # a line cut short by a crash
+    return done
+
+
+def fetch_reply_page(client, parent_id, page_token=None, page_size=PAGE_SIZE):
+    return client.get('comments', part='snippet', parentId=parent_id, maxResults=page_size,
+                      pageToken=page_token, textFormat='plainText')
+
+
+class CommentSink:
+    """
+    Appends comment rows to the comments CSV and lake dataset, `flush_rows` at
+    a time. Rows whose comment ID is in `saved` are dropped, so a thread fetched
+    again after an interrupted run isn't saved twice. Threads passed to
+    `mark_complete` are logged to `done_log` once their rows are flushed.
+    """
+
+    def __init__(self, csv_path=COMMENTS_CSV, dataset='youtube_comments', flush_rows=FLUSH_ROWS,
+                 root=data_lake.LAKE_ROOT, done_log=None, saved=()):
+        self.csv_path = Path(csv_path) if csv_path else None
+        self.dataset = dataset
+        self.flush_rows = flush_rows
+        self.root = root
+        self.done_log = Path(done_log) if done_log else None
+        self.saved = set(saved)
+        self.rows = []
+        self.completed = []
+        self.written = 0
+
+    def write(self, rows):
+        self.rows.extend(row for row in rows if row['comment_id'] not in self.saved)
+        if len(self.rows) >= self.flush_rows:
+            self.flush()
+
+    def mark_complete(self, comment_id):
+        self.completed.append(comment_id)
+
+    def flush(self):
+        if self.rows:
+            df = comments_frame(self.rows)
+            if self.csv_path:
+                header = not self.csv_path.exists() or self.csv_path.stat().st_size == 0
+                df.to_csv(self.csv_path, mode='a', header=header, index=False)
+            if self.dataset:
+                data_lake.append(df, self.dataset, self.root)
+            self.written += len(df)
+            self.rows = []
+        if self.done_log and self.completed:
+            with open(self.done_log, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps({'thread': comment_id}) + '\n' for comment_id in self.completed)
+        self.completed = []
+
+
+def expand_replies(client, threads, sink, workers=REPLY_WORKERS, quota_budget=REPLY_QUOTA_BUDGET,
+                   time_budget=REPLY_TIME_BUDGET, max_replies=None, priority=None):
+    """
+    Fetches the replies to `threads` (rows with video_id, comment_id, comment_text
+    and reply_count), most valuable first, with up to `workers` pages in flight.
+    No page is started once `quota_budget` units or `time_budget` seconds are
+    spent; pages already in flight finish. `max_replies` caps the replies taken
+    per thread and `priority` overrides thread_priority. Reply rows go to
+    `sink.write` as each page arrives. Returns a summary of the run.
+    """
+    expandable = ((threads['reply_count'].fillna(0) > 0) & threads['comment_id'].notna()).to_numpy()
+    threads = threads[expandable]
+    counts = threads['reply_count'].to_numpy(np.int64)
+    if max_replies is not None:
+        counts = np.minimum(counts, max_replies)
+    values = thread_priority(threads) if priority is None else np.asarray(priority, dtype=float)[expandable]
+    weights = values / np.maximum(threads['reply_count'].to_numpy(float), 1)
+
+    # (-value of the page, tie-break, video_id, comment_id, replies still to take, replies taken, page token)
+    queue = [(-value, order, video_id, comment_id, int(count), 0, None)
+             for order, (value, video_id, comment_id, count)
+             in enumerate(zip(values, threads['video_id'], threads['comment_id'], counts))]
+    heapq.heapify(queue)
+
+    cost = QUOTA_COST['comments']
+    spent_before = client.limiter.spent
+    start = time.monotonic()
+    summary = {'threads': len(queue), 'started': 0, 'complete': 0, 'failed': 0, 'pages': 0, 'replies': 0}
+    stopped = None
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while in_flight or (queue and stopped is None):
+            while queue and stopped is None and len(in_flight) < workers:
+                if time.monotonic() - start >= time_budget:
+                    stopped = 'time budget'
+                # Pages in flight are counted as spent, so the budget holds whatever they return
+                elif client.limiter.spent - spent_before + (len(in_flight) + 1) * cost > quota_budget:
+                    stopped = 'quota budget'
+                else:
+                    task = heapq.heappop(queue)
+                    # A page costs the same however many replies it holds, so ask for full ones
+                    size = PAGE_SIZE if max_replies is None else min(PAGE_SIZE, max_replies - task[5])
+                    in_flight[executor.submit(fetch_reply_page, client, task[3], task[6], size)] = task
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                value, order, video_id, comment_id, remaining, taken, page_token = in_flight.pop(future)
+                try:
+                    response = future.result()
+                except QuotaBudgetExceeded:
+                    stopped = 'client quota budget'
+                    continue
+                except Exception as e:
+                    print(f"Could not get replies to comment {comment_id}: {e}")
+                    summary['failed'] += 1
+                    continue
+
+                items = response.get('items', [])
+                sink.write([comment_reply_row(video_id, comment_id, item) for item in items])
+                summary['pages'] += 1
+                summary['replies'] += len(items)
+                summary['started'] += page_token is None
+                taken += len(items)
+                next_token = response.get('nextPageToken')
+                if not next_token or not items or (max_replies is not None and taken >= max_replies):
+                    summary['complete'] += 1
+                    sink.mark_complete(comment_id)
+                    continue
+                # reply_count can be stale, so a thread with more pages is never valued at zero
+                remaining = max(remaining - len(items), 1)
+                weight = weights[order]
+                heapq.heappush(queue, (-weight * remaining, order, video_id, comment_id, remaining, taken, next_token))
+    sink.flush()
+
+    summary['units'] = client.limiter.spent - spent_before
+    summary['seconds'] = round(time.monotonic() - start, 2)
+    summary['stopped'] = stopped or 'done'
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--csv', default=COMMENTS_CSV)
+    parser.add_argument('--done-log', default=DONE_LOG, help="log of threads whose replies are all saved")
+    parser.add_argument('--workers', type=int, default=REPLY_WORKERS)
+    parser.add_argument('--quota-budget', type=int, default=REPLY_QUOTA_BUDGET)
+    parser.add_argument('--time-budget', type=float, default=REPLY_TIME_BUDGET)
+    parser.add_argument('--max-replies', type=int, help="replies to take per thread (default: all)")
+    args = parser.parse_args()
+
+    import config
+
+    try:
+        comments = pd.read_csv(args.csv)
+    except FileNotFoundError:
+        print(f"Error: '{args.csv}' not found. Please run 'get_youtube_comments.py' first.")
+        exit()
+    if 'comment_id' not in comments.columns:
+        print(f"Error: '{args.csv}' has no comment IDs. Please re-run 'get_youtube_comments.py'.")
+        exit()
+
+    # Threads completed by an earlier run are not fetched again; ones it cut short
+    # are fetched from the start, and the sink drops the replies already saved
+    done = completed_threads(args.done_log)
+    threads = comments[comments['parent_id'].isna() & ~comments['comment_id'].isin(done)]
+    print(f"Expanding replies for {int((threads['reply_count'] > 0).sum())} threads "
+          f"({args.workers} at a time, {args.quota_budget} quota units, {args.time_budget:.0f}s)...")
+    client = YouTubeClient(config.YOUTUBE_API_KEY, quota_budget=args.quota_budget)
+    sink = CommentSink(args.csv, done_log=args.done_log, saved=comments['comment_id'].dropna())
+    summary = expand_replies(client, threads, sink, args.workers, args.quota_budget,
+                             args.time_budget, args.max_replies)
+    print(f"✅ Saved {summary['replies']} replies from {summary['started']} threads "
+          f"({summary['complete']} complete, {summary['units']} quota units, stopped: {summary['stopped']})")
@@ -1,99 +1,190 @@
+import argparse
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import pandas as pd
-from googleapiclient.discovery import build
-import config
-
-# --- 1. Setup ---
-api_key = config.YOUTUBE_API_KEY
-youtube = build('youtube', 'v3', developerKey=api_key)
+from youtube_api import YouTubeClient
 
 # Zomato's unique and permanent Channel ID
-zomato_channel_id = "UCD7kbZQyYIR6RgJQYW9w0Tg" 
-uploads_playlist_id = None
-video_ids = []
-
-# --- 2. Find the official Uploads Playlist ID from the Channel ID ---
-print(f"Finding the uploads playlist for channel ID: {zomato_channel_id}...")
-try:
-    request = youtube.channels().list(
-        part="contentDetails",
-        id=zomato_channel_id
-    )
-    response = request.execute()
-    
-    if 'items' in response and response['items']:
-        uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-        print(f"Successfully found Uploads Playlist ID: {uploads_playlist_id}")
-    else:
-        print("\n--- ERROR ---")
-        print("API did not return any items for the channel.")
-        print("This is likely because your API Key is invalid or you have exceeded your daily quota.")
-        print("Please check your key and quota in the Google Cloud Console.")
-        print("API Response:", response) # Prints the raw response for debugging
-        exit()
+zomato_channel_id = "UCD7kbZQyYIR6RgJQYW9w0Tg"
 
-except Exception as e:
-    print(f"An error occurred while finding the uploads playlist: {e}")
-    exit()
+OUTPUT_FILE = 'data/youtube_official_videos.csv'
+STATE_DB = 'data/youtube_sync_state.db'
+PAGE_SIZE = 50        # the API maximum for playlistItems and videos
+DETAIL_WORKERS = 4    # videos().list batches in flight while paging
 
-# --- 3. Get all Video IDs directly from the Uploads Playlist ---
-if uploads_playlist_id:
-    print("Fetching all video IDs from the playlist...")
-    next_page_token = None
-    try:
-        while True:
-            request = youtube.playlistItems().list(
-                part='contentDetails',
-                playlistId=uploads_playlist_id,
-                maxResults=10,
-                pageToken=next_page_token
+# How long a video's statistics stay fresh, by video age:
+# (videos up to this many days old, refresh after this many hours). None = any age.
+STATS_TTL_POLICY = [(7, 6), (90, 24), (None, 24 * 7)]
+
+VIDEO_COLUMNS = ['video_id', 'video_url', 'title', 'description', 'tags',
+                 'publish_date', 'view_count', 'like_count', 'comment_count']
+
+
+class VideoStateStore:
+    """SQLite record of every video seen so far and when its stats were last refreshed."""
+
+    def __init__(self, db_path=STATE_DB):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                video_url TEXT,
+                title TEXT,
+                description TEXT,
+                tags TEXT,
+                publish_date TEXT,
+                view_count INTEGER,
+                like_count INTEGER,
+                comment_count INTEGER,
+                stats_refreshed_at REAL NOT NULL
             )
-            response = request.execute()
-            
-            video_ids.extend([item['contentDetails']['videoId'] for item in response.get('items', [])])
-            
-            next_page_token = response.get('nextPageToken')
-            if not next_page_token:
+        """)
+        self.conn.commit()
+
+    def known_ids(self):
+        return {row[0] for row in self.conn.execute("SELECT video_id FROM videos")}
+
+    def stale_ids(self, policy=STATS_TTL_POLICY, now=None):
+        """Known videos whose statistics have expired under `policy`; a video with no publish date always is."""
+        now = now or time.time()
+        stale = []
+        for video_id, publish_date, refreshed_at in self.conn.execute(
+                "SELECT video_id, publish_date, stats_refreshed_at FROM videos"):
+            if not publish_date:
+                stale.append(video_id)
+                continue
+            published = datetime.fromisoformat(publish_date.replace('Z', '+00:00')).timestamp()
+            age_days = (now - published) / 86400
+            for max_age_days, ttl_hours in policy:
+                if max_age_days is None or age_days <= max_age_days:
+                    if now - refreshed_at > ttl_hours * 3600:
+                        stale.append(video_id)
+                    break
+        return stale
+
+    def upsert(self, rows, refreshed_at=None):
+        refreshed_at = refreshed_at or time.time()
+        with self.conn:
+            self.conn.executemany(f"""
+                INSERT OR REPLACE INTO videos ({', '.join(VIDEO_COLUMNS)}, stats_refreshed_at)
+                VALUES ({', '.join('?' * len(VIDEO_COLUMNS))}, ?)
+            """, [[row[col] for col in VIDEO_COLUMNS] + [refreshed_at] for row in rows])
+
+    def to_dataframe(self):
+        return pd.read_sql_query(
+            f"SELECT {', '.join(VIDEO_COLUMNS)} FROM videos ORDER BY publish_date DESC", self.conn)
+
+    def close(self):
+        self.conn.close()
+
+
+def _count(value):
+    return int(value) if value is not None else None
+
+
+def video_row(item):
+    """Flattens a videos().list item into the youtube_official_videos.csv schema."""
+    snippet = item.get('snippet', {})
+    stats = item.get('statistics', {})
+    video_id = item['id']
+    return {
+        'video_id': video_id,
+        'video_url': f"https://www.youtube.com/watch?v={video_id}",
+        'title': snippet.get('title'),
+        'description': snippet.get('description'),
+        'tags': "|".join(snippet.get('tags', [])),
+        'publish_date': snippet.get('publishedAt'),
+        'view_count': _count(stats.get('viewCount')),
+        'like_count': _count(stats.get('likeCount')),
+        'comment_count': _count(stats.get('commentCount'))
+    }
+
+
+def fetch_video_details(client, video_ids):
+    response = client.get('videos', part="snippet,statistics", id=",".join(video_ids))
+    return [video_row(item) for item in response.get('items', [])]
+
+
+def find_uploads_playlist(client, channel_id):
+    response = client.get('channels', part="contentDetails", id=channel_id)
+    if not response.get('items'):
+        raise RuntimeError(f"API did not return any items for channel {channel_id}: {response}")
+    return response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+
+
+def sync_channel(client, channel_id, store, full=False, policy=STATS_TTL_POLICY, workers=DETAIL_WORKERS):
+    """
+    Brings `store` up to date with the channel's uploads.
+
+    Playlist paging stops after the first page that contains an already-known
+    video (uploads are listed newest first), and each page of new IDs is sent
+    to videos().list on a worker thread while the next page is requested.
+    Known videos are only re-fetched once their stats expire under `policy`.
+    `full=True` pages the whole playlist and refreshes every video.
+
+    Nothing is stored unless every batch succeeds: storing the newest pages
+    alone would make the next incremental run stop paging at them and never
+    fetch the older videos that failed.
+    """
+    uploads_playlist_id = find_uploads_playlist(client, channel_id)
+    previously_known = store.known_ids()
+    known = set() if full else previously_known
+    stale = set(previously_known) if full else set(store.stale_ids(policy))
+
+    futures = []
+    new_ids = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        page_token = None
+        while True:
+            response = client.get('playlistItems', part='contentDetails', playlistId=uploads_playlist_id,
+                                  maxResults=PAGE_SIZE, pageToken=page_token)
+            page_ids = [item['contentDetails']['videoId'] for item in response.get('items', [])]
+            page_new = [video_id for video_id in page_ids if video_id not in known]
+            if page_new:
+                new_ids.extend(page_new)
+                futures.append(executor.submit(fetch_video_details, client, page_new))
+            page_token = response.get('nextPageToken')
+            if not page_token or len(page_new) < len(page_ids):
                 break
-        print(f"Found {len(video_ids)} total video IDs.")
 
+        stale -= set(new_ids)
+        stale = sorted(stale)
+        for i in range(0, len(stale), PAGE_SIZE):
+            futures.append(executor.submit(fetch_video_details, client, stale[i:i + PAGE_SIZE]))
+
+        rows = [row for future in futures for row in future.result()]
+    store.upsert(rows)
+
+    new_videos = sum(row['video_id'] not in previously_known for row in rows)
+    summary = {'new_videos': new_videos, 'refreshed_stats': len(rows) - new_videos}
+
+    summary['quota_units'] = client.limiter.spent
+    return summary
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--full', action='store_true', help="page the whole playlist and refresh every video")
+    args = parser.parse_args()
+
+    client = YouTubeClient(config.YOUTUBE_API_KEY)
+    store = VideoStateStore()
+
+    print(f"Syncing uploads for channel ID: {zomato_channel_id}...")
+    try:
+        summary = sync_channel(client, zomato_channel_id, store, full=args.full)
     except Exception as e:
-        print(f"An error occurred while fetching video IDs: {e}")
+        print(f"An error occurred while syncing the channel: {e}")
         exit()
+    print(f"{summary['new_videos']} new videos, {summary['refreshed_stats']} stats refreshed, "
+          f"{summary['quota_units']} quota units used.")
+
+    df = store.to_dataframe()
+    store.close()
+    df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
 
-# --- 4. Get full details for all found videos ---
-if video_ids:
-    print("Fetching full details for all videos...")
-    videos_data = []
-    for i in range(0, len(video_ids), 50):
-        chunk_ids = video_ids[i:i+50]
-        request = youtube.videos().list(
-            part="snippet,statistics",
-            id=",".join(chunk_ids)
-        )
-        response = request.execute()
-
-        for item in response.get('items', []):
-            snippet = item.get('snippet', {})
-            stats = item.get('statistics', {})
-            video_id = item['id']
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-
-            videos_data.append({
-                'video_id': video_id,
-                'video_url': video_url,
-                'title': snippet.get('title'),
-                'description': snippet.get('description'),
-                'tags': "|".join(snippet.get('tags', [])),
-                'publish_date': snippet.get('publishedAt'),
-                'view_count': stats.get('viewCount'),
-                'like_count': stats.get('likeCount'),
-                'comment_count': stats.get('commentCount')
-            })
-
-    df = pd.DataFrame(videos_data)
-    output_file = 'data/youtube_official_videos.csv'
-    df.to_csv(output_file, index=False, encoding='utf-8-sig')
-
-    print(f"\n✅ Success! Data for {len(df)} videos saved to '{output_file}'")
-else:
-    print("No video IDs were found.")
+    print(f"\n✅ Success! Data for {len(df)} videos saved to '{OUTPUT_FILE}'")
@@ -11,9 +11,75 @@ def should_abort_request(request):
         return True
     return False
 
+# Pulls every visible tweet out of the page in a single round trip.
+# Mirrors the selectors used by `extract_with_handles` one for one.
+EXTRACT_TWEETS_JS = """
+() => Array.from(document.querySelectorAll('article[data-testid="tweet"]')).map(article => {
+    const link = article.querySelector('a[href*="/status/"]');
+    const textElement = article.querySelector('div[data-testid="tweetText"]');
+    const likesElement = article.querySelector('button[data-testid="like"] span[data-testid="app-text-transition-container"] span');
+    const retweetButton = article.querySelector('button[data-testid="retweet"]');
+    return {
+        permalink: link ? link.getAttribute('href') : null,
+        text: textElement ? textElement.innerText : null,
+        likes: likesElement ? likesElement.textContent : null,
+        retweets_label: retweetButton ? retweetButton.getAttribute('aria-label') : '',
+        hashtags: textElement
+            ? Array.from(textElement.querySelectorAll('a')).map(a => a.innerText).filter(t => (t || '').startsWith('#'))
+            : [],
+    };
+})
+"""
+
+async def extract_with_handles(page, seen_tweet_ids):
+    """
+    Element-handle extraction: one awaited Playwright call per field.
+    Returns the same raw dicts as EXTRACT_TWEETS_JS, skipping tweets already seen.
+    """
+    raw_tweets = []
+    for tweet_element in await page.query_selector_all('article[data-testid="tweet"]'):
+        try:
+            permalink_element = await tweet_element.query_selector('a[href*="/status/"]')
+            permalink = await permalink_element.get_attribute('href') if permalink_element else None
+            if not permalink or parse_permalink(permalink)[1] in seen_tweet_ids:
+                raw_tweets.append({'permalink': permalink})
+                continue
+
+            text_content_element = await tweet_element.query_selector('div[data-testid="tweetText"]')
+            if not text_content_element:
+                raw_tweets.append({'permalink': permalink, 'text': None})
+                continue
+            likes_element = await tweet_element.query_selector('button[data-testid="like"] span[data-testid="app-text-transition-container"] span')
+            retweet_button = await tweet_element.query_selector('button[data-testid="retweet"]')
+            raw_tweets.append({
+                'permalink': permalink,
+                'text': await text_content_element.inner_text(),
+                'likes': await likes_element.text_content() if likes_element else None,
+                'retweets_label': await retweet_button.get_attribute('aria-label') if retweet_button else '',
+                'hashtags': [await link.inner_text() for link in await text_content_element.query_selector_all('a') if (await link.inner_text() or '').startswith('#')],
+            })
+        except Exception:
+            raw_tweets.append({'permalink': None})
+    return raw_tweets
+
+def parse_permalink(permalink):
+    """'/user/status/123?x' -> ('@user', '123', 'https://x.com/user/status/123?x')"""
+    parts = permalink.split('/')
+    return f"@{parts[1]}", parts[3].split('?')[0], f"https://x.com{permalink}"
+
+def parse_retweets(aria_label):
+    if aria_label:
+        found_numbers = re.search(r'(\d[\d,]*)', aria_label)
+        if found_numbers:
+            return found_numbers.group(1).replace(',', '')
+    return '0'
+
 class ZomatoSpiderSpider(scrapy.Spider):
     name = "zomato_spider"
     TWEET_LIMIT = 200
+    # 'batch': one page.evaluate per scroll; 'handles': the old per-field element queries.
+    # Override with `scrapy crawl zomato_spider -a extraction=handles`.
+    extraction = "batch"
 
     def __init__(self, *args, **kwargs):
         super(ZomatoSpiderSpider, self).__init__(*args, **kwargs)
@@ -67,54 +133,38 @@ class ZomatoSpiderSpider(scrapy.Spider):
 
         empty_scroll_attempts = 0
         while self.scraped_items_count < self.TWEET_LIMIT:
-            tweet_articles = await page.query_selector_all('article[data-testid="tweet"]')
-            
+            if self.extraction == "batch":
+                raw_tweets = await page.evaluate(EXTRACT_TWEETS_JS)
+            else:
+                raw_tweets = await extract_with_handles(page, self.seen_tweet_ids)
+
             new_tweets_found_this_scroll = 0
-            for tweet_element in tweet_articles:
+            for raw in raw_tweets:
                 try:
-                    # --- NEW CONSOLIDATED LOGIC ---
-                    # 1. Find the one reliable link that contains the timestamp and ID.
-                    permalink_element = await tweet_element.query_selector('a[href*="/status/"]')
-                    permalink = await permalink_element.get_attribute('href') if permalink_element else None
-
+                    # 1. The permalink carries the author and the ID.
                     # If we can't find this link, we can't identify the tweet, so we skip it.
+                    permalink = raw.get('permalink')
                     if not permalink:
                         continue
-
-                    # 2. Extract everything from this one link.
-                    parts = permalink.split('/')
-                    author = f"@{parts[1]}"
-                    tweet_id = parts[3].split('?')[0]
-                    tweet_url = f"https://x.com{permalink}"
+                    author, tweet_id, tweet_url = parse_permalink(permalink)
 
                     if tweet_id in self.seen_tweet_ids:
                         continue
-                    
-                    text_content_element = await tweet_element.query_selector('div[data-testid="tweetText"]')
-                    if not text_content_element: continue
-                    text = await text_content_element.inner_text()
-                    
-                    likes_element = await tweet_element.query_selector('button[data-testid="like"] span[data-testid="app-text-transition-container"] span')
-                    retweet_button = await tweet_element.query_selector('button[data-testid="retweet"]')
-                    retweets_aria_label = await retweet_button.get_attribute('aria-label') if retweet_button else ''
-                    retweets = '0'
-                    if retweets_aria_label:
-                        found_numbers = re.search(r'(\d[\d,]*)', retweets_aria_label)
-                        if found_numbers:
-                            retweets = found_numbers.group(1).replace(',', '')
-                    
-                    hashtags = [await link.inner_text() for link in await text_content_element.query_selector_all('a') if (await link.inner_text() or '').startswith('#')]
+                    if raw.get('text') is None:
+                        continue
+
+                    hashtags = raw['hashtags']
                     self.seen_tweet_ids.add(tweet_id)
                     self.scraped_items_count += 1
                     new_tweets_found_this_scroll += 1
-                    
+
                     yield {
                         'tweet_id': tweet_id,
                         'tweet_url': tweet_url,
                         'author': author,
-                        'text': text,
-                        'likes': await likes_element.text_content() if likes_element else '0',
-                        'retweets': retweets,
+                        'text': raw['text'],
+                        'likes': raw['likes'] if raw['likes'] is not None else '0',
+                        'retweets': parse_retweets(raw['retweets_label']),
                         'hashtags' : hashtags if hashtags else None
                     }
 
@@ -126,7 +176,7 @@ class ZomatoSpiderSpider(scrapy.Spider):
             if self.scraped_items_count >= self.TWEET_LIMIT:
                 break
             
-            if new_tweets_found_this_scroll == 0 and len(tweet_articles) > 0:
+            if new_tweets_found_this_scroll == 0 and len(raw_tweets) > 0:
                 empty_scroll_attempts += 1
                 if empty_scroll_attempts >= 3:
                     self.logger.info("Ending batch after 3 consecutive empty scrolls.")